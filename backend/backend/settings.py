@@ -56,6 +56,19 @@ DEFAULT_FROM_EMAIL = os.environ.get(
     "DEFAULT_FROM_EMAIL",
     "Onyx PM <notifications@onyx-pm.com>",
 )
+# Emails are queued in an outbox and sent by `manage.py send_outbox`. Failed
+# deliveries are retried with exponential backoff (base, cap) until the
+# attempt limit; while the mail server is unreachable, retries use the base
+# delay and do not count as attempts. An email queued with a dedupe key
+# already used for the same recipient within the dedupe window is dropped.
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.environ.get("EMAIL_OUTBOX_MAX_ATTEMPTS", "8"))
+EMAIL_OUTBOX_RETRY_SECONDS = int(os.environ.get("EMAIL_OUTBOX_RETRY_SECONDS", "60"))
+EMAIL_OUTBOX_MAX_RETRY_SECONDS = int(os.environ.get("EMAIL_OUTBOX_MAX_RETRY_SECONDS", "3600"))
+EMAIL_OUTBOX_DEDUPE_SECONDS = int(os.environ.get("EMAIL_OUTBOX_DEDUPE_SECONDS", "86400"))
+# Emails claimed by a worker that died are picked up again after this long.
+EMAIL_OUTBOX_CLAIM_SECONDS = int(os.environ.get("EMAIL_OUTBOX_CLAIM_SECONDS", "600"))
+# `manage.py scheduler` run history older than this is deleted.
+SCHEDULER_HISTORY_DAYS = int(os.environ.get("SCHEDULER_HISTORY_DAYS", "30"))
 
 
 # Application definition
@@ -74,6 +87,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'properties.middleware.RequestMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -81,7 +95,11 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'properties.middleware.RequestProfilingMiddleware',
     'properties.middleware.OrganizationMiddleware',
+    'properties.middleware.ShardRoutingMiddleware',
+    'properties.middleware.ReplicaRoutingMiddleware',
+    'properties.middleware.RequestCacheMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -115,6 +133,77 @@ DATABASES = {
     )
 }
 
+# Optional read replica. Reports, the AI context builder, public listings and
+# the blog read from it (see properties/db_routing.py); everything else, and
+# anyone who wrote in the last REPLICA_STICKY_SECONDS, uses the primary. That
+# stickiness lives in the default cache, so the replica is only used while the
+# cache is shared between processes (CACHE_SHARED, see below).
+if os.environ.get("DATABASE_REPLICA_URL"):
+    DATABASES["replica"] = dj_database_url.parse(os.environ["DATABASE_REPLICA_URL"])
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+REPLICA_DATABASE_ALIAS = "replica"
+REPLICA_STICKY_SECONDS = int(os.environ.get("REPLICA_STICKY_SECONDS", "10"))
+# How long to stay on the primary after the replica fails to connect.
+REPLICA_RETRY_SECONDS = int(os.environ.get("REPLICA_RETRY_SECONDS", "30"))
+
+# Optional organization shards, as "alias=url,alias=url". Organizations are
+# placed on them through the OrganizationShard directory and moved with
+# `manage.py move_organization` (see properties/sharding.py).
+SHARD_DATABASES = []
+for _shard in filter(None, os.environ.get("DATABASE_SHARDS", "").split(",")):
+    _alias, _url = _shard.split("=", 1)
+    DATABASES[_alias.strip()] = dj_database_url.parse(_url.strip())
+    SHARD_DATABASES.append(_alias.strip())
+
+DATABASE_ROUTERS = [
+    "properties.sharding.OrganizationShardRouter",
+    "properties.db_routing.ReplicaRouter",
+]
+
+# Cache
+# Data version stamps (ETags, report and AI context caches) and token profile
+# versions are kept in the default cache. Every process that writes data (web
+# workers, `manage.py scheduler`) must see the same counters, so use a shared
+# backend such as django.core.cache.backends.db.DatabaseCache (run
+# `manage.py createcachetable`) or redis/memcached. Features that rely on the
+# counters are switched off while the default cache is process-local; set
+# CACHE_SHARED=true to keep them for a single-process deployment.
+
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("CACHE_LOCATION", "onyx-default"),
+    },
+    # Computed report results. Entries are keyed by the organization's data
+    # versions and never expire on a timer; superseded results are evicted
+    # once MAX_ENTRIES is reached (least recently used first with LocMemCache;
+    # the file and database backends cull a 1/CULL_FREQUENCY share). Reports
+    # are only cached while CACHE_SHARED holds, as the keys depend on the
+    # version counters.
+    "reports": {
+        "BACKEND": os.environ.get(
+            "REPORT_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("REPORT_CACHE_LOCATION", "onyx-reports"),
+        "TIMEOUT": None,
+        "OPTIONS": {
+            "MAX_ENTRIES": int(os.environ.get("REPORT_CACHE_MAX_ENTRIES", "2000")),
+            "CULL_FREQUENCY": 4,
+        },
+    },
+}
+PROCESS_LOCAL_CACHE_BACKENDS = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+CACHE_SHARED = os.environ.get(
+    "CACHE_SHARED", str(CACHES["default"]["BACKEND"] not in PROCESS_LOCAL_CACHE_BACKENDS)
+).lower() in {"1", "true", "yes", "on"}
+REPORT_CACHE_ALIAS = "reports"
+REPORT_CACHE_ENABLED = os.environ.get("REPORT_CACHE_ENABLED", "true").lower() in {"1", "true", "yes", "on"}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -159,20 +248,52 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'properties.authentication.ClaimsJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    'DEFAULT_PAGINATION_CLASS': 'properties.pagination.StandardPagination',
+    'PAGE_SIZE': int(os.environ.get("API_PAGE_SIZE", "50")),
 }
 
+API_MAX_PAGE_SIZE = int(os.environ.get("API_MAX_PAGE_SIZE", "250"))
+# The frontend still expects bare lists from most endpoints. Until it sends
+# ?page=/?cursor= everywhere, list endpoints only paginate on request; set
+# API_PAGINATE_BY_DEFAULT=True to page every list response.
+API_PAGINATE_BY_DEFAULT = os.environ.get("API_PAGINATE_BY_DEFAULT", "False").lower() in {"1", "true", "yes", "on"}
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
+    'TOKEN_OBTAIN_SERIALIZER': 'properties.authentication.ClaimsTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'properties.authentication.ClaimsTokenRefreshSerializer',
+}
+# Per-endpoint request metrics, served to staff at /api/internal/metrics/.
+REQUEST_METRICS_ENABLED = os.environ.get("REQUEST_METRICS_ENABLED", "False").lower() in {"1", "true", "yes", "on"}
+SLOW_REQUEST_SECONDS = float(os.environ.get("SLOW_REQUEST_SECONDS", "1.0"))
+SLOW_REQUEST_QUERIES = int(os.environ.get("SLOW_REQUEST_QUERIES", "50"))
+# Staff `?__profile=1` reports: each is truncated to the first cap and the
+# oldest are deleted once all stored reports exceed the second.
+PROFILE_REPORT_MAX_BYTES = int(os.environ.get("PROFILE_REPORT_MAX_BYTES", str(512 * 1024)))
+PROFILE_REPORTS_MAX_TOTAL_BYTES = int(
+    os.environ.get("PROFILE_REPORTS_MAX_TOTAL_BYTES", str(50 * 1024 * 1024))
+)
+
+# Trust the organization/role claims of current tokens instead of loading the
+# user and profile on every request. Role changes are picked up through a
+# profile version kept in the default cache, so claims are only trusted while
+# that cache is shared between processes (CACHE_SHARED).
+AUTH_TRUST_TOKEN_CLAIMS = os.environ.get("AUTH_TRUST_TOKEN_CLAIMS", str(CACHE_SHARED)).lower() in {
+    "1", "true", "yes", "on"
 }
 
 # In production, set these via environment variables.
 STRIPE_SECRET_KEY = os.environ.get("STRIPE_SECRET_KEY", "sk_test_placeholder")
 STRIPE_PUBLISHABLE_KEY = os.environ.get("STRIPE_PUBLISHABLE_KEY", "pk_test_placeholder")
 
+# Local transaction categorizer: suggestions below this confidence fall back
+# to manual review (imports) or the LLM (agent tasks).
+CATEGORIZER_MIN_CONFIDENCE = float(os.environ.get("CATEGORIZER_MIN_CONFIDENCE", "0.8"))
+
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
@@ -4,4 +4,5 @@ set -e
 pip install -r requirements.txt
 python manage.py collectstatic --noinput
 python manage.py migrate
+python manage.py createcachetable
 python manage.py createsuperuser --noinput || true
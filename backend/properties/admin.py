@@ -1,6 +1,20 @@
 from django.contrib import admin
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html
 
-from .models import Lease, MaintenanceRequest, Payment, Property, Tenant, Unit
+from .models import (
+    Lease,
+    MaintenanceRequest,
+    OutgoingEmail,
+    Payment,
+    Property,
+    RequestProfile,
+    ScheduledJobRun,
+    Tenant,
+    Unit,
+)
 
 
 @admin.register(Property)
@@ -79,3 +93,90 @@ class MaintenanceRequestAdmin(admin.ModelAdmin):
         "tenant__last_name",
         "tenant__email",
     )
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ("created_at", "recipient", "subject", "status", "attempts", "next_attempt_at", "sent_at")
+    list_filter = ("status", "created_at")
+    search_fields = ("recipient", "subject")
+    readonly_fields = ("dedupe_key", "attempts", "last_error", "created_at", "sent_at")
+
+
+@admin.register(ScheduledJobRun)
+class ScheduledJobRunAdmin(admin.ModelAdmin):
+    list_display = ("started_at", "job", "scheduled_for", "status", "duration_ms", "missed_runs", "node")
+    list_filter = ("status", "job")
+    readonly_fields = (
+        "job",
+        "scheduled_for",
+        "missed_runs",
+        "node",
+        "status",
+        "started_at",
+        "finished_at",
+        "duration_ms",
+        "output",
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    list_display = (
+        "created_at",
+        "method",
+        "path",
+        "status_code",
+        "duration_ms",
+        "query_count",
+        "size_bytes",
+        "user",
+        "download_link",
+    )
+    list_filter = ("method", "status_code", "created_at")
+    search_fields = ("path", "user__username")
+    readonly_fields = (
+        "user",
+        "method",
+        "path",
+        "status_code",
+        "duration_ms",
+        "query_count",
+        "size_bytes",
+        "created_at",
+        "report",
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        return [
+            path(
+                "<int:profile_id>/download/",
+                self.admin_site.admin_view(self.download_view),
+                name="properties_requestprofile_download",
+            )
+        ] + super().get_urls()
+
+    @admin.display(description="Report")
+    def download_link(self, obj):
+        url = reverse("admin:properties_requestprofile_download", args=[obj.id])
+        return format_html('<a href="{}">Download</a>', url)
+
+    def download_view(self, request, profile_id):
+        profile = get_object_or_404(RequestProfile, id=profile_id)
+        if not self.has_view_permission(request, profile):
+            return HttpResponse(status=403)
+        response = HttpResponse(profile.report, content_type="text/plain; charset=utf-8")
+        response["Content-Disposition"] = f'attachment; filename="profile-{profile.id}.txt"'
+        return response
@@ -1,11 +1,18 @@
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal, InvalidOperation
+import hashlib
 import logging
+import threading
 
+from django.db import close_old_connections
 from django.utils import timezone
 
 from .ai_service import get_ai_json
+from .categorizer import min_confidence as categorizer_min_confidence
+from .categorizer import suggest_categories
 from .models import (
     AccountingCategory,
+    AgentTask,
     LeadActivity,
     Message,
     Payment,
@@ -13,6 +20,7 @@ from .models import (
     WorkOrder,
     Bill,
 )
+from .sharding import organization_scope
 
 logger = logging.getLogger(__name__)
 
@@ -44,8 +52,7 @@ def _message_sender(task):
 # =====================
 
 
-def generate_payment_reminder(task):
-    """Generate a personalized payment reminder email for an overdue tenant."""
+def payment_reminder_context(task):
     lease = task.related_lease
     tenant = task.related_tenant
     if not lease or not tenant:
@@ -73,6 +80,17 @@ Days Since Rent Due: {max(days_overdue, 0)}
 Recent Payment History:
 {history_text}
 """
+    return context
+
+
+def generate_payment_reminder(task, context=None):
+    """Generate a personalized payment reminder email for an overdue tenant."""
+    lease = task.related_lease
+    tenant = task.related_tenant
+    if not lease or not tenant:
+        return None
+    if context is None:
+        context = payment_reminder_context(task)
 
     system_prompt = """You are a professional property management assistant drafting a rent payment reminder email.
 Be firm but professional and empathetic. Do not threaten. Include the specific amount owed and how to pay.
@@ -97,7 +115,7 @@ Keep the email under 150 words. Return JSON with keys: "subject", "body"."""
 
 def execute_payment_reminder(task):
     """Execute: send the payment reminder as an in-app message."""
-    reminder = generate_payment_reminder(task)
+    reminder = get_task_preview(task)
     if not reminder:
         return False, "Could not generate reminder"
 
@@ -128,8 +146,7 @@ def execute_payment_reminder(task):
 # =====================
 
 
-def generate_lead_follow_up(task):
-    """Generate a personalized follow-up email for a stale lead."""
+def lead_follow_up_context(task):
     lead = task.related_lead
     if not lead:
         return None
@@ -156,6 +173,16 @@ Days Since Last Contact: {(timezone.now() - lead.updated_at).days}
 Activity History:
 {activity_text}
 """
+    return context
+
+
+def generate_lead_follow_up(task, context=None):
+    """Generate a personalized follow-up email for a stale lead."""
+    lead = task.related_lead
+    if not lead:
+        return None
+    if context is None:
+        context = lead_follow_up_context(task)
 
     system_prompt = """You are a friendly leasing agent following up with a prospective tenant.
 Be warm, helpful, and encourage them to schedule a tour or ask questions.
@@ -181,7 +208,7 @@ Return JSON with keys: "subject", "body"."""
 
 def execute_lead_follow_up(task):
     """Execute: create the follow-up as a lead activity and optionally send message."""
-    follow_up = generate_lead_follow_up(task)
+    follow_up = get_task_preview(task)
     if not follow_up:
         return False, "Could not generate follow-up"
 
@@ -214,8 +241,7 @@ def execute_lead_follow_up(task):
 # =====================
 
 
-def generate_maintenance_triage(task):
-    """AI analyzes a maintenance request and suggests vendor + priority + estimated cost."""
+def maintenance_triage_context(task):
     request = task.related_maintenance
     if not request:
         return None
@@ -235,6 +261,15 @@ Submitted: {request.created_at.strftime("%b %d, %Y") if hasattr(request, "create
 Available Vendors:
 {vendor_text}
 """
+    return context
+
+
+def generate_maintenance_triage(task, context=None):
+    """AI analyzes a maintenance request and suggests vendor + priority + estimated cost."""
+    if context is None:
+        context = maintenance_triage_context(task)
+    if context is None:
+        return None
 
     system_prompt = """You are a property maintenance expert triaging a maintenance request.
 Analyze the request and suggest:
@@ -255,7 +290,7 @@ Return JSON with keys: "recommended_vendor_id" (int or null), "recommended_vendo
 
 def execute_maintenance_triage(task):
     """Execute: create work order with AI-suggested vendor."""
-    triage = generate_maintenance_triage(task)
+    triage = get_task_preview(task)
     if not triage:
         return False, "Could not generate triage"
 
@@ -314,8 +349,7 @@ def execute_maintenance_triage(task):
 # =====================
 
 
-def generate_transaction_categorization(task):
-    """AI suggests which account a transaction should be categorized to."""
+def transaction_categorization_context(task):
     bill = task.related_bill
     if not bill:
         return None
@@ -339,6 +373,38 @@ Property: {bill.property.name if bill.property else "Not specified"}
 Chart of Accounts:
 {account_text}
 """
+    return context
+
+
+def generate_transaction_categorization(task, context=None):
+    """Suggest which account a bill should be categorized to.
+
+    The organization's local classifier answers when it is confident enough;
+    only uncertain bills are sent to the LLM.
+    """
+    bill = task.related_bill
+    if not bill:
+        return None
+
+    [(account, confidence)] = suggest_categories(
+        task.organization,
+        [
+            {
+                "description": bill.description,
+                "amount": -abs(bill.total_amount or 0),
+                "vendor": bill.vendor.name,
+            }
+        ],
+    )
+    if account and confidence >= categorizer_min_confidence():
+        return {
+            "suggested_account_id": account.id,
+            "suggested_account_name": account.name,
+            "reasoning": "Matches how similar transactions have been booked before.",
+            "confidence": round(confidence, 3),
+        }
+    if context is None:
+        context = transaction_categorization_context(task)
 
     system_prompt = """You are a property management bookkeeper categorizing an expense.
 Based on the vendor category, description, and amount, suggest the most appropriate expense account.
@@ -353,7 +419,7 @@ Return JSON with keys: "suggested_account_id" (int), "suggested_account_name" (s
 
 def execute_transaction_categorization(task):
     """Execute: set the bill's category to the AI suggestion."""
-    categorization = generate_transaction_categorization(task)
+    categorization = get_task_preview(task)
     if not categorization:
         return False, "Could not generate categorization"
 
@@ -387,8 +453,7 @@ def execute_transaction_categorization(task):
 # =====================
 
 
-def generate_renewal_offer(task):
-    """AI drafts a lease renewal offer with suggested rent."""
+def renewal_offer_context(task):
     lease = task.related_lease
     tenant = task.related_tenant
     if not lease or not tenant:
@@ -405,6 +470,17 @@ Days Until Expiration: {days_left}
 Unit: {lease.unit.unit_number if lease.unit else "Unknown"}
 Property: {lease.property.name if hasattr(lease, "property") and lease.property else "Unknown"}
 """
+    return context
+
+
+def generate_renewal_offer(task, context=None):
+    """AI drafts a lease renewal offer with suggested rent."""
+    lease = task.related_lease
+    tenant = task.related_tenant
+    if not lease or not tenant:
+        return None
+    if context is None:
+        context = renewal_offer_context(task)
 
     system_prompt = """You are a property manager drafting a lease renewal offer.
 Consider a typical 3-5% annual rent increase. Be professional and encouraging.
@@ -437,7 +513,7 @@ Return JSON with keys: "suggested_new_rent" (number), "rent_increase_pct" (numbe
 
 def execute_renewal_offer(task):
     """Execute: send renewal offer as message."""
-    offer = generate_renewal_offer(task)
+    offer = get_task_preview(task)
     if not offer:
         return False, "Could not generate renewal offer"
 
@@ -495,6 +571,18 @@ GENERATORS = {
 }
 
 
+PREVIEW_CONTEXTS = {
+    "rent_overdue": payment_reminder_context,
+    "payment_reminder": payment_reminder_context,
+    "lead_follow_up": lead_follow_up_context,
+    "vendor_assignment": maintenance_triage_context,
+    "maintenance_triage": maintenance_triage_context,
+    "categorize_transaction": transaction_categorization_context,
+    "anomaly_detected": transaction_categorization_context,
+    "lease_expiring": renewal_offer_context,
+}
+
+
 def execute_task(task):
     """Route a task to its executor."""
     executor = EXECUTORS.get(task.task_type)
@@ -509,3 +597,90 @@ def generate_preview(task):
     if generator:
         return generator(task)
     return None
+
+
+# =====================
+# PREVIEW CACHE
+# =====================
+
+_preview_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="agent-preview")
+_refreshing_lock = threading.Lock()
+_refreshing_task_ids = set()
+
+
+def preview_inputs(task):
+    """Return `(context, hash)` of the data a task's preview is generated from.
+
+    This runs the generator's database lookups but never the LLM call.
+    Both are None when the task has nothing to preview.
+    """
+    builder = PREVIEW_CONTEXTS.get(task.task_type)
+    context = builder(task) if builder else None
+    if context is None:
+        return None, None
+    digest = hashlib.sha256(f"{task.task_type}\n{context}".encode("utf-8")).hexdigest()
+    return context, digest
+
+
+def get_task_preview(task, inputs=None):
+    """Return the task's preview, reusing the stored one while its inputs are unchanged."""
+    generator = GENERATORS.get(task.task_type)
+    if not generator:
+        return None
+    context, input_hash = inputs or preview_inputs(task)
+    if input_hash is None:
+        return None
+    if task.preview is not None and task.preview_hash == input_hash:
+        return task.preview
+
+    preview = generator(task, context)
+    if preview is not None:
+        task.preview = preview
+        task.preview_hash = input_hash
+        task.preview_generated_at = timezone.now()
+        AgentTask.objects.filter(pk=task.pk).update(
+            preview=preview,
+            preview_hash=input_hash,
+            preview_generated_at=task.preview_generated_at,
+        )
+    return preview
+
+
+def _refresh_preview(task_id, organization_id):
+    try:
+        # The thread has no request scope: route to the task's shard explicitly.
+        with organization_scope(organization_id):
+            task = AgentTask.objects.filter(pk=task_id).first()
+            if task:
+                get_task_preview(task)
+    except Exception as e:
+        logger.warning("Could not refresh preview for task %s: %s", task_id, e)
+    finally:
+        with _refreshing_lock:
+            _refreshing_task_ids.discard(task_id)
+        close_old_connections()
+
+
+def schedule_preview_refresh(task):
+    """Regenerate a task's preview in a background thread (once at a time per task)."""
+    with _refreshing_lock:
+        if task.pk in _refreshing_task_ids:
+            return
+        _refreshing_task_ids.add(task.pk)
+    _preview_executor.submit(_refresh_preview, task.pk, task.organization_id)
+
+
+def cached_task_preview(task):
+    """Return `(preview, is_stale)` for displaying a task.
+
+    A stored preview whose inputs have since changed is returned as-is
+    (flagged stale) while a fresh one is generated in the background; a
+    task without any stored preview is generated synchronously.
+    """
+    inputs = preview_inputs(task)
+    if task.preview is None:
+        return get_task_preview(task, inputs=inputs), False
+    if task.preview_hash == inputs[1]:
+        return task.preview, False
+    schedule_preview_refresh(task)
+    return task.preview, True
@@ -1,14 +1,18 @@
 from datetime import timedelta
 
-from django.db.models import Case, Count, IntegerField, Value, When
+from django.db.models import Case, Count, IntegerField, Prefetch, Sum, Value, When
 from django.utils import timezone
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from .management.commands.run_agents import run_skill_scan
-from .mixins import OrganizationQuerySetMixin
+from .management.commands.run_agents import (
+    adjust_skill_counts,
+    run_skill_scan,
+    transition_task,
+)
+from .mixins import OrganizationQuerySetMixin, resolve_request_organization
 from .models import AgentSkill, AgentTask
 from .permissions import IsLandlord
 from .serializers import (
@@ -16,6 +20,11 @@ from .serializers import (
     AgentTaskDetailSerializer,
     AgentTaskListSerializer,
 )
+from .sharding import shard_atomic
+
+
+# Query params `AgentTaskViewSet.get_queryset` filters on.
+TASK_FILTER_PARAMS = ("status", "priority", "task_type", "skill__skill_type")
 
 
 def _priority_sort_expression():
@@ -28,8 +37,25 @@ def _priority_sort_expression():
     )
 
 
+def _task_changed_response(task):
+    """409 for a transition that lost a race with another request."""
+    return Response(
+        {
+            "detail": f"This task was already changed (now {task.status}).",
+            "task": AgentTaskDetailSerializer(task).data,
+        },
+        status=status.HTTP_409_CONFLICT,
+    )
+
+
 class AgentSkillViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet):
-    queryset = AgentSkill.objects.select_related("organization").all()
+    queryset = AgentSkill.objects.select_related("organization").prefetch_related(
+        Prefetch(
+            "tasks",
+            queryset=AgentTask.objects.order_by("-created_at")[:3],
+            to_attr="recent_task_list",
+        )
+    )
     serializer_class = AgentSkillSerializer
     permission_classes = [IsAuthenticated, IsLandlord]
 
@@ -117,28 +143,35 @@ class AgentTaskViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet):
             return AgentTaskListSerializer
         return AgentTaskDetailSerializer
 
+    def perform_update(self, serializer):
+        old_status = serializer.instance.status
+        with shard_atomic():
+            task = serializer.save()
+            adjust_skill_counts(task.skill_id, old_status, task.status)
+
+    def perform_destroy(self, instance):
+        with shard_atomic():
+            adjust_skill_counts(instance.skill_id, old_status=instance.status)
+            instance.delete()
+
     @action(detail=True, methods=["post"])
     def approve(self, request, pk=None):
         task = self.get_object()
         execute = request.data.get("execute", False)
         resolution_note = (request.data.get("resolution_note") or "").strip()
 
-        task.status = AgentTask.STATUS_APPROVED
-        task.resolved_at = timezone.now()
-        task.resolved_by = request.user
-        task.resolution_note = resolution_note
-        task.save(
-            update_fields=[
-                "status",
-                "resolved_at",
-                "resolved_by",
-                "resolution_note",
-                "updated_at",
-            ]
-        )
-        task.skill.tasks_completed += 1
-        task.skill.tasks_pending = max(0, task.skill.tasks_pending - 1)
-        task.skill.save(update_fields=["tasks_completed", "tasks_pending"])
+        # Only a pending task may be executed, and only by the request whose
+        # transition wins.
+        if execute and task.status != AgentTask.STATUS_PENDING:
+            return _task_changed_response(task)
+        if not transition_task(
+            task,
+            AgentTask.STATUS_APPROVED,
+            resolved_at=timezone.now(),
+            resolved_by=request.user,
+            resolution_note=resolution_note,
+        ):
+            return _task_changed_response(task)
 
         execution_result = None
         if execute:
@@ -147,7 +180,7 @@ class AgentTaskViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet):
             success, message = execute_task(task)
             execution_result = {"success": success, "message": message}
             task.resolution_note = message
-            task.save(update_fields=["resolution_note", "status", "resolved_at", "resolved_by"])
+            task.save(update_fields=["resolution_note"])
 
         serializer_data = AgentTaskDetailSerializer(task).data
         return Response(
@@ -163,14 +196,16 @@ class AgentTaskViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet):
     def preview(self, request, pk=None):
         """Preview what the AI agent would do for this task without executing."""
         task = self.get_object()
-        from .agent_executors import generate_preview
+        from .agent_executors import cached_task_preview
 
-        preview_data = generate_preview(task)
+        preview_data, stale = cached_task_preview(task)
         return Response(
             {
                 "task_id": task.id,
                 "task_type": task.task_type,
                 "preview": preview_data,
+                "stale": stale,
+                "generated_at": task.preview_generated_at,
             },
             status=status.HTTP_200_OK,
         )
@@ -181,28 +216,20 @@ class AgentTaskViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet):
         task = self.get_object()
         from .agent_executors import execute_task
 
-        success, message = execute_task(task)
-
-        task.status = AgentTask.STATUS_APPROVED if success else AgentTask.STATUS_PENDING
-        task.resolved_at = timezone.now() if success else None
-        task.resolved_by = request.user if success else None
-        task.resolution_note = message
-        task.save(
-            update_fields=[
-                "status",
-                "resolved_at",
-                "resolved_by",
-                "resolution_note",
-                "updated_at",
-            ]
-        )
+        # Claim the task before running it so concurrent calls execute it once.
+        if task.status != AgentTask.STATUS_PENDING or not transition_task(
+            task, AgentTask.STATUS_APPROVED, resolved_at=timezone.now(), resolved_by=request.user
+        ):
+            return _task_changed_response(task)
 
+        success, message = execute_task(task)
         if success:
-            task.skill.tasks_completed += 1
-            task.skill.tasks_pending = max(0, task.skill.tasks_pending - 1)
-            task.skill.save(update_fields=["tasks_completed", "tasks_pending"])
+            task.resolution_note = message
+            task.save(update_fields=["resolution_note"])
         else:
-            task.skill.save(update_fields=["tasks_pending"])
+            transition_task(
+                task, AgentTask.STATUS_PENDING, resolved_at=None, resolved_by=None, resolution_note=message
+            )
 
         return Response(
             {
@@ -217,20 +244,14 @@ class AgentTaskViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet):
     def dismiss(self, request, pk=None):
         task = self.get_object()
         resolution_note = (request.data.get("resolution_note") or "").strip()
-        task.status = AgentTask.STATUS_DISMISSED
-        task.resolved_at = timezone.now()
-        task.resolved_by = request.user
-        task.resolution_note = resolution_note
-        task.save(
-            update_fields=[
-                "status",
-                "resolved_at",
-                "resolved_by",
-                "resolution_note",
-                "updated_at",
-            ]
-        )
-        sync_skill_counts(task.skill)
+        if not transition_task(
+            task,
+            AgentTask.STATUS_DISMISSED,
+            resolved_at=timezone.now(),
+            resolved_by=request.user,
+            resolution_note=resolution_note,
+        ):
+            return _task_changed_response(task)
         return Response(self.get_serializer(task).data, status=status.HTTP_200_OK)
 
     @action(detail=False, methods=["get"])
@@ -251,15 +272,21 @@ class AgentTaskViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet):
             AgentTask.PRIORITY_LOW: pending_tasks.filter(priority=AgentTask.PRIORITY_LOW).count(),
         }
         total_by_skill = {skill_type: 0 for skill_type, _ in AgentSkill.SKILL_CHOICES}
-        for row in pending_tasks.values("skill__skill_type").annotate(count=Count("id")):
-            total_by_skill[row["skill__skill_type"]] = row["count"]
+        if any(request.query_params.get(param) for param in TASK_FILTER_PARAMS):
+            # The per-skill counters cover all of the organization's tasks.
+            for row in pending_tasks.values("skill__skill_type").annotate(count=Count("id")):
+                total_by_skill[row["skill__skill_type"]] = row["count"]
+        else:
+            skills = AgentSkill.objects.filter(organization=resolve_request_organization(request))
+            for row in skills.values("skill_type").annotate(count=Sum("tasks_pending")):
+                total_by_skill[row["skill_type"]] = row["count"]
 
         today = timezone.now().date()
         week_start = timezone.now() - timedelta(days=7)
 
         return Response(
             {
-                "total_pending": pending_tasks.count(),
+                "total_pending": sum(total_by_skill.values()),
                 "total_by_priority": total_by_priority,
                 "total_by_skill": total_by_skill,
                 "resolved_today": resolved_tasks.filter(resolved_at__date=today).count(),
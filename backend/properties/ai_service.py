@@ -1,52 +1,355 @@
+import bisect
 import json
 import logging
 import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 logger = logging.getLogger(__name__)
 
+ANTHROPIC_MODEL = "claude-sonnet-4-20250514"
+OPENAI_MODEL = "gpt-4o-mini"
+
+# Hedged requests configuration:
+# AI_HEDGE_ENABLED=true      # fire the secondary provider if the primary is slow
+# AI_HEDGE_DELAY=p90         # seconds (e.g. 2.5) or a primary latency quantile (p50-p99)
+# AI_HEDGE_DEFAULT_DELAY=2.0 # used until the primary has AI_HEDGE_MIN_SAMPLES observations
+# AI_HEDGE_MIN_SAMPLES=20
+# AI_HEDGE_MAX_WORKERS=8     # concurrent hedge requests; primaries run on the caller's thread
+DEFAULT_HEDGE_DELAY_SECONDS = 2.0
+DEFAULT_HEDGE_MIN_SAMPLES = 20
+DEFAULT_HEDGE_MAX_WORKERS = 8
+
+LATENCY_BUCKETS = (0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 7.5, 10.0, 15.0, 20.0, 30.0, 60.0)
+
+
+def _hedge_max_workers():
+    try:
+        return max(1, int(os.environ.get("AI_HEDGE_MAX_WORKERS", DEFAULT_HEDGE_MAX_WORKERS)))
+    except ValueError:
+        return DEFAULT_HEDGE_MAX_WORKERS
+
+
+_hedge_executor = ThreadPoolExecutor(max_workers=_hedge_max_workers(), thread_name_prefix="ai-hedge")
+
+
+class LatencyHistogram:
+    """Thread-safe cumulative latency histogram with fixed bucket bounds (seconds)."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counts = [0] * (len(self.buckets) + 1)
+            self.count = 0
+            self.total = 0.0
+            self.errors = 0
+            self.cancelled = 0
+
+    def observe(self, seconds, outcome="ok"):
+        """Record one call. A cancelled call's elapsed time is kept as a
+        lower bound of its latency; leaving out the slow calls that were
+        hedged away would pull the quantiles (and the hedge delay) down.
+        """
+        with self._lock:
+            if outcome == "cancelled":
+                self.cancelled += 1
+            elif outcome == "error":
+                self.errors += 1
+                return
+            self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+            self.count += 1
+            self.total += seconds
+
+    def quantile(self, q):
+        """Upper bucket bound covering quantile `q` of observed latencies, or None if empty."""
+        with self._lock:
+            if not self.count:
+                return None
+            target = q * self.count
+            running = 0
+            for idx, bucket_count in enumerate(self.counts):
+                running += bucket_count
+                if running >= target:
+                    return self.buckets[idx] if idx < len(self.buckets) else self.buckets[-1]
+            return self.buckets[-1]
+
+    def snapshot(self):
+        with self._lock:
+            cumulative = []
+            running = 0
+            for bound, bucket_count in zip(self.buckets, self.counts):
+                running += bucket_count
+                cumulative.append((bound, running))
+            return {
+                "buckets": cumulative,
+                "count": self.count,
+                "sum": self.total,
+                "errors": self.errors,
+                "cancelled": self.cancelled,
+            }
+
+
+_histograms_lock = threading.Lock()
+PROVIDER_LATENCY = {}
+
+
+def get_provider_histogram(provider):
+    with _histograms_lock:
+        histogram = PROVIDER_LATENCY.get(provider)
+        if histogram is None:
+            histogram = PROVIDER_LATENCY[provider] = LatencyHistogram()
+        return histogram
+
+
+def provider_latency_snapshot():
+    """Return `{provider: histogram snapshot}` for every provider called so far."""
+    with _histograms_lock:
+        providers = list(PROVIDER_LATENCY.items())
+    return {provider: histogram.snapshot() for provider, histogram in providers}
+
+
+class ProviderCall:
+    """One provider attempt for `hedged_call`.
+
+    `func` performs the blocking request and returns its result (raising on
+    failure). `cancel` is an optional callable that aborts the in-flight
+    request, e.g. by closing the HTTP client it uses.
+    """
+
+    def __init__(self, provider, func, cancel=None):
+        self.provider = provider
+        self.func = func
+        self.cancel = cancel
+        self.cancelled = False
+
+    def run(self):
+        started = time.monotonic()
+        try:
+            result = self.func()
+        except Exception:
+            outcome = "cancelled" if self.cancelled else "error"
+            get_provider_histogram(self.provider).observe(time.monotonic() - started, outcome)
+            raise
+        outcome = "cancelled" if self.cancelled else "ok"
+        get_provider_histogram(self.provider).observe(time.monotonic() - started, outcome)
+        return result
+
+    def abort(self, future=None):
+        self.cancelled = True
+        if (future is not None and future.cancel()) or not self.cancel:
+            return
+        try:
+            self.cancel()
+        except Exception as e:
+            logger.debug("Failed to cancel %s request: %s", self.provider, e)
+
+
+def hedging_enabled():
+    return os.environ.get("AI_HEDGE_ENABLED", "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _env_float(name, default):
+    try:
+        return float(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def hedge_delay(provider):
+    """Seconds to wait on `provider` before firing the next provider.
+
+    `AI_HEDGE_DELAY` is either a number of seconds or a quantile such as `p90`
+    of the provider's observed latency. Quantiles fall back to
+    `AI_HEDGE_DEFAULT_DELAY` until enough samples have been recorded.
+    """
+    default_delay = _env_float("AI_HEDGE_DEFAULT_DELAY", DEFAULT_HEDGE_DELAY_SECONDS)
+    raw = os.environ.get("AI_HEDGE_DELAY", "p90").strip().lower()
+    if raw.startswith("p"):
+        try:
+            q = float(raw[1:]) / 100
+        except ValueError:
+            return default_delay
+        histogram = get_provider_histogram(provider)
+        min_samples = int(_env_float("AI_HEDGE_MIN_SAMPLES", DEFAULT_HEDGE_MIN_SAMPLES))
+        if histogram.count < min_samples:
+            return default_delay
+        return histogram.quantile(q) or default_delay
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        return default_delay
+
+
+def hedged_call(calls, delay=None):
+    """Run `ProviderCall`s in preference order, hedging slow attempts.
+
+    The first call runs on the caller's thread, so only hedges take a
+    worker from the pool. If it has not answered after `delay` seconds
+    (defaults to `hedge_delay()` of that provider), the next call is started
+    as well; a failed call starts the next one right away. The first
+    successful result wins and any other in-flight call is cancelled.
+    Returns `(provider, result)`; raises the last error if every call fails.
+    """
+    calls = list(calls)
+    if not calls:
+        raise ValueError("hedged_call requires at least one provider call")
+    primary = calls[0]
+    if delay is None:
+        delay = hedge_delay(primary.provider)
+
+    lock = threading.Lock()
+    pending = {}
+    remaining = list(calls[1:])
+    finished = False
+    last_error = None
+
+    def abort_primary(future):
+        if not future.cancelled() and future.exception() is None:
+            primary.abort()
+
+    def launch_next():
+        with lock:
+            if finished or not remaining:
+                return
+            call = remaining.pop(0)
+            future = _hedge_executor.submit(call.run)
+            pending[future] = call
+        # A hedge that answers first cuts the primary's request short.
+        future.add_done_callback(abort_primary)
+
+    def hedge():
+        logger.info("Hedging AI request to %s after %.2fs", remaining[0].provider, delay)
+        launch_next()
+
+    timer = None
+    if remaining:
+        timer = threading.Timer(delay, hedge)
+        timer.daemon = True
+        timer.start()
+    try:
+        result = primary.run()
+    except Exception as e:
+        if not primary.cancelled:
+            last_error = e
+            logger.warning("%s API error: %s", primary.provider.capitalize(), e)
+    else:
+        with lock:
+            finished = True
+            others = list(pending.items())
+        for other_future, other_call in others:
+            other_call.abort(other_future)
+        return primary.provider, result
+    finally:
+        if timer:
+            timer.cancel()
+            timer.join()
+
+    if not pending:
+        launch_next()
+    while pending:
+        done, _ = wait(list(pending), timeout=delay if remaining else None, return_when=FIRST_COMPLETED)
+        if not done:
+            hedge()
+            continue
+        for future in done:
+            call = pending.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                last_error = e
+                logger.warning("%s API error: %s", call.provider.capitalize(), e)
+                continue
+            for other_future, other_call in pending.items():
+                other_call.abort(other_future)
+            return call.provider, result
+        if remaining and not pending:
+            launch_next()
+
+    raise last_error
+
+
+def _anthropic_call(api_key, system_prompt, user_prompt, max_tokens, temperature):
+    import anthropic
+
+    client = anthropic.Anthropic(api_key=api_key)
+
+    def run():
+        response = client.messages.create(
+            model=ANTHROPIC_MODEL,
+            max_tokens=max_tokens,
+            system=system_prompt,
+            messages=[{"role": "user", "content": user_prompt}],
+            temperature=temperature,
+        )
+        return response.content[0].text if response.content else ""
+
+    return ProviderCall("anthropic", run, cancel=client.close)
+
+
+def _openai_call(api_key, system_prompt, user_prompt, max_tokens, temperature):
+    import openai
+
+    client = openai.OpenAI(api_key=api_key)
+
+    def run():
+        response = client.chat.completions.create(
+            model=OPENAI_MODEL,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+        )
+        return (response.choices[0].message.content or "").strip()
+
+    return ProviderCall("openai", run, cancel=client.close)
+
 
 def get_ai_completion(system_prompt, user_prompt, max_tokens=1000, temperature=0.7):
     """
     Get AI completion from available provider.
     Tries Anthropic first, then OpenAI, then returns a rule-based fallback.
+    With AI_HEDGE_ENABLED, OpenAI is also fired once Anthropic exceeds the
+    hedge delay and whichever answers first is used.
     """
+    calls = []
     anthropic_key = os.environ.get("ANTHROPIC_API_KEY", "").strip()
     if anthropic_key:
         try:
-            import anthropic
-
-            client = anthropic.Anthropic(api_key=anthropic_key)
-            response = client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=max_tokens,
-                system=system_prompt,
-                messages=[{"role": "user", "content": user_prompt}],
-                temperature=temperature,
+            calls.append(
+                _anthropic_call(anthropic_key, system_prompt, user_prompt, max_tokens, temperature)
             )
-            text = response.content[0].text if response.content else ""
-            return text
         except Exception as e:
             logger.warning("Anthropic API error: %s", e)
 
     openai_key = os.environ.get("OPENAI_API_KEY", "").strip()
     if openai_key:
         try:
-            import openai
-
-            client = openai.OpenAI(api_key=openai_key)
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                max_tokens=max_tokens,
-                temperature=temperature,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
+            calls.append(
+                _openai_call(openai_key, system_prompt, user_prompt, max_tokens, temperature)
             )
-            return (response.choices[0].message.content or "").strip()
         except Exception as e:
             logger.warning("OpenAI API error: %s", e)
 
+    if calls and hedging_enabled() and len(calls) > 1:
+        try:
+            _provider, text = hedged_call(calls)
+            return text
+        except Exception:
+            calls = []
+
+    for call in calls:
+        try:
+            return call.run()
+        except Exception as e:
+            logger.warning("%s API error: %s", call.provider.capitalize(), e)
+
     logger.info("No AI provider available, using rule-based fallback")
     return None
 
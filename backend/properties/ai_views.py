@@ -1,17 +1,33 @@
+import json
+import logging
 import os
+import threading
+import time
 from datetime import date, timedelta
 from decimal import Decimal
 
 import requests
-from django.db.models import Sum
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Count, Q, Sum
+from django.http import StreamingHttpResponse
 from django.utils import timezone
+from rest_framework import mixins, viewsets
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import BaseRenderer
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 
+from .ai_service import ProviderCall, hedged_call, hedging_enabled
+from .cache_versions import cache_shared, get_versions
+from .db_routing import replica_reads
 from .mixins import resolve_request_organization
 from .models import (
     AccountingCategory,
+    ChatMessage,
+    ChatSession,
     JournalEntry,
     JournalEntryLine,
     Lease,
@@ -22,6 +38,10 @@ from .models import (
     Tenant,
     Unit,
 )
+from .serializers import ChatSessionDetailSerializer, ChatSessionSerializer
+from .sharding import shard_atomic
+
+logger = logging.getLogger(__name__)
 
 
 def _to_decimal(value):
@@ -40,14 +60,6 @@ def _format_money(value):
     return f"${amount:,.2f}"
 
 
-def _safe_context_append(context_parts, label, value_func):
-    try:
-        value_func(context_parts)
-    except Exception:
-        # Keep the API resilient: return partial context even when one section fails.
-        pass
-
-
 def _format_property_address(property_obj):
     if not property_obj:
         return ""
@@ -63,216 +75,436 @@ def _format_property_address(property_obj):
     return " | ".join([part for part in address_parts if part])
 
 
-def gather_context(organization):
-    """Build a compact text summary of the landlord's portfolio for the AI context."""
-    context_parts = []
-
-    properties = Property.objects.none()
-    units = Unit.objects.none()
-    tenants = Tenant.objects.none()
-    leases = Lease.objects.none()
-    properties_count = 0
-    units_count = 0
-    tenants_count = 0
-    active_leases_count = 0
-
-    def add_portfolio_summary(_parts):
-        nonlocal properties, units, tenants, leases
-        nonlocal properties_count, units_count, tenants_count, active_leases_count
-        properties = Property.objects.filter(organization=organization)
-        units = Unit.objects.filter(property__organization=organization)
-        tenants = Tenant.objects.filter(organization=organization)
-        leases = Lease.objects.filter(unit__property__organization=organization, is_active=True)
-
-        properties_count = properties.count()
-        units_count = units.count()
-        tenants_count = tenants.count()
-        active_leases_count = leases.count()
-
-        context_parts.append(
+def _portfolio_section(organization):
+    properties_count = Property.objects.filter(organization=organization).count()
+    units_count = Unit.objects.filter(property__organization=organization).count()
+    tenants_count = Tenant.objects.filter(organization=organization).count()
+    active_leases_count = Lease.objects.filter(
+        unit__property__organization=organization, is_active=True
+    ).count()
+    return {
+        "lines": [
             f"Portfolio: {properties_count} properties, {units_count} units, "
             f"{tenants_count} tenants, {active_leases_count} active leases."
-        )
+        ],
+        "summary": f"{properties_count} properties, {units_count} units",
+    }
 
-    def add_property_details(_parts):
-        if not properties.exists():
-            return
 
-        for prop in properties[:20]:
-            prop_units = units.filter(property=prop)
-            occupied = prop_units.filter(lease__is_active=True).distinct().count()
-            context_parts.append(
-                f"Property: {prop.name} ({_format_property_address(prop)}) - "
-                f"{prop_units.count()} units, {occupied} occupied."
-            )
+def _property_details_section(organization):
+    properties = Property.objects.filter(organization=organization).annotate(
+        unit_count=Count("units", distinct=True),
+        occupied_count=Count(
+            "units",
+            filter=Q(units__leases__is_active=True),
+            distinct=True,
+        ),
+    )[:20]
+    return {
+        "lines": [
+            f"Property: {prop.name} ({_format_property_address(prop)}) - "
+            f"{prop.unit_count} units, {prop.occupied_count} occupied."
+            for prop in properties
+        ]
+    }
 
-    def add_recent_payments(_parts):
-        recent_payments = Payment.objects.filter(
-            lease__unit__property__organization=organization,
-            created_at__gte=timezone.now() - timedelta(days=30),
-        )
-        total_collected = recent_payments.aggregate(total=Sum("amount"))["total"]
-        context_parts.append(
+
+def _recent_payments_section(organization):
+    totals = Payment.objects.filter(
+        lease__unit__property__organization=organization,
+        created_at__gte=timezone.now() - timedelta(days=30),
+    ).aggregate(count=Count("id"), total=Sum("amount"))
+    return {
+        "lines": [
             "Payments last 30 days: "
-            f"{recent_payments.count()} payments, {_format_money(total_collected)} collected."
-        )
+            f"{totals['count']} payments, {_format_money(totals['total'])} collected."
+        ]
+    }
 
-    def add_outstanding_balances(_parts):
-        ledger_balances = (
-            RentLedgerEntry.objects.filter(lease__unit__property__organization=organization)
-            .values(
-                "lease__tenant__first_name",
-                "lease__tenant__last_name",
-                "lease__unit__unit_number",
-                "lease__unit__property__name",
-            )
-            .annotate(balance=Sum("amount"))
-            .filter(balance__gt=0)
-            .order_by("-balance")
+
+def _outstanding_balances_section(organization):
+    ledger_balances = list(
+        RentLedgerEntry.objects.filter(lease__unit__property__organization=organization)
+        .values(
+            "lease__tenant__first_name",
+            "lease__tenant__last_name",
+            "lease__unit__unit_number",
+            "lease__unit__property__name",
+        )
+        .annotate(balance=Sum("amount"))
+        .filter(balance__gt=0)
+        .order_by("-balance")[:20]
+    )
+    if not ledger_balances:
+        return {"lines": []}
+
+    lines = ["Outstanding balances:"]
+    for entry in ledger_balances:
+        name = f"{entry['lease__tenant__first_name']} {entry['lease__tenant__last_name']}".strip() or "Unknown Tenant"
+        lines.append(
+            f"  {name} - Unit {entry['lease__unit__unit_number']} at "
+            f"{entry['lease__unit__property__name']}: {_format_money(entry['balance'])}"
+        )
+    return {"lines": lines}
+
+
+def _maintenance_section(organization):
+    open_requests = MaintenanceRequest.objects.filter(
+        unit__property__organization=organization,
+        status__in=[
+            MaintenanceRequest.STATUS_SUBMITTED,
+            MaintenanceRequest.STATUS_IN_PROGRESS,
+        ],
+    ).select_related("unit__property")
+
+    lines = [f"Open maintenance requests: {open_requests.count()}"]
+    for request in open_requests[:10]:
+        lines.append(
+            f"  {request.unit.property.name} Unit {request.unit.unit_number if request.unit_id else 'N/A'}: "
+            f"{request.description[:80]} (Status: {request.status}, Priority: {request.priority})"
         )
+    return {"lines": lines}
+
+
+def _accounting_section(organization):
+    month_start = date.today().replace(day=1)
+    totals = JournalEntryLine.objects.filter(
+        journal_entry__organization=organization,
+        journal_entry__status=JournalEntry.STATUS_POSTED,
+        journal_entry__entry_date__gte=month_start,
+    ).aggregate(
+        revenue=Sum(
+            "credit_amount",
+            filter=Q(account__account_type=AccountingCategory.ACCOUNT_TYPE_REVENUE),
+        ),
+        expenses=Sum(
+            "debit_amount",
+            filter=Q(account__account_type=AccountingCategory.ACCOUNT_TYPE_EXPENSE),
+        ),
+    )
 
-        if not ledger_balances:
-            return
+    revenue = totals["revenue"] or Decimal("0.00")
+    expenses = totals["expenses"] or Decimal("0.00")
+    return {
+        "lines": [
+            f"This month: {_format_money(revenue)} revenue, {_format_money(expenses)} expenses, "
+            f"{_format_money(revenue - expenses)} net income."
+        ]
+    }
 
-        context_parts.append("Outstanding balances:")
-        for entry in ledger_balances[:20]:
-            name = f"{entry['lease__tenant__first_name']} {entry['lease__tenant__last_name']}".strip() or "Unknown Tenant"
-            context_parts.append(
-                f"  {name} - Unit {entry['lease__unit__unit_number']} at "
-                f"{entry['lease__unit__property__name']}: {_format_money(entry['balance'])}"
-            )
 
-    def add_maintenance_requests(_parts):
-        open_requests = MaintenanceRequest.objects.filter(
-            property__organization=organization,
-            status__in=[
-                MaintenanceRequest.STATUS_SUBMITTED,
-                MaintenanceRequest.STATUS_IN_PROGRESS,
-            ],
+def _lease_expirations_section(organization):
+    today = date.today()
+    expiring_soon = Lease.objects.filter(
+        unit__property__organization=organization,
+        is_active=True,
+        end_date__lte=today + timedelta(days=60),
+        end_date__gte=today,
+    ).select_related("tenant", "unit__property").order_by("end_date")
+
+    expiring_count = expiring_soon.count()
+    if not expiring_count:
+        return {"lines": []}
+
+    lines = [f"Leases expiring in next 60 days: {expiring_count}"]
+    for lease in expiring_soon[:10]:
+        tenant_name = f"{lease.tenant.first_name} {lease.tenant.last_name}"
+        lines.append(
+            f"  {tenant_name} - Unit {lease.unit.unit_number} at {lease.unit.property.name}: "
+            f"expires {lease.end_date}"
         )
+    return {"lines": lines}
 
-        context_parts.append(f"Open maintenance requests: {open_requests.count()}")
-        for request in open_requests[:10]:
-            context_parts.append(
-                f"  {request.unit.property.name} Unit {request.unit.unit_number if request.unit_id else 'N/A'}: "
-                f"{request.description[:80]} (Status: {request.status}, Priority: {request.priority})"
-            )
 
-    def add_accounting_summary(_parts):
-        month_start = date.today().replace(day=1)
-        posted_entries = JournalEntry.objects.filter(
-            organization=organization,
-            status=JournalEntry.STATUS_POSTED,
-            entry_date__gte=month_start,
-        )
+def _vacant_units_section(organization):
+    vacant_units = Unit.objects.filter(property__organization=organization).exclude(
+        id__in=Lease.objects.filter(is_active=True).values("unit_id")
+    ).select_related("property")
 
-        income_lines = JournalEntryLine.objects.filter(
-            journal_entry__in=posted_entries,
-            account__account_type=AccountingCategory.TYPE_REVENUE,
-        ).aggregate(total=Sum("credit_amount"))
-        expense_lines = JournalEntryLine.objects.filter(
-            journal_entry__in=posted_entries,
-            account__account_type=AccountingCategory.TYPE_EXPENSE,
-        ).aggregate(total=Sum("debit_amount"))
-
-        revenue = income_lines["total"] or Decimal("0.00")
-        expenses = expense_lines["total"] or Decimal("0.00")
-        context_parts.append(
-            f"This month: {_format_money(revenue)} revenue, {_format_money(expenses)} expenses, "
-            f"{_format_money(revenue - expenses)} net income."
+    vacant_count = vacant_units.count()
+    if not vacant_count:
+        return {"lines": []}
+
+    lines = [f"Vacant units: {vacant_count}"]
+    for unit in vacant_units[:10]:
+        rent_display = f"{unit.rent_amount:.2f}" if unit.rent_amount is not None else "0.00"
+        lines.append(
+            f"  {unit.property.name} - Unit {unit.unit_number} "
+            f"({unit.bedrooms}BR, ${rent_display}/mo)"
         )
+    return {"lines": lines}
 
-    def add_lease_expirations(_parts):
-        today = date.today()
-        expiring_soon = Lease.objects.filter(
-            unit__property__organization=organization,
-            is_active=True,
-            end_date__lte=today + timedelta(days=60),
-            end_date__gte=today,
-        ).order_by("end_date")
 
-        if not expiring_soon:
-            return
+# (name, builder, models whose writes invalidate the section, depends on today's date)
+# Section names are used in cache keys, so they must stay free of spaces.
+CONTEXT_SECTIONS = [
+    ("portfolio", _portfolio_section, (Property, Unit, Tenant, Lease), False),
+    ("property-details", _property_details_section, (Property, Unit, Lease), False),
+    ("recent-payments", _recent_payments_section, (Payment,), True),
+    ("outstanding-balances", _outstanding_balances_section, (RentLedgerEntry, Tenant, Unit, Property, Lease), False),
+    ("maintenance", _maintenance_section, (MaintenanceRequest, Unit, Property), False),
+    ("accounting", _accounting_section, (JournalEntry, JournalEntryLine, AccountingCategory), True),
+    ("lease-expirations", _lease_expirations_section, (Lease, Tenant, Unit, Property), True),
+    ("vacancy", _vacant_units_section, (Unit, Property, Lease), False),
+]
 
-        context_parts.append(
-            f"Leases expiring in next 60 days: {expiring_soon.count()}"
-        )
-        for lease in expiring_soon[:10]:
-            tenant_name = f"{lease.tenant.first_name} {lease.tenant.last_name}"
-            context_parts.append(
-                f"  {tenant_name} - Unit {lease.unit.unit_number} at {lease.unit.property.name}: "
-                f"expires {lease.end_date}"
-            )
+CONTEXT_CACHE_PREFIX = "ai-context"
 
-    def add_vacant_units(_parts):
-        vacant_units = units.exclude(id__in=Lease.objects.filter(is_active=True).values("unit_id"))
-        if not vacant_units:
-            return
 
-        context_parts.append(f"Vacant units: {vacant_units.count()}")
-        for unit in vacant_units[:10]:
-            rent_display = f"{unit.rent_amount:.2f}" if unit.rent_amount is not None else "0.00"
-            context_parts.append(
-                f"  {unit.property.name} - Unit {unit.unit_number} "
-                f"({unit.bedrooms}BR, ${rent_display}/mo)"
-            )
+def _build_section(name, builder, organization):
+    try:
+        return builder(organization)
+    except Exception:
+        # Keep the API resilient: return partial context even when one section fails.
+        logger.exception("Failed to build AI context section %r", name)
+        return None
 
-    _safe_context_append(context_parts, "portfolio", add_portfolio_summary)
-    _safe_context_append(context_parts, "property details", add_property_details)
-    _safe_context_append(context_parts, "recent payments", add_recent_payments)
-    _safe_context_append(context_parts, "outstanding balances", add_outstanding_balances)
-    _safe_context_append(context_parts, "maintenance", add_maintenance_requests)
-    _safe_context_append(context_parts, "accounting", add_accounting_summary)
-    _safe_context_append(context_parts, "lease expirations", add_lease_expirations)
-    _safe_context_append(context_parts, "vacancy", add_vacant_units)
 
-    context_summary = f"{properties_count} properties, {units_count} units"
+def gather_context(organization):
+    """Build a compact text summary of the landlord's portfolio for the AI context.
+
+    Each section is cached per organization and stamped with the data version
+    of the models it reads, so a chat turn only rebuilds the sections whose
+    underlying data changed since the last turn. Nothing is cached while the
+    default cache is process-local (see `cache_shared`). Sections are read
+    from the replica when one is configured.
+    """
+    organization_id = organization.id if organization is not None else None
+    with replica_reads(organization_id=organization_id):
+        sections = {}
+        if organization is None or not cache_shared():
+            for name, builder, _models, _daily in CONTEXT_SECTIONS:
+                sections[name] = _build_section(name, builder, organization)
+        else:
+            labels = {model._meta.label_lower for _, _, models, _ in CONTEXT_SECTIONS for model in models}
+            versions = get_versions(organization.id, labels)
+            today = date.today().isoformat()
+
+            stamps = {}
+            for name, _builder, models, daily in CONTEXT_SECTIONS:
+                stamp = "|".join(
+                    f"{label}:{versions[label]}"
+                    for label in sorted(model._meta.label_lower for model in models)
+                )
+                stamps[name] = f"{stamp}|day:{today}" if daily else stamp
+
+            cache_keys = {name: f"{CONTEXT_CACHE_PREFIX}:{organization.id}:{name}" for name in stamps}
+            cached = cache.get_many(list(cache_keys.values()))
+            refreshed = {}
+            for name, builder, _models, _daily in CONTEXT_SECTIONS:
+                entry = cached.get(cache_keys[name])
+                if entry and entry.get("stamp") == stamps[name]:
+                    sections[name] = entry["section"]
+                    continue
+                section = _build_section(name, builder, organization)
+                sections[name] = section
+                if section is not None:
+                    refreshed[cache_keys[name]] = {"stamp": stamps[name], "section": section}
+            if refreshed:
+                cache.set_many(refreshed, None)
+
+    context_parts = []
+    for name, *_ in CONTEXT_SECTIONS:
+        if sections.get(name):
+            context_parts.extend(sections[name]["lines"])
+
+    portfolio = sections.get("portfolio") or {}
+    context_summary = portfolio.get("summary", "0 properties, 0 units")
     return "\n".join(context_parts), context_summary
 
 
-def call_llm(system_prompt, messages, provider="anthropic"):
-    provider = (provider or "anthropic").lower()
+class LlmProviderError(Exception):
+    """Raised when a chat provider is not configured or answers with an error."""
+
+
+MISSING_API_KEY_MESSAGE = (
+    "The AI assistant requires an API key. Add ANTHROPIC_API_KEY or OPENAI_API_KEY to your .env file."
+)
 
-    if provider == "openai":
-        api_key = os.environ.get("OPENAI_API_KEY", "").strip()
-        if not api_key:
-            return "The AI assistant requires an API key. Add ANTHROPIC_API_KEY or OPENAI_API_KEY to your .env file."
 
+def _system_blocks(system_prompt):
+    """Normalize a system prompt to `[{"text": ..., "cache": bool}]` blocks.
+
+    Callers may pass a plain string or a list of blocks; blocks flagged with
+    `cache` form the stable prefix that providers can serve from their
+    prompt cache.
+    """
+    if isinstance(system_prompt, str):
+        return [{"text": system_prompt}]
+    return [block for block in system_prompt if block.get("text")]
+
+
+def _anthropic_system(system_prompt):
+    blocks = _system_blocks(system_prompt)
+    if not any(block.get("cache") for block in blocks):
+        return "\n\n".join(block["text"] for block in blocks)
+    system = []
+    for block in blocks:
+        entry = {"type": "text", "text": block["text"]}
+        if block.get("cache"):
+            entry["cache_control"] = {"type": "ephemeral"}
+        system.append(entry)
+    return system
+
+
+def _openai_messages(system_prompt, messages):
+    # OpenAI caches identical prompt prefixes automatically, so the stable
+    # blocks only need to come first.
+    return [
+        {"role": "system", "content": block["text"]} for block in _system_blocks(system_prompt)
+    ] + messages
+
+
+def _llm_request(provider, api_key, system_prompt, messages):
+    """Build a `ProviderCall` posting the conversation to `provider`'s chat API."""
+    session = requests.Session()
+    if provider == "openai":
+        url = "https://api.openai.com/v1/chat/completions"
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {api_key}",
+        }
         payload = {
             "model": "gpt-4o-mini",
-            "messages": [{"role": "system", "content": system_prompt}] + messages,
+            "messages": _openai_messages(system_prompt, messages),
             "max_tokens": 1024,
         }
-        try:
-            response = requests.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {api_key}",
-                },
-                json=payload,
-                timeout=30,
-            )
-            if response.status_code == 200:
-                data = response.json()
-                return data["choices"][0]["message"]["content"]
-            return f"AI service error: {response.status_code}"
-        except requests.Timeout:
-            return "The AI service is taking too long. Please try again."
-        except requests.RequestException:
-            return "AI service error: unable to reach provider."
-
-    api_key = os.environ.get("ANTHROPIC_API_KEY", "").strip()
-    if not api_key:
-        return "The AI assistant requires an API key. Add ANTHROPIC_API_KEY or OPENAI_API_KEY to your .env file."
+    else:
+        url = "https://api.anthropic.com/v1/messages"
+        headers = {
+            "Content-Type": "application/json",
+            "x-api-key": api_key,
+            "anthropic-version": "2023-06-01",
+        }
+        payload = {
+            "model": "claude-sonnet-4-20250514",
+            "max_tokens": 1024,
+            "system": _anthropic_system(system_prompt),
+            "messages": messages,
+        }
+
+    def run():
+        with session:
+            response = session.post(url, headers=headers, json=payload, timeout=30)
+        if response.status_code != 200:
+            raise LlmProviderError(f"AI service error: {response.status_code}")
+        data = response.json()
+        if provider == "openai":
+            return data["choices"][0]["message"]["content"]
+        return data["content"][0]["text"]
 
-    payload = {
-        "model": "claude-sonnet-4-20250514",
-        "max_tokens": 1024,
-        "system": system_prompt,
-        "messages": messages,
+    return ProviderCall(provider, run, cancel=session.close)
+
+
+def complete_llm(system_prompt, messages, provider="anthropic"):
+    """Return the full provider response, raising `LlmProviderError` or `requests` errors."""
+    provider = (provider or "anthropic").lower()
+    if provider == "fake":
+        return "".join(_fake_stream(messages, threading.Event()))
+    if provider != "openai":
+        provider = "anthropic"
+
+    api_keys = {
+        "anthropic": os.environ.get("ANTHROPIC_API_KEY", "").strip(),
+        "openai": os.environ.get("OPENAI_API_KEY", "").strip(),
     }
+    if not api_keys[provider]:
+        raise LlmProviderError(MISSING_API_KEY_MESSAGE)
+
+    calls = [_llm_request(provider, api_keys[provider], system_prompt, messages)]
+    secondary = "anthropic" if provider == "openai" else "openai"
+    if hedging_enabled() and api_keys[secondary]:
+        calls.append(_llm_request(secondary, api_keys[secondary], system_prompt, messages))
+
+    if len(calls) > 1:
+        _provider, text = hedged_call(calls)
+        return text
+    return calls[0].run()
+
+
+def _llm_error_message(error):
+    if isinstance(error, LlmProviderError):
+        return str(error)
+    if isinstance(error, requests.Timeout):
+        return "The AI service is taking too long. Please try again."
+    return "AI service error: unable to reach provider."
+
+
+def call_llm(system_prompt, messages, provider="anthropic"):
     try:
+        return complete_llm(system_prompt, messages, provider)
+    except (LlmProviderError, requests.RequestException) as e:
+        return _llm_error_message(e)
+
+
+FAKE_STREAM_REPLY = "This is a streamed response from the local test provider."
+
+
+def _fake_stream(messages, cancel_event):
+    """Local streaming provider (AI_PROVIDER=fake) for tests and offline development."""
+    delay = float(os.environ.get("AI_FAKE_STREAM_DELAY", "0") or 0)
+    for idx, word in enumerate(FAKE_STREAM_REPLY.split(" ")):
+        if cancel_event.is_set():
+            return
+        if delay:
+            time.sleep(delay)
+        yield word if idx == 0 else f" {word}"
+
+
+def _iter_sse_data(response, cancel_event):
+    """Yield decoded `data:` payloads from a server-sent events HTTP response."""
+    for raw_line in response.iter_lines(decode_unicode=True):
+        if cancel_event.is_set():
+            return
+        if not raw_line or not raw_line.startswith("data:"):
+            continue
+        data = raw_line[5:].strip()
+        if data == "[DONE]":
+            return
+        try:
+            yield json.loads(data)
+        except json.JSONDecodeError:
+            continue
+
+
+def stream_llm(system_prompt, messages, provider="anthropic", cancel_event=None):
+    """Yield response text deltas from the provider's streaming API.
+
+    Setting `cancel_event` (or closing the generator) stops reading and closes
+    the upstream connection, so a disconnected client stops provider usage.
+    Raises `LlmProviderError` on non-200 responses.
+    """
+    cancel_event = cancel_event or threading.Event()
+    provider = (provider or "anthropic").lower()
+    if provider == "fake":
+        yield from _fake_stream(messages, cancel_event)
+        return
+    if provider != "openai":
+        provider = "anthropic"
+
+    api_key = os.environ.get(
+        "OPENAI_API_KEY" if provider == "openai" else "ANTHROPIC_API_KEY", ""
+    ).strip()
+    if not api_key:
+        raise LlmProviderError(MISSING_API_KEY_MESSAGE)
+
+    if provider == "openai":
+        response = requests.post(
+            "https://api.openai.com/v1/chat/completions",
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {api_key}",
+            },
+            json={
+                "model": "gpt-4o-mini",
+                "messages": _openai_messages(system_prompt, messages),
+                "max_tokens": 1024,
+                "stream": True,
+            },
+            timeout=30,
+            stream=True,
+        )
+    else:
         response = requests.post(
             "https://api.anthropic.com/v1/messages",
             headers={
@@ -280,26 +512,197 @@ def call_llm(system_prompt, messages, provider="anthropic"):
                 "x-api-key": api_key,
                 "anthropic-version": "2023-06-01",
             },
-            json=payload,
+            json={
+                "model": "claude-sonnet-4-20250514",
+                "max_tokens": 1024,
+                "system": _anthropic_system(system_prompt),
+                "messages": messages,
+                "stream": True,
+            },
             timeout=30,
+            stream=True,
         )
-        if response.status_code == 200:
-            data = response.json()
-            return data["content"][0]["text"]
-        return f"AI service error: {response.status_code}"
-    except requests.Timeout:
-        return "The AI service is taking too long. Please try again."
-    except requests.RequestException:
-        return "AI service error: unable to reach provider."
+
+    with response:
+        if response.status_code != 200:
+            raise LlmProviderError(f"AI service error: {response.status_code}")
+        for event in _iter_sse_data(response, cancel_event):
+            if provider == "openai":
+                choices = event.get("choices") or [{}]
+                text = (choices[0].get("delta") or {}).get("content")
+            elif event.get("type") == "error":
+                raise LlmProviderError(
+                    f"AI service error: {(event.get('error') or {}).get('message', 'stream failed')}"
+                )
+            else:
+                delta = event.get("delta") or {}
+                text = delta.get("text") if event.get("type") == "content_block_delta" else None
+            if text:
+                yield text
+
+
+def _sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _chat_event_stream(
+    system_prompt, conversation, provider, context_summary, cancel_event, on_complete=None, extra=None
+):
+    # `on_complete` may add to `extra` (a new session's id) before `done`.
+    extra = {} if extra is None else extra
+    yield _sse_event("start", {"context_summary": context_summary, **extra})
+    chunks = []
+    try:
+        for text in stream_llm(system_prompt, conversation, provider, cancel_event):
+            chunks.append(text)
+            yield _sse_event("delta", {"text": text})
+    except (LlmProviderError, requests.RequestException) as e:
+        yield _sse_event("error", {"detail": _llm_error_message(e)})
+        return
+    if cancel_event.is_set():
+        return
+    message = "".join(chunks)
+    if on_complete:
+        on_complete(message)
+    yield _sse_event("done", {"message": message, "context_summary": context_summary, **extra})
+
+
+async def _async_event_stream(events, cancel_event):
+    """Drive a sync event generator from ASGI without blocking the event loop.
+
+    Chunks are pulled on the request's sync thread, so database work done by
+    the generator (saving the chat turn) shares the view's connection.
+    Django cancels this coroutine when the client disconnects; the cancel event
+    then makes the provider stream stop at its next chunk.
+    """
+    sentinel = object()
+    try:
+        while True:
+            chunk = await sync_to_async(next)(events, sentinel)
+            if chunk is sentinel:
+                break
+            yield chunk
+    finally:
+        cancel_event.set()
+        if not events.gi_running:
+            events.close()
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Lets clients negotiate `text/event-stream`; plain responses become one `error` event."""
+
+    media_type = "text/event-stream"
+    format = "event-stream"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return _sse_event("error", data).encode(self.charset)
+
+
+def _wants_stream(request, payload):
+    if str(payload.get("stream", "")).strip().lower() in {"1", "true", "yes"}:
+        return True
+    return "text/event-stream" in request.META.get("HTTP_ACCEPT", "")
+
+
+DEFAULT_HISTORY_TOKEN_BUDGET = 4000
+SUMMARY_LINE_CHARS = 200
+
+
+def _estimate_tokens(text):
+    # Rough provider-agnostic estimate (~4 characters per token).
+    return max(1, len(text or "") // 4)
+
+
+def _history_token_budget():
+    try:
+        return int(os.environ.get("AI_CHAT_HISTORY_TOKENS", DEFAULT_HISTORY_TOKEN_BUDGET))
+    except (TypeError, ValueError):
+        return DEFAULT_HISTORY_TOKEN_BUDGET
+
+
+def _fold_into_summary(summary, messages, budget):
+    lines = [line for line in summary.splitlines() if line.strip()]
+    for message in messages:
+        content = " ".join(message["content"].split())
+        if len(content) > SUMMARY_LINE_CHARS:
+            content = content[: SUMMARY_LINE_CHARS - 3] + "..."
+        lines.append(f"- {message['role'].capitalize()}: {content}")
+
+    # The summary gets a quarter of the history budget; drop the oldest lines first.
+    max_chars = max(budget, SUMMARY_LINE_CHARS)
+    while len(lines) > 1 and sum(len(line) + 1 for line in lines) > max_chars:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+def trim_session_history(session, budget=None):
+    """Return the live turns of `session`, folding the oldest into its summary.
+
+    Turns beyond the token budget are condensed into `session.summary` and
+    excluded from future payloads via `summary_cursor`, so the request size
+    stays bounded however long the conversation grows.
+    """
+    budget = budget or _history_token_budget()
+    live = list(
+        session.messages.filter(id__gt=session.summary_cursor).values("id", "role", "content")
+    )
+    total = sum(_estimate_tokens(message["content"]) for message in live)
+
+    folded = []
+    while live and total > budget:
+        message = live.pop(0)
+        total -= _estimate_tokens(message["content"])
+        folded.append(message)
+    # Providers expect the conversation to open with a user turn.
+    while live and live[0]["role"] != ChatMessage.ROLE_USER:
+        folded.append(live.pop(0))
+
+    if folded:
+        session.summary = _fold_into_summary(session.summary, folded, budget)
+        session.summary_cursor = folded[-1]["id"]
+        session.save(update_fields=["summary", "summary_cursor", "updated_at"])
+
+    return [{"role": message["role"], "content": message["content"]} for message in live]
+
+
+def record_chat_turn(session, user_message, reply):
+    ChatMessage.objects.bulk_create(
+        [
+            ChatMessage(session=session, role=ChatMessage.ROLE_USER, content=user_message),
+            ChatMessage(session=session, role=ChatMessage.ROLE_ASSISTANT, content=reply),
+        ]
+    )
+    session.save(update_fields=["updated_at"])
+
+
+def build_chat_system_prompt(context, summary=""):
+    """System prompt blocks: the cacheable instructions+portfolio prefix, then the session summary."""
+    prefix = (
+        "You are the Onyx PM AI Assistant — a helpful, knowledgeable property management assistant.\n"
+        "You have access to the landlord's real portfolio data. Use it to answer questions accurately.\n"
+        "Be concise and direct. Use specific numbers and names from the data.\n"
+        "If you don't have enough data to answer, say so honestly.\n"
+        "Format currency as $X,XXX.XX. Use the tenant and property names from the data.\n\n"
+        f"Current date: {date.today().isoformat()}\n\n"
+        "PORTFOLIO DATA:\n"
+        f"{context}"
+    )
+    blocks = [{"text": prefix, "cache": True}]
+    if summary:
+        blocks.append({"text": f"Summary of earlier conversation:\n{summary}"})
+    return blocks
 
 
 class AiChatView(APIView):
     permission_classes = [IsAuthenticated]
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + [EventStreamRenderer]
 
     # AI Assistant Configuration:
-    # AI_PROVIDER=anthropic  # or openai
+    # AI_PROVIDER=anthropic  # or openai, or fake (local streaming test provider)
     # ANTHROPIC_API_KEY=your-key-here
     # OPENAI_API_KEY=your-key-here
+    # AI_CHAT_HISTORY_TOKENS=4000  # live session history kept verbatim per turn
 
     def post(self, request):
         organization = resolve_request_organization(request)
@@ -309,39 +712,109 @@ class AiChatView(APIView):
         if not user_message:
             return Response({"detail": "message is required."}, status=400)
 
+        # Clients either send `session_id` (history lives server-side) or the
+        # legacy `history` list; a request with neither starts a new session,
+        # saved together with its first successful reply.
+        session = None
+        session_id = payload.get("session_id")
         history = payload.get("history") or []
-        conversation = []
-        for msg in history:
-            if not isinstance(msg, dict):
-                continue
-            role = str(msg.get("role", "")).strip().lower()
-            content = str(msg.get("content", "")).strip()
-            if role in {"user", "assistant"} and content:
-                conversation.append({"role": role, "content": content})
+        if session_id:
+            try:
+                session_id = int(session_id)
+            except (TypeError, ValueError):
+                return Response({"detail": "session_id must be an integer."}, status=400)
+            session = ChatSession.objects.filter(id=session_id, user=request.user).first()
+            if session is None:
+                return Response({"detail": "Chat session not found."}, status=404)
+        new_session = not session_id and not history
+
+        if session:
+            conversation = trim_session_history(session)
+        else:
+            conversation = []
+            for msg in history:
+                if not isinstance(msg, dict):
+                    continue
+                role = str(msg.get("role", "")).strip().lower()
+                content = str(msg.get("content", "")).strip()
+                if role in {"user", "assistant"} and content:
+                    conversation.append({"role": role, "content": content})
         conversation.append({"role": "user", "content": user_message})
 
         context, context_summary = gather_context(organization)
-        system_prompt = (
-            "You are the Onyx PM AI Assistant — a helpful, knowledgeable property management assistant.\n"
-            "You have access to the landlord's real portfolio data. Use it to answer questions accurately.\n"
-            "Be concise and direct. Use specific numbers and names from the data.\n"
-            "If you don't have enough data to answer, say so honestly.\n"
-            "Format currency as $X,XXX.XX. Use the tenant and property names from the data.\n\n"
-            f"Current date: {date.today().isoformat()}\n\n"
-            "PORTFOLIO DATA:\n"
-            f"{context}"
-        )
+        system_prompt = build_chat_system_prompt(context, session.summary if session else "")
+
+        provider = str(
+            request.META.get("AI_PROVIDER", os.environ.get("AI_PROVIDER", "anthropic"))
+        ).strip()
+        extra = {"session_id": session.id} if session else {}
+
+        save_turn = None
+        if session or new_session:
+            def save_turn(reply):
+                nonlocal session
+                with shard_atomic():
+                    if session is None:
+                        session = ChatSession.objects.create(
+                            user=request.user,
+                            organization=organization,
+                            title=user_message[:200],
+                        )
+                    record_chat_turn(session, user_message, reply)
+                extra["session_id"] = session.id
+
+        if _wants_stream(request, payload):
+            return self.stream_response(
+                request, system_prompt, conversation, provider, context_summary, save_turn, extra
+            )
 
-        provider = request.META.get("AI_PROVIDER", os.environ.get("AI_PROVIDER", "anthropic"))
-        ai_response = call_llm(
-            system_prompt=system_prompt,
-            messages=conversation,
-            provider=str(provider).strip(),
-        )
+        try:
+            ai_response = complete_llm(system_prompt, conversation, provider)
+        except (LlmProviderError, requests.RequestException) as e:
+            ai_response = _llm_error_message(e)
+        else:
+            if save_turn:
+                save_turn(ai_response)
 
         return Response(
             {
                 "message": ai_response,
                 "context_summary": context_summary,
+                **extra,
             }
         )
+
+    def stream_response(
+        self, request, system_prompt, conversation, provider, context_summary, on_complete=None, extra=None
+    ):
+        """Relay the provider stream as server-sent events (`start`, `delta`, `done`/`error`)."""
+        cancel_event = threading.Event()
+        events = _chat_event_stream(
+            system_prompt, conversation, provider, context_summary, cancel_event, on_complete, extra
+        )
+        if isinstance(getattr(request, "_request", request), ASGIRequest):
+            events = _async_event_stream(events, cancel_event)
+
+        response = StreamingHttpResponse(events, content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+
+class ChatSessionViewSet(
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    """The current user's persisted AI chat sessions."""
+
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return ChatSession.objects.filter(user=self.request.user)
+
+    def get_serializer_class(self):
+        if self.action == "retrieve":
+            return ChatSessionDetailSerializer
+        return ChatSessionSerializer
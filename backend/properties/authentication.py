@@ -0,0 +1,162 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from .cache_versions import cache_shared, initial_version
+from .models import UserProfile
+
+# Profile claims carried in access and refresh tokens. "pv" is the profile
+# version the claims were read at; any save of the user or profile advances
+# it, after which the claims are no longer trusted.
+PROFILE_CLAIMS = ("org_id", "role", "tenant_id", "is_org_admin")
+PROFILE_VERSION_CLAIM = "pv"
+PROFILE_VERSION_KEY_PREFIX = "authver"
+
+
+def _profile_version_key(user_id):
+    return f"{PROFILE_VERSION_KEY_PREFIX}:{user_id}"
+
+
+def profile_version(user_id):
+    key = _profile_version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, initial_version(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_profile_version(user_id):
+    """Invalidate the profile claims of every token issued to `user_id`."""
+    key = _profile_version_key(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, initial_version(), None)
+
+
+def profile_claims(profile):
+    if profile is None:
+        return dict.fromkeys(PROFILE_CLAIMS)
+    return {
+        "org_id": profile.organization_id,
+        "role": profile.role,
+        "tenant_id": profile.tenant_id,
+        "is_org_admin": profile.is_org_admin,
+    }
+
+
+def add_profile_claims(token, user_id):
+    # Read the version first: a save landing in between leaves the token
+    # with an older version, never with newer claims than it vouches for.
+    version = profile_version(user_id)
+    claims = profile_claims(UserProfile.objects.filter(user_id=user_id).first())
+    for name, value in claims.items():
+        token[name] = value
+    token[PROFILE_VERSION_CLAIM] = version
+    return token
+
+
+def trusted_claims(validated_token):
+    """The token's profile claims if they are still current, else None."""
+    version = validated_token.get(PROFILE_VERSION_CLAIM)
+    # Versions in a process-local cache miss changes made by other workers.
+    if version is None or not getattr(settings, "AUTH_TRUST_TOKEN_CLAIMS", False) or not cache_shared():
+        return None
+    user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+    if user_id is None or cache.get(_profile_version_key(user_id)) != version:
+        return None
+    return {name: validated_token.get(name) for name in PROFILE_CLAIMS}
+
+
+def request_claims(request):
+    """Trusted profile claims of the authenticated user, or None.
+
+    None means the caller must look at `request.user.profile` instead, e.g.
+    for session or force-authenticated users and tokens with stale claims.
+    """
+    user = getattr(request, "user", None)
+    if type(user) is ClaimsUser:
+        return user.__dict__["claims"]
+    return None
+
+
+class ClaimsUser(SimpleLazyObject):
+    """`request.user` for a token with current profile claims.
+
+    The id and claims are known up front; the `User` row is only loaded the
+    first time a view touches any other attribute.
+    """
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, user_id, claims, loader):
+        super().__init__(loader)
+        self.__dict__["id"] = self.__dict__["pk"] = user_id
+        self.__dict__["claims"] = claims
+
+    def __bool__(self):
+        return True
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWT authentication that trusts current profile claims instead of the database.
+
+    Tokens without claims, or whose profile version has moved on, take the
+    regular path that loads the user. `is_active` is always read from the
+    database, since deactivations made with `update()` bump no version.
+    """
+
+    def _is_active(self, user_id):
+        return bool(
+            self.user_model.objects.filter(**{api_settings.USER_ID_FIELD: user_id})
+            .values_list("is_active", flat=True)
+            .first()
+        )
+
+    def get_user(self, validated_token):
+        claims = trusted_claims(validated_token)
+        if claims is not None and self._is_active(validated_token[api_settings.USER_ID_CLAIM]):
+            return ClaimsUser(
+                validated_token[api_settings.USER_ID_CLAIM],
+                claims,
+                lambda: super(ClaimsJWTAuthentication, self).get_user(validated_token),
+            )
+
+        user = super().get_user(validated_token)
+        version = validated_token.get(PROFILE_VERSION_CLAIM)
+        if version is not None and cache.get(_profile_version_key(user.id)) is None:
+            # The version counter was evicted; re-adopt the token's version
+            # when its claims still match the profile.
+            profile = UserProfile.objects.filter(user=user).first()
+            if profile_claims(profile) == {name: validated_token.get(name) for name in PROFILE_CLAIMS}:
+                cache.add(_profile_version_key(user.id), version, None)
+        return user
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        return add_profile_claims(super().get_token(user), user.id)
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refresh tokens with claims re-read from the current profile."""
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        user_id = RefreshToken(attrs["refresh"], verify=False).get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return data
+        data["access"] = str(add_profile_claims(AccessToken(data["access"]), user_id))
+        if "refresh" in data:
+            data["refresh"] = str(add_profile_claims(RefreshToken(data["refresh"]), user_id))
+        return data
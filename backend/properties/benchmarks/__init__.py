@@ -0,0 +1,15 @@
+"""Timed hot paths for `manage.py run_benchmarks`.
+
+Point the command at a database filled by `manage.py generate_load_data`.
+"""
+
+from .harness import (
+    BENCHMARKS,
+    BenchmarkContext,
+    BenchmarkError,
+    benchmark,
+    compare_results,
+    run_benchmark,
+    run_benchmarks,
+)
+from . import cases  # registers the hot paths with BENCHMARKS
@@ -0,0 +1,117 @@
+import random
+from datetime import date, timedelta
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
+
+from properties.management.commands.run_agents import run_organization_scan
+from properties.models import AccountingCategory, ImportedTransaction, RentLedgerEntry
+from properties.request_cache import request_cache_scope
+from properties.sharding import organization_scope
+
+from .harness import benchmark
+
+IMPORT_ROWS = 500
+IMPORT_MAPPING = {
+    "date_column": "Date",
+    "description_column": "Description",
+    "amount_column": "Amount",
+    "reference_column": "Reference",
+}
+
+
+def _account(context, code):
+    return AccountingCategory.objects.get(organization=context.organization, account_code=code)
+
+
+def _bank_csv():
+    rng = random.Random(0)
+    today = timezone.now().date()
+    lines = ["Date,Description,Amount,Reference"]
+    for number in range(IMPORT_ROWS):
+        row_date = today - timedelta(days=rng.randint(0, 60))
+        amount = rng.randint(-250000, 150000) / 100
+        lines.append(f"{row_date:%m/%d/%Y},BENCH VENDOR {rng.randint(1, 80)},{amount:.2f},BM{number}")
+    return SimpleUploadedFile("bench.csv", "\n".join(lines).encode(), content_type="text/csv")
+
+
+def _uploaded_import(context):
+    response = context.post(
+        "/api/accounting/imports/", {"file": _bank_csv()}, format="multipart"
+    )
+    return response.data["import"]["id"]
+
+
+def _report(url, params=None):
+    def case(context):
+        resolved = params(context) if callable(params) else params
+        return lambda: context.get(url, resolved)
+
+    return case
+
+
+benchmark("trial-balance")(_report("/api/accounting/reports/trial-balance/"))
+benchmark("balance-sheet")(_report("/api/accounting/reports/balance-sheet/"))
+benchmark("general-ledger")(
+    _report(
+        "/api/accounting/reports/general-ledger/",
+        lambda context: {"account_id": _account(context, "1020").id},
+    )
+)
+benchmark("pnl")(_report("/api/accounting/pnl/"))
+benchmark("dashboard")(_report("/api/accounting/dashboard/"))
+benchmark("rent-roll")(_report("/api/accounting/rent-roll/"))
+
+
+@benchmark("import-confirm")
+def import_confirm(context):
+    import_id = _uploaded_import(context)
+    return lambda: context.post(
+        f"/api/accounting/imports/{import_id}/confirm-mapping/", IMPORT_MAPPING
+    )
+
+
+@benchmark("import-book")
+def import_book(context):
+    import_id = _uploaded_import(context)
+    context.post(f"/api/accounting/imports/{import_id}/confirm-mapping/", IMPORT_MAPPING)
+    ImportedTransaction.objects.filter(transaction_import_id=import_id).update(
+        status=ImportedTransaction.STATUS_APPROVED,
+        category=_account(context, "5100"),
+    )
+    return lambda: context.post(f"/api/accounting/imports/{import_id}/book/")
+
+
+@benchmark("auto-reconcile")
+def auto_reconcile(context):
+    month_start = timezone.now().date().replace(day=1)
+    period_start = (month_start - timedelta(days=1)).replace(day=1)
+    payload = {
+        "account": _account(context, "1020").id,
+        "start_date": period_start.isoformat(),
+        "end_date": (month_start - timedelta(days=1)).isoformat(),
+        "statement_ending_balance": "0.00",
+    }
+    return lambda: context.post("/api/accounting/reconciliations/", payload)
+
+
+@benchmark("generate-charges")
+def generate_charges(context):
+    # Generated datasets already hold this month's charges; clear them so
+    # the run creates a charge per active lease instead of skipping.
+    today = timezone.now().date()
+    RentLedgerEntry.objects.filter(
+        organization=context.organization,
+        entry_type=RentLedgerEntry.TYPE_CHARGE,
+        date__gte=date(today.year, today.month, 1),
+    ).delete()
+    return lambda: context.post("/api/accounting/generate-charges/")
+
+
+@benchmark("agent-scans")
+def agent_scans(context):
+    def run():
+        with request_cache_scope(), organization_scope(context.organization):
+            run_organization_scan(context.organization)
+
+    return run
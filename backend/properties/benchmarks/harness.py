@@ -0,0 +1,148 @@
+import contextlib
+import statistics
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+from properties.metrics import QueryRecorder
+from properties.sharding import organization_db
+
+METRICS = ("wall_seconds", "queries", "peak_memory_bytes")
+
+# Wall-time changes smaller than this are noise, whatever the ratio.
+MIN_WALL_SECONDS_DELTA = 0.01
+
+BENCHMARKS = {}
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+def benchmark(name):
+    """Register a hot path.
+
+    The decorated function receives a `BenchmarkContext`, performs any
+    untimed setup and returns the zero-argument callable to time. Each run
+    happens in a transaction that is rolled back, so paths that write leave
+    the dataset unchanged.
+    """
+
+    def decorator(func):
+        BENCHMARKS[name] = func
+        return func
+
+    return decorator
+
+
+class BenchmarkContext:
+    """The organization under test and an authenticated API client for its owner."""
+
+    def __init__(self, organization, user):
+        self.organization = organization
+        self.user = user
+        host = next((host.lstrip(".") for host in settings.ALLOWED_HOSTS if host != "*"), "localhost")
+        self.client = APIClient(HTTP_HOST=host)
+        self.client.force_authenticate(user)
+
+    def _check(self, method, url, response):
+        if response.status_code >= 400:
+            raise BenchmarkError(
+                f"{method} {url} returned {response.status_code}: {response.content[:300]!r}"
+            )
+        return response
+
+    def get(self, url, params=None):
+        return self._check("GET", url, self.client.get(url, params or {}))
+
+    def post(self, url, data=None, format="json"):
+        return self._check("POST", url, self.client.post(url, data or {}, format=format))
+
+
+def _timed(run):
+    recorder = QueryRecorder()
+    with contextlib.ExitStack() as stack:
+        recorder.wrap_connections(stack)
+        started = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - started
+    return elapsed, recorder.count
+
+
+def _traced(run):
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _in_rollback(context, case, measure):
+    # A sharded organization's rows live outside the default database.
+    aliases = {DEFAULT_DB_ALIAS, organization_db(context.organization)}
+    with contextlib.ExitStack() as stack:
+        for alias in aliases:
+            stack.enter_context(transaction.atomic(using=alias))
+        result = measure(case(context))
+        for alias in aliases:
+            transaction.set_rollback(True, using=alias)
+    return result
+
+
+def run_benchmark(context, name, repeat=3):
+    """Time `repeat` runs of one path, then trace one more for peak memory.
+
+    Memory is traced separately because tracemalloc slows the code it
+    watches several times over.
+    """
+    case = BENCHMARKS[name]
+    timings = []
+    queries = 0
+    for _ in range(repeat):
+        elapsed, queries = _in_rollback(context, case, _timed)
+        timings.append(elapsed)
+    peak = _in_rollback(context, case, _traced)
+    return {
+        "wall_seconds": round(statistics.median(timings), 6),
+        "wall_seconds_min": round(min(timings), 6),
+        "queries": queries,
+        "peak_memory_bytes": peak,
+    }
+
+
+def run_benchmarks(context, names=None, repeat=3):
+    unknown = set(names or ()) - set(BENCHMARKS)
+    if unknown:
+        raise BenchmarkError(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+    results = {}
+    # Cached reports would time a cache read, not the report.
+    with override_settings(REPORT_CACHE_ENABLED=False):
+        for name in names or BENCHMARKS:
+            results[name] = run_benchmark(context, name, repeat=repeat)
+    return results
+
+
+def compare_results(baseline, current, threshold):
+    """Regressions of `current` over `baseline` beyond the `threshold` ratio.
+
+    Returns `(name, metric, baseline_value, current_value)` tuples. Paths
+    missing from either side are not compared.
+    """
+    regressions = []
+    for name, result in current.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        for metric in METRICS:
+            old, new = before.get(metric), result.get(metric)
+            if old is None or new is None or new <= old * (1 + threshold):
+                continue
+            if metric == "wall_seconds" and new - old < MIN_WALL_SECONDS_DELTA:
+                continue
+            regressions.append((name, metric, old, new))
+    return regressions
@@ -1,9 +1,8 @@
 from datetime import date, timedelta
 from decimal import Decimal
 
-from django.db.models import Count, Sum
+from django.db.models import Count, Q, Sum
 from django.utils import timezone
-from django.db import transaction as db_transaction
 from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError
@@ -13,6 +12,8 @@ from rest_framework.response import Response
 from .mixins import OrganizationQuerySetMixin, resolve_request_organization
 from .models import Bill, BillPayment, Vendor, AccountingCategory, JournalEntry
 from .permissions import IsLandlord
+from .report_cache import cached_report
+from .sharding import shard_atomic
 from .serializers import (
     BillCreateSerializer,
     BillListSerializer,
@@ -51,6 +52,9 @@ def _coerce_bool(value):
     return None
 
 
+VENDOR_BILL_STAT_FIELDS = {"total_bills", "total_paid", "outstanding_balance", "bill_count_by_status"}
+
+
 class VendorViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet):
     queryset = Vendor.objects.all()
     permission_classes = [IsAuthenticated, IsLandlord]
@@ -60,6 +64,15 @@ class VendorViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet):
             return VendorListSerializer
         return VendorSerializer
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = self.sparse_fields()
+        needs_bill_stats = fields is None or fields & VENDOR_BILL_STAT_FIELDS
+        if needs_bill_stats and self.action in {"list", "retrieve", "update", "partial_update"}:
+            # Meta.ordering is not applied to GROUP BY queries, so restate it.
+            queryset = queryset.annotate(**Bill.aggregates("bills__")).order_by("name", "id")
+        return queryset
+
     @action(detail=True, methods=["get"], url_path="bills")
     def bills(self, request, pk=None):
         vendor = self.get_object()
@@ -85,16 +98,13 @@ class VendorViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet):
             )
         today = timezone.now().date()
 
-        total_vendors = Vendor.objects.filter(organization=organization).count()
-        active_vendors = Vendor.objects.filter(
-            organization=organization, is_active=True
-        ).count()
-        total_outstanding = (
-            Bill.objects.filter(
-                organization=organization,
-                status__in=[Bill.STATUS_PENDING, Bill.STATUS_PARTIAL, Bill.STATUS_OVERDUE],
-            ).aggregate(total=Sum("balance_due"))["total"]
-            or 0
+        vendor_counts = Vendor.objects.filter(organization=organization).aggregate(
+            total_vendors=Count("id"),
+            active_vendors=Count("id", filter=Q(is_active=True)),
+            vendors_needing_1099=Count("id", filter=Q(is_active=True, is_1099_eligible=True)),
+        )
+        bill_totals = Bill.objects.filter(organization=organization).aggregate(
+            **Bill.aggregates()
         )
         total_paid_ytd = (
             BillPayment.objects.filter(
@@ -107,19 +117,14 @@ class VendorViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet):
             ["total"]
             or 0
         )
-        vendors_needing_1099 = Vendor.objects.filter(
-            organization=organization,
-            is_active=True,
-            is_1099_eligible=True,
-        ).count()
 
         return Response(
             {
-                "total_vendors": total_vendors,
-                "active_vendors": active_vendors,
-                "total_outstanding": total_outstanding,
+                "total_vendors": vendor_counts["total_vendors"],
+                "active_vendors": vendor_counts["active_vendors"],
+                "total_outstanding": bill_totals["outstanding_balance"],
                 "total_paid_ytd": total_paid_ytd,
-                "vendors_needing_1099": vendors_needing_1099,
+                "vendors_needing_1099": vendor_counts["vendors_needing_1099"],
             }
         )
 
@@ -219,7 +224,7 @@ class BillViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet):
         )
         serializer.is_valid(raise_exception=True)
 
-        with db_transaction.atomic():
+        with shard_atomic():
             payment = serializer.save(bill=bill)
             journal_entry = None
             try:
@@ -305,6 +310,7 @@ class BillViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet):
         }
 
     @action(detail=False, methods=["get"], url_path="aging")
+    @cached_report("bill-aging", domains=("accounting",))
     def aging(self, request):
         organization = resolve_request_organization(request)
         if not organization:
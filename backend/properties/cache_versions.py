@@ -0,0 +1,169 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+
+from .sharding import organization_db
+
+logger = logging.getLogger(__name__)
+
+# Version stamps are kept in the default cache. A write in one process only
+# invalidates cached data in the others when that cache is shared, see
+# `cache_shared`.
+VERSION_KEY_PREFIX = "dataver"
+
+# Data domains clients cache against (ETags, report caches). A write to any
+# listed model advances the domain. Properties, units, tenants and vendors
+# are named in payloads of every domain, so they advance all of them.
+DATA_DOMAINS = {
+    "accounting": [
+        "properties.accountingcategory",
+        "properties.accountingperiod",
+        "properties.bankreconciliation",
+        "properties.bill",
+        "properties.billpayment",
+        "properties.classificationrule",
+        "properties.expense",
+        "properties.importedtransaction",
+        "properties.journalentry",
+        "properties.journalentryline",
+        "properties.latefeerule",
+        "properties.ownerstatement",
+        "properties.payment",
+        "properties.reconciliationmatch",
+        "properties.recurringtransaction",
+        "properties.rentledgerentry",
+        "properties.transaction",
+        "properties.transactionimport",
+    ],
+    "leasing": [
+        "properties.document",
+        "properties.latefeerule",
+        "properties.lead",
+        "properties.leadactivity",
+        "properties.lease",
+        "properties.payment",
+        "properties.rentalapplication",
+        "properties.rentledgerentry",
+        "properties.screeningrequest",
+    ],
+    "maintenance": [
+        "properties.maintenancerequest",
+        "properties.workorder",
+        "properties.workordernote",
+    ],
+    "messaging": [
+        "properties.message",
+        "properties.notification",
+    ],
+}
+SHARED_MODELS = [
+    "properties.property",
+    "properties.tenant",
+    "properties.unit",
+    "properties.vendor",
+]
+
+
+def cache_shared():
+    """Whether every process sees the same default cache (`CACHE_SHARED`).
+
+    Caches and validators built on version stamps must be skipped when it
+    does not: writes from other processes would never invalidate them.
+    """
+    return getattr(settings, "CACHE_SHARED", False)
+
+
+def _version_key(organization_id, label):
+    return f"{VERSION_KEY_PREFIX}:{organization_id}:{label}"
+
+
+def initial_version():
+    # Start from a clock value rather than 1 so an evicted counter can never
+    # come back to a number some stale cache entry was stamped with.
+    return int(time.time() * 1000)
+
+
+def bump_version(organization_id, label):
+    """Advance the version of `label` (usually a model label) for an organization."""
+    if not organization_id:
+        return
+    key = _version_key(organization_id, label)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, initial_version(), None)
+
+
+def model_domains(label):
+    """Domains a model label (e.g. "properties.bill") belongs to."""
+    if label in SHARED_MODELS:
+        return list(DATA_DOMAINS)
+    return [domain for domain, labels in DATA_DOMAINS.items() if label in labels]
+
+
+def domain_label(domain):
+    return f"domain:{domain}"
+
+
+def bump_model_versions(organization_id, label):
+    """Advance the version of a model label and of every domain it belongs to."""
+    bump_version(organization_id, label)
+    for domain in model_domains(label):
+        bump_version(organization_id, domain_label(domain))
+
+
+def bump_on_commit(organization_id, label):
+    """Advance versions once the current transaction commits.
+
+    Model signals do this for ordinary saves; call it after queryset
+    `update()`, `bulk_create()` or `bulk_update()`, which send no signals.
+    """
+    if organization_id:
+        transaction.on_commit(
+            lambda: bump_model_versions(organization_id, label),
+            using=organization_db(organization_id),
+        )
+
+
+def get_domain_versions(organization_id, domains):
+    """Return `{domain: version}` for an organization."""
+    versions = get_versions(organization_id, [domain_label(domain) for domain in domains])
+    return {domain: versions[domain_label(domain)] for domain in domains}
+
+
+def get_versions(organization_id, labels):
+    """Return `{label: version}` for an organization, initializing missing counters."""
+    keys = {_version_key(organization_id, label): label for label in labels}
+    found = cache.get_many(list(keys))
+    missing = {key: initial_version() for key in keys if key not in found}
+    if missing:
+        for key, value in missing.items():
+            cache.add(key, value, None)
+        found.update(cache.get_many(list(missing)))
+    return {label: found.get(key) for key, label in keys.items()}
+
+
+def instance_organization_id(instance):
+    """Best-effort organization id for a model instance.
+
+    Several models keep a nullable `organization` foreign key next to the
+    parent they belong to, so fall back to walking the parent chain.
+    """
+    organization_id = getattr(instance, "organization_id", None)
+    if organization_id:
+        return organization_id
+    for parent_field in ("journal_entry", "lease", "unit", "property"):
+        if not getattr(instance, f"{parent_field}_id", None):
+            continue
+        try:
+            parent = getattr(instance, parent_field)
+        except ObjectDoesNotExist:
+            continue
+        organization_id = instance_organization_id(parent)
+        if organization_id:
+            return organization_id
+    return None
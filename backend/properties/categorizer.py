@@ -0,0 +1,298 @@
+import json
+import logging
+import math
+import re
+import zlib
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .cache_versions import bump_on_commit
+from .models import (
+    AccountingCategory,
+    CategoryClassifier,
+    ImportedTransaction,
+    JournalEntry,
+    JournalEntryLine,
+)
+from .sharding import organization_db
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIN_CONFIDENCE = 0.8
+SMOOTHING = 1.0
+_WORD_RE = re.compile(r"[a-z][a-z0-9&'-]+")
+
+
+def min_confidence():
+    return float(getattr(settings, "CATEGORIZER_MIN_CONFIDENCE", DEFAULT_MIN_CONFIDENCE))
+
+
+def tokenize(description="", amount=None, vendor=""):
+    """Feature tokens: description words, amount sign and vendor."""
+    tokens = {f"w:{word}" for word in _WORD_RE.findall((description or "").lower())}
+    if amount is not None and amount != 0:
+        tokens.add("sign:+" if amount > 0 else "sign:-")
+    vendor = " ".join((vendor or "").lower().split())
+    if vendor:
+        tokens.add(f"v:{vendor}")
+    return tokens
+
+
+class NaiveBayesCategorizer:
+    """Multinomial naive Bayes over token sets with additive counts.
+
+    Counts are kept sparse for storage and incremental training. Scoring
+    uses a compiled table of per-token log-likelihood rows (one value per
+    label), so classifying a row is a handful of row additions.
+    """
+
+    def __init__(self, label_counts=None, token_counts=None):
+        self.label_counts = defaultdict(int, label_counts or {})
+        self.token_counts = defaultdict(lambda: defaultdict(int))
+        for label, counts in (token_counts or {}).items():
+            self.token_counts[label].update(counts)
+        self._compiled = None
+
+    @property
+    def sample_count(self):
+        return sum(self.label_counts.values())
+
+    def train(self, samples):
+        """Add `(tokens, label)` samples; returns how many were used."""
+        used = 0
+        for tokens, label in samples:
+            if not tokens or label is None:
+                continue
+            label = str(label)
+            self.label_counts[label] += 1
+            label_tokens = self.token_counts[label]
+            for token in tokens:
+                label_tokens[token] += 1
+            used += 1
+        if used:
+            self._compiled = None
+        return used
+
+    def _compile(self):
+        labels = sorted(self.label_counts)
+        vocabulary = set()
+        for counts in self.token_counts.values():
+            vocabulary.update(counts)
+        vocab_size = max(len(vocabulary), 1)
+        total = sum(self.label_counts.values())
+
+        priors = [math.log(self.label_counts[label] / total) for label in labels]
+        denominators = [
+            sum(self.token_counts[label].values()) + SMOOTHING * vocab_size for label in labels
+        ]
+        token_rows = {}
+        for token in vocabulary:
+            token_rows[token] = [
+                math.log((self.token_counts[label].get(token, 0) + SMOOTHING) / denominator)
+                for label, denominator in zip(labels, denominators)
+            ]
+        self._compiled = (labels, priors, token_rows)
+        return self._compiled
+
+    def predict(self, tokens, allowed_labels=None):
+        """Return `(label, confidence)` for a token set, or `(None, 0.0)`.
+
+        Tokens never seen in training carry no evidence and are ignored.
+        Without a known description or vendor token only the class prior
+        would decide, so there is no prediction. `allowed_labels` restricts
+        the answer, e.g. to still-active accounts.
+        """
+        if not self.label_counts:
+            return None, 0.0
+        labels, priors, token_rows = self._compiled or self._compile()
+
+        scores = list(priors)
+        evidence = False
+        for token in tokens:
+            row = token_rows.get(token)
+            if row is None:
+                continue
+            evidence = evidence or not token.startswith("sign:")
+            scores = [score + value for score, value in zip(scores, row)]
+        if not evidence:
+            return None, 0.0
+
+        candidates = [
+            (score, label)
+            for score, label in zip(scores, labels)
+            if allowed_labels is None or label in allowed_labels
+        ]
+        if not candidates:
+            return None, 0.0
+        best_score, best_label = max(candidates)
+        normalizer = sum(math.exp(score - best_score) for score, _label in candidates)
+        return best_label, 1.0 / normalizer
+
+    def to_bytes(self):
+        payload = {
+            "labels": dict(self.label_counts),
+            "tokens": {label: dict(counts) for label, counts in self.token_counts.items()},
+        }
+        return zlib.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+
+    @classmethod
+    def from_bytes(cls, data):
+        if not data:
+            return cls()
+        payload = json.loads(zlib.decompress(bytes(data)).decode("utf-8"))
+        return cls(payload.get("labels"), payload.get("tokens"))
+
+
+def _imported_transaction_samples(organization, after_journal_entry_id):
+    rows = (
+        ImportedTransaction.objects.filter(
+            organization=organization,
+            status=ImportedTransaction.STATUS_BOOKED,
+            category__isnull=False,
+            journal_entry_id__gt=after_journal_entry_id,
+        )
+        .order_by("journal_entry_id")
+        .values_list("journal_entry_id", "category_id", "description", "reference", "amount")
+    )
+    for journal_entry_id, category_id, description, reference, amount in rows.iterator():
+        yield journal_entry_id, (tokenize(f"{description} {reference}", amount), category_id)
+
+
+def _journal_line_samples(organization, after_line_id):
+    lines = (
+        JournalEntryLine.objects.filter(
+            organization=organization,
+            id__gt=after_line_id,
+            journal_entry__status=JournalEntry.STATUS_POSTED,
+            account__account_type__in=[
+                AccountingCategory.ACCOUNT_TYPE_REVENUE,
+                AccountingCategory.ACCOUNT_TYPE_EXPENSE,
+            ],
+        )
+        # Import bookings are learned from the richer imported rows instead.
+        .exclude(journal_entry__source_type="import")
+        .order_by("id")
+        .values_list(
+            "id",
+            "account_id",
+            "description",
+            "journal_entry__memo",
+            "vendor",
+            "credit_amount",
+        )
+    )
+    for line_id, account_id, description, memo, vendor, credit_amount in lines.iterator():
+        text = description if (memo or "") in (description or "") else f"{description} {memo}"
+        amount = 1 if credit_amount > 0 else -1
+        yield line_id, (tokenize(text, amount, vendor), account_id)
+
+
+def train_classifier(organization, full=False):
+    """Incrementally train (or with `full`, rebuild) an organization's classifier.
+
+    Only history booked since the stored cursors is read, so routine
+    retraining after an import or posting run is cheap. The cursors are row
+    ids: drafts posted after a later retrain, and voided or recategorized
+    history, are only picked up by a full rebuild, which `manage.py
+    scheduler` runs nightly (`train_categorizers --full`). Bookings only
+    mark the classifier stale (`mark_classifier_stale`); the scheduler
+    retrains stale classifiers every few minutes (`train_categorizers --stale`).
+    """
+    with transaction.atomic(using=organization_db(organization)):
+        record, _ = CategoryClassifier.objects.select_for_update().get_or_create(
+            organization=organization
+        )
+        if full:
+            record.last_journal_entry_id = 0
+            record.last_journal_line_id = 0
+            model = NaiveBayesCategorizer()
+        else:
+            model = NaiveBayesCategorizer.from_bytes(record.state)
+
+        added = 0
+        for journal_entry_id, sample in _imported_transaction_samples(
+            organization, record.last_journal_entry_id
+        ):
+            added += model.train([sample])
+            record.last_journal_entry_id = journal_entry_id
+        for line_id, sample in _journal_line_samples(organization, record.last_journal_line_id):
+            added += model.train([sample])
+            record.last_journal_line_id = line_id
+
+        if added or full or record.is_stale:
+            record.state = model.to_bytes()
+            record.sample_count = model.sample_count
+            record.trained_at = timezone.now()
+            record.is_stale = False
+            record.save()
+    return added
+
+
+def mark_classifier_stale(organization):
+    """Flag an organization's classifier for retraining, in the caller's transaction."""
+    updated = CategoryClassifier.objects.filter(organization=organization).update(is_stale=True)
+    if not updated:
+        CategoryClassifier.objects.get_or_create(organization=organization, defaults={"is_stale": True})
+
+
+def load_classifier(organization):
+    record = CategoryClassifier.objects.filter(organization=organization).only("state").first()
+    if not record:
+        return None
+    return NaiveBayesCategorizer.from_bytes(record.state)
+
+
+def suggest_categories(organization, items, model=None):
+    """Categorize `items` (dicts with description, amount, vendor) in bulk.
+
+    Returns one `(AccountingCategory | None, confidence)` pair per item; only
+    active, postable accounts of the organization are ever suggested.
+    """
+    items = list(items)
+    model = model or load_classifier(organization)
+    if model is None or not items:
+        return [(None, 0.0)] * len(items)
+
+    accounts = {
+        str(account.id): account
+        for account in AccountingCategory.objects.filter(
+            organization=organization, is_active=True, is_header=False
+        )
+    }
+    results = []
+    for item in items:
+        tokens = tokenize(item.get("description", ""), item.get("amount"), item.get("vendor", ""))
+        label, confidence = model.predict(tokens, allowed_labels=accounts)
+        results.append((accounts.get(label), confidence))
+    return results
+
+
+def categorize_imported_transactions(organization, queryset, model=None):
+    """Fill in the category of pending, uncategorized imported rows the model is sure about."""
+    rows = list(
+        queryset.filter(
+            organization=organization,
+            status=ImportedTransaction.STATUS_PENDING,
+            category__isnull=True,
+        )
+    )
+    if not rows:
+        return []
+    suggestions = suggest_categories(
+        organization,
+        [{"description": f"{row.description} {row.reference}", "amount": row.amount} for row in rows],
+        model=model,
+    )
+    threshold = min_confidence()
+    categorized = []
+    for row, (account, confidence) in zip(rows, suggestions):
+        if account and confidence >= threshold:
+            row.category = account
+            categorized.append(row)
+    ImportedTransaction.objects.bulk_update(categorized, ["category"])
+    if categorized:
+        bump_on_commit(organization.id, ImportedTransaction._meta.label_lower)
+    return [row.id for row in categorized]
@@ -0,0 +1,173 @@
+import contextlib
+import logging
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+from .authentication import request_claims
+from .cache_versions import cache_shared
+
+logger = logging.getLogger(__name__)
+
+STICKY_KEY_PREFIX = "replica-sticky"
+# DatabaseCache entries: always read from the primary and not a data write.
+CACHE_TABLE_APP_LABEL = "django_cache"
+
+# Alias reads are routed to in the current block; None means the primary.
+_read_alias = ContextVar("replica_read_alias", default=None)
+# Writes made during the current request, see `write_tracking`.
+_writes = ContextVar("replica_request_writes", default=None)
+
+_unavailable_lock = threading.Lock()
+_unavailable_until = {}
+
+
+def replica_alias():
+    """The configured replica alias, or None when no replica is set up.
+
+    Replica reads also need a shared default cache: stickiness kept in a
+    process-local cache would not follow a user's next request to another
+    worker, which could then read (and cache) data older than its writes.
+    """
+    alias = getattr(settings, "REPLICA_DATABASE_ALIAS", "replica")
+    return alias if alias in connections.settings and cache_shared() else None
+
+
+def replica_available(alias):
+    """Whether `alias` accepts connections.
+
+    A failed connection marks the replica down for `REPLICA_RETRY_SECONDS`,
+    during which reads stay on the primary without trying it again.
+    """
+    with _unavailable_lock:
+        if _unavailable_until.get(alias, 0) > time.monotonic():
+            return False
+    try:
+        connections[alias].ensure_connection()
+    except DatabaseError as exc:
+        retry = getattr(settings, "REPLICA_RETRY_SECONDS", 30)
+        with _unavailable_lock:
+            _unavailable_until[alias] = time.monotonic() + retry
+        logger.warning("Read replica %r unavailable, using the primary for %ss: %s", alias, retry, exc)
+        return False
+    return True
+
+
+def reset_replica_health():
+    with _unavailable_lock:
+        _unavailable_until.clear()
+
+
+def _sticky_keys(user_id, organization_ids):
+    keys = [f"{STICKY_KEY_PREFIX}:user:{user_id}"] if user_id else []
+    keys += [f"{STICKY_KEY_PREFIX}:org:{org_id}" for org_id in organization_ids if org_id]
+    return keys
+
+
+def mark_sticky(user_id=None, organization_ids=()):
+    """Keep reads of this user and these organizations on the primary for a while.
+
+    Covers replication lag after a write: the writer sees its own changes,
+    and report and AI context caches keyed by the new data versions are not
+    filled from a replica that has not caught up yet.
+    """
+    keys = _sticky_keys(user_id, organization_ids)
+    if keys:
+        timeout = getattr(settings, "REPLICA_STICKY_SECONDS", 10)
+        cache.set_many(dict.fromkeys(keys, True), timeout)
+
+
+def is_sticky(user_id=None, organization_id=None):
+    keys = _sticky_keys(user_id, [organization_id])
+    return bool(keys) and bool(cache.get_many(keys))
+
+
+def start_replica_reads(user_id=None, organization_id=None):
+    """Route reads in the current context to the replica when it is safe to.
+
+    Reads stay on the primary when no replica is configured, it is
+    unavailable, or the user or organization wrote recently. Returns a token
+    for `stop_replica_reads`.
+    """
+    alias = replica_alias()
+    if alias is not None and (is_sticky(user_id, organization_id) or not replica_available(alias)):
+        alias = None
+    return _read_alias.set(alias)
+
+
+def stop_replica_reads(token):
+    _read_alias.reset(token)
+
+
+@contextlib.contextmanager
+def replica_reads(user_id=None, organization_id=None):
+    token = start_replica_reads(user_id, organization_id)
+    try:
+        yield
+    finally:
+        stop_replica_reads(token)
+
+
+class RequestWrites:
+    def __init__(self):
+        self.wrote = False
+        self.organization_ids = set()
+
+    def record(self, instance):
+        self.wrote = True
+        organization_id = getattr(instance, "organization_id", None)
+        if organization_id:
+            self.organization_ids.add(organization_id)
+
+
+@contextlib.contextmanager
+def write_tracking():
+    """Collect the writes made in the block, see `ReplicaRoutingMiddleware`."""
+    writes = RequestWrites()
+    token = _writes.set(writes)
+    try:
+        yield writes
+    finally:
+        _writes.reset(token)
+
+
+def request_organization_id(request):
+    """Organization of `request` when known without a query."""
+    claims = request_claims(request)
+    if claims is not None:
+        return claims["org_id"]
+    return getattr(getattr(request, "organization", None), "id", None)
+
+
+class ReplicaRouter:
+    """Send reads to the replica inside `replica_reads` blocks; writes to the primary.
+
+    Once the current request has written, its remaining reads go to the
+    primary as well so it reads its own writes.
+    """
+
+    def db_for_read(self, model, **hints):
+        alias = _read_alias.get()
+        if alias is None or model._meta.app_label == CACHE_TABLE_APP_LABEL:
+            return None
+        writes = _writes.get()
+        if writes is not None and writes.wrote:
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        writes = _writes.get()
+        if writes is not None and model._meta.app_label != CACHE_TABLE_APP_LABEL:
+            writes.record(hints.get("instance"))
+        # Instances read from the replica are saved to the primary.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, replica_alias()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
@@ -3,7 +3,7 @@ from __future__ import annotations
 import logging
 from typing import Iterable, Optional
 
-from django.core.mail import EmailMultiAlternatives
+from .outbox import queue_email
 
 
 logger = logging.getLogger(__name__)
@@ -53,7 +53,8 @@ def build_email_html(subject, heading, body_paragraphs: Iterable[str], cta_text=
     """
 
 
-def _send_email(subject, recipient_email, heading, body_lines, cta_text=None, cta_link=None):
+def _send_email(subject, recipient_email, heading, body_lines, cta_text=None, cta_link=None, dedupe_key=None):
+    """Queue an email in the outbox; `manage.py send_outbox` delivers it."""
     if not recipient_email:
         return False
 
@@ -65,16 +66,10 @@ def _send_email(subject, recipient_email, heading, body_lines, cta_text=None, ct
         cta_link=cta_link,
     )
     try:
-        message = EmailMultiAlternatives(
-            subject=subject,
-            body="\n\n".join(body_lines),
-            to=[recipient_email],
-        )
-        message.attach_alternative(html, "text/html")
-        message.send(fail_silently=True)
+        queue_email(recipient_email, subject, "\n\n".join(body_lines), html, dedupe_key=dedupe_key)
         return True
     except Exception:
-        logger.exception("Failed to send email to %s", recipient_email)
+        logger.exception("Failed to queue email to %s", recipient_email)
         return False
 
 
@@ -213,6 +208,7 @@ def send_payment_confirmation(
             f"has been processed.",
             f"Confirmation: {confirmation_id}",
         ],
+        dedupe_key=f"payment-confirmation:{confirmation_id}",
     )
 
 
@@ -223,6 +219,7 @@ def send_payment_received_landlord(
     amount,
     property_name,
     unit_number,
+    payment_id=None,
 ):
     return _send_email(
         subject=f"Payment Received - {tenant_name} - {_format_currency(amount)}",
@@ -232,6 +229,7 @@ def send_payment_received_landlord(
             f"Hi {landlord_name},",
             f"{tenant_name} has paid {_format_currency(amount)} for {property_name} Unit {unit_number}.",
         ],
+        dedupe_key=f"payment-received:{payment_id}" if payment_id else None,
     )
 
 
@@ -0,0 +1,16 @@
+from django.http import HttpResponse
+from rest_framework.permissions import IsAdminUser
+from rest_framework.views import APIView
+
+from .metrics import render_prometheus
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class MetricsView(APIView):
+    """Process metrics for staff, in the Prometheus text format."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return HttpResponse(render_prometheus(), content_type=PROMETHEUS_CONTENT_TYPE)
@@ -6,6 +6,8 @@ from django.db.models import Sum
 from django.utils import timezone
 
 from properties.models import AccountingCategory, Lease, LateFeeRule, Organization, Payment, Transaction
+from properties.request_cache import request_cache_scope
+from properties.sharding import organization_scope
 
 
 def _first_of_month(target):
@@ -53,77 +55,9 @@ class Command(BaseCommand):
         month_end = _month_end(month_start)
         summary = []
 
-        for organization in Organization.objects.all():
-            rule = (
-                LateFeeRule.objects.filter(
-                    organization=organization,
-                    is_active=True,
-                )
-                .order_by("-created_at")
-                .first()
-            )
-            if not rule:
-                continue
-
-            category = _resolve_late_fee_category(organization)
-            created_count = 0
-
-            for lease in Lease.objects.filter(is_active=True, organization=organization).select_related(
-                "unit"
-            ):
-                unit = lease.unit
-                if not unit:
-                    continue
-
-                due_day = min(lease.start_date.day, 28)
-                due_date = now.replace(day=due_day)
-                if now <= due_date + timedelta(days=rule.grace_period_days):
-                    continue
-
-                paid_this_month = (
-                    Payment.objects.filter(
-                        lease=lease,
-                        organization=organization,
-                        status=Payment.STATUS_COMPLETED,
-                        payment_date__gte=month_start,
-                        payment_date__lte=month_end,
-                    ).aggregate(sum=Sum("amount"))["sum"]
-                    or Decimal("0.00")
-                )
-                if paid_this_month >= lease.monthly_rent:
-                    continue
-
-                already_applied = Transaction.objects.filter(
-                    organization=organization,
-                    lease=lease,
-                    transaction_type=Transaction.TYPE_EXPENSE,
-                    category=category,
-                    date__gte=month_start,
-                    date__lte=month_end,
-                ).exists()
-                if already_applied:
-                    continue
-
-                amount = _parse_amount(rule, lease)
-                if amount <= 0:
-                    continue
-
-                Transaction.objects.create(
-                    organization=organization,
-                    transaction_type=Transaction.TYPE_EXPENSE,
-                    category=category,
-                    amount=amount,
-                    date=now,
-                    description=f"{now.strftime('%B %Y')} Late Fee",
-                    property=unit.property,
-                    unit=unit,
-                    tenant=lease.tenant,
-                    lease=lease,
-                    is_recurring=False,
-                    created_by=organization.owner,
-                )
-                created_count += 1
-
+        for organization in Organization.objects.all().order_by("id"):
+            with request_cache_scope(), organization_scope(organization):
+                created_count = self._apply_organization(organization, now, month_start, month_end)
             if created_count:
                 summary.append(
                     f"org={organization.id} ({organization.name}) late_fees_created={created_count}"
@@ -134,3 +68,75 @@ class Command(BaseCommand):
                 self.stdout.write(item)
         else:
             self.stdout.write("No late fees created.")
+
+    def _apply_organization(self, organization, now, month_start, month_end):
+        rule = (
+            LateFeeRule.objects.filter(
+                organization=organization,
+                is_active=True,
+            )
+            .order_by("-created_at")
+            .first()
+        )
+        if not rule:
+            return 0
+
+        category = _resolve_late_fee_category(organization)
+        created_count = 0
+
+        for lease in Lease.objects.filter(is_active=True, organization=organization).select_related(
+            "unit"
+        ):
+            unit = lease.unit
+            if not unit:
+                continue
+
+            due_day = min(lease.start_date.day, 28)
+            due_date = now.replace(day=due_day)
+            if now <= due_date + timedelta(days=rule.grace_period_days):
+                continue
+
+            paid_this_month = (
+                Payment.objects.filter(
+                    lease=lease,
+                    organization=organization,
+                    status=Payment.STATUS_COMPLETED,
+                    payment_date__gte=month_start,
+                    payment_date__lte=month_end,
+                ).aggregate(sum=Sum("amount"))["sum"]
+                or Decimal("0.00")
+            )
+            if paid_this_month >= lease.monthly_rent:
+                continue
+
+            already_applied = Transaction.objects.filter(
+                organization=organization,
+                lease=lease,
+                transaction_type=Transaction.TYPE_EXPENSE,
+                category=category,
+                date__gte=month_start,
+                date__lte=month_end,
+            ).exists()
+            if already_applied:
+                continue
+
+            amount = _parse_amount(rule, lease)
+            if amount <= 0:
+                continue
+
+            Transaction.objects.create(
+                organization=organization,
+                transaction_type=Transaction.TYPE_EXPENSE,
+                category=category,
+                amount=amount,
+                date=now,
+                description=f"{now.strftime('%B %Y')} Late Fee",
+                property=unit.property,
+                unit=unit,
+                tenant=lease.tenant,
+                lease=lease,
+                is_recurring=False,
+                created_by=organization.owner,
+            )
+            created_count += 1
+        return created_count
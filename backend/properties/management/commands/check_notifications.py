@@ -4,7 +4,9 @@ from django.contrib.auth.models import User
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 
-from properties.models import Lease, Notification, Payment, UserProfile
+from properties.models import Lease, Notification, Organization, Payment, UserProfile
+from properties.request_cache import request_cache_scope
+from properties.sharding import organization_scope
 
 
 class Command(BaseCommand):
@@ -12,10 +14,6 @@ class Command(BaseCommand):
 
     def handle(self, *args, **options):
         today = timezone.now().date()
-        landlords = User.objects.filter(
-            profile__role=UserProfile.ROLE_LANDLORD,
-            profile__organization__isnull=False,
-        )
         tenant_user_map = {
             profile.tenant_id: profile.user
             for profile in UserProfile.objects.select_related("user").filter(
@@ -24,14 +22,29 @@ class Command(BaseCommand):
         }
 
         created_count = 0
-        active_leases = Lease.objects.filter(is_active=True).select_related(
-            "tenant", "unit", "unit__property", "organization"
+        for organization in Organization.objects.all().order_by("id"):
+            with request_cache_scope(), organization_scope(organization):
+                created_count += self._check_organization(organization, tenant_user_map, today)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Notification check complete. Created {created_count} notifications."
+            )
+        )
+
+    def _check_organization(self, organization, tenant_user_map, today):
+        landlords = list(
+            User.objects.filter(
+                profile__role=UserProfile.ROLE_LANDLORD,
+                profile__organization=organization,
+            )
+        )
+        created_count = 0
+        active_leases = Lease.objects.filter(is_active=True, organization=organization).select_related(
+            "tenant", "unit", "unit__property"
         )
 
         for lease in active_leases:
-            organization = lease.organization
-            if not organization:
-                continue
             tenant_user = tenant_user_map.get(lease.tenant_id)
             if not tenant_user:
                 continue
@@ -83,11 +96,6 @@ class Command(BaseCommand):
                     today=today,
                 )
                 for landlord in landlords:
-                    if (
-                        getattr(getattr(landlord, "profile", None), "organization", None)
-                        != organization
-                    ):
-                        continue
                     created_count += self._create_once_per_day(
                         recipient=landlord,
                         title="Lease expiring soon",
@@ -97,12 +105,7 @@ class Command(BaseCommand):
                         link="/leases",
                         today=today,
                     )
-
-        self.stdout.write(
-            self.style.SUCCESS(
-                f"Notification check complete. Created {created_count} notifications."
-            )
-        )
+        return created_count
 
     def _create_once_per_day(
         self, recipient, title, message, notification_type, link, today, organization=None
@@ -0,0 +1,469 @@
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from properties.models import (
+    AccountingCategory,
+    ImportedTransaction,
+    JournalEntry,
+    JournalEntryLine,
+    Lease,
+    Organization,
+    Payment,
+    Property,
+    RentLedgerEntry,
+    Tenant,
+    Transaction,
+    TransactionImport,
+    Unit,
+    UserProfile,
+)
+from properties.utils import seed_chart_of_accounts
+
+CASH_ACCOUNT = "1020"
+RENT_INCOME_ACCOUNT = "4100"
+
+# (account code, bank description, low, high) for generated bank-feed debits.
+BANK_EXPENSES = [
+    ("5100", "HOME DEPOT #{ref}", 40, 900),
+    ("5100", "KNOX PLUMBING CO INV {ref}", 150, 1800),
+    ("5200", "STATE FARM INSURANCE {ref}", 300, 1500),
+    ("5300", "COUNTY TRUSTEE PROPERTY TAX {ref}", 800, 4000),
+    ("5400", "KUB UTILITIES AUTOPAY {ref}", 80, 600),
+    ("5400", "COMCAST BUSINESS {ref}", 60, 250),
+    ("5500", "MANAGEMENT FEE TRANSFER {ref}", 200, 1200),
+    ("5700", "ZILLOW RENTALS ADS {ref}", 25, 300),
+    ("5800", "LOWES #{ref}", 20, 400),
+]
+
+PAYMENT_METHODS = [
+    Payment.PAYMENT_METHOD_CHECK,
+    Payment.PAYMENT_METHOD_CASH,
+    Payment.PAYMENT_METHOD_OTHER,
+]
+
+LATE_FEE_GRACE_DAYS = 5
+
+
+def month_starts(start, end):
+    cursor = date(start.year, start.month, 1)
+    while cursor <= end:
+        yield cursor
+        cursor = date(cursor.year + cursor.month // 12, cursor.month % 12 + 1, 1)
+
+
+def add_months(value, months):
+    month_index = value.month - 1 + months
+    return date(value.year + month_index // 12, month_index % 12 + 1, 1)
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate large, internally consistent synthetic portfolios for load testing. "
+        "Output is deterministic for a given --seed and --end-date."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--orgs", type=int, default=1, help="Organizations to create.")
+        parser.add_argument("--properties", type=int, default=10, help="Properties per organization.")
+        parser.add_argument("--units", type=int, default=20, help="Units per property.")
+        parser.add_argument("--years", type=int, default=2, help="Years of rent and bank history.")
+        parser.add_argument(
+            "--imports-per-month",
+            type=int,
+            default=100,
+            help="Imported bank rows per organization per month.",
+        )
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--end-date",
+            type=date.fromisoformat,
+            default=None,
+            help="Last day of generated history (YYYY-MM-DD). Defaults to today.",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--prefix",
+            default="load",
+            help="Prefix for generated usernames and organization names.",
+        )
+
+    def handle(self, *args, **options):
+        for name in ("orgs", "properties", "units", "years", "batch_size"):
+            if options[name] < 1:
+                raise CommandError(f"--{name.replace('_', '-')} must be at least 1.")
+        if options["imports_per_month"] < 0:
+            raise CommandError("--imports-per-month cannot be negative.")
+
+        self.batch_size = options["batch_size"]
+        self.end_date = options["end_date"] or timezone.now().date()
+        self.start_date = add_months(
+            date(self.end_date.year, self.end_date.month, 1), -12 * options["years"]
+        )
+        started = time.monotonic()
+        totals = {}
+        for index in range(1, options["orgs"] + 1):
+            username = f"{options['prefix']}-owner-{index}"
+            if User.objects.filter(username=username).exists():
+                raise CommandError(f"User {username} already exists; pass a different --prefix.")
+            rng = random.Random(f"{options['seed']}:{index}")
+            with transaction.atomic():
+                counts = self._generate_organization(index, username, rng, options)
+            for key, value in counts.items():
+                totals[key] = totals.get(key, 0) + value
+            self.stdout.write(
+                f"Org {index}: "
+                + ", ".join(f"{value} {key}" for key, value in counts.items())
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated {options['orgs']} organizations in {time.monotonic() - started:.1f}s: "
+                + ", ".join(f"{value} {key}" for key, value in totals.items())
+            )
+        )
+
+    def _bulk_create(self, model, objects):
+        return model.objects.bulk_create(objects, batch_size=self.batch_size)
+
+    def _generate_organization(self, index, username, rng, options):
+        owner = User.objects.create_user(
+            username=username,
+            email=f"{username}@loadtest.example",
+            password=None,
+        )
+        organization = Organization.objects.create(
+            name=f"{options['prefix'].title()} Org {index}",
+            owner=owner,
+            plan=Organization.PLAN_PRO,
+            max_units=options["properties"] * options["units"],
+        )
+        UserProfile.objects.filter(user=owner).update(
+            role=UserProfile.ROLE_LANDLORD,
+            organization=organization,
+            is_org_admin=True,
+        )
+        seed_chart_of_accounts(organization)
+        self.accounts = {
+            account.account_code: account
+            for account in AccountingCategory.objects.filter(organization=organization)
+        }
+        self.rent_income_category, _ = AccountingCategory.objects.get_or_create(
+            organization=organization,
+            name="Rent Income",
+            category_type=AccountingCategory.TYPE_INCOME,
+        )
+        self.posted_at = timezone.now()
+
+        counts = {"leases": 0, "payments": 0, "ledger entries": 0, "journal lines": 0}
+        properties = self._bulk_create(
+            Property,
+            [
+                Property(
+                    organization=organization,
+                    name=f"Load Property {index}-{number}",
+                    address_line1=f"{rng.randint(100, 9999)} Market St",
+                    city="Knoxville",
+                    state="TN",
+                    zip_code=f"379{rng.randint(10, 99)}",
+                    property_type=Property.PROPERTY_TYPE_RESIDENTIAL,
+                )
+                for number in range(1, options["properties"] + 1)
+            ],
+        )
+        # One property at a time keeps memory flat however large the run.
+        for property_obj in properties:
+            property_counts = self._generate_property(
+                organization, owner, property_obj, options["units"], rng
+            )
+            for key, value in property_counts.items():
+                counts[key] += value
+
+        counts.update(
+            self._generate_bank_imports(organization, owner, options["imports_per_month"], rng)
+        )
+        counts["journal lines"] += counts.pop("import journal lines")
+        return counts
+
+    def _generate_property(self, organization, owner, property_obj, unit_count, rng):
+        units = self._bulk_create(
+            Unit,
+            [
+                Unit(
+                    organization=organization,
+                    property=property_obj,
+                    unit_number=str(100 + number),
+                    bedrooms=rng.randint(1, 3),
+                    bathrooms=Decimal(rng.choice(["1.0", "1.5", "2.0"])),
+                    square_feet=rng.randint(550, 1400),
+                    rent_amount=Decimal(rng.randrange(900, 2400, 25)),
+                    is_available=False,
+                )
+                for number in range(1, unit_count + 1)
+            ],
+        )
+
+        # Annual terms per unit; most renew with the same tenant.
+        tenants = []
+        terms = []
+        for unit in units:
+            term_start = self.start_date
+            tenant = None
+            rent = unit.rent_amount
+            while term_start <= self.end_date:
+                if tenant is None or rng.random() < 0.3:
+                    tenant = Tenant(
+                        organization=organization,
+                        first_name=rng.choice(["Alex", "Jordan", "Sam", "Taylor", "Casey", "Morgan"]),
+                        last_name=f"Resident{len(tenants) + 1}",
+                        email=f"resident{len(tenants) + 1}.{property_obj.id}@loadtest.example",
+                        phone=f"865-555-{rng.randint(0, 9999):04d}",
+                    )
+                    tenants.append(tenant)
+                term_end = add_months(term_start, 12) - timedelta(days=1)
+                terms.append((unit, tenant, term_start, term_end, rent))
+                term_start = add_months(term_start, 12)
+                rent = (rent * Decimal("1.03")).quantize(Decimal("1"))
+        self._bulk_create(Tenant, tenants)
+        leases = self._bulk_create(
+            Lease,
+            [
+                Lease(
+                    organization=organization,
+                    unit=unit,
+                    tenant=tenant,
+                    start_date=term_start,
+                    end_date=term_end,
+                    monthly_rent=rent,
+                    security_deposit=rent,
+                    is_active=term_start <= self.end_date <= term_end,
+                    signature_status=Lease.SIGNATURE_SIGNED,
+                )
+                for unit, tenant, term_start, term_end, rent in terms
+            ],
+        )
+
+        ledger_events = []
+        payments = []
+        for lease in leases:
+            events = []
+            for month_start in month_starts(lease.start_date, min(lease.end_date, self.end_date)):
+                events.append((month_start, RentLedgerEntry.TYPE_CHARGE, lease.monthly_rent, None))
+                paid_on = month_start + timedelta(days=rng.randint(0, 11))
+                if rng.random() < 0.96 and paid_on <= self.end_date:
+                    payment = Payment(
+                        organization=organization,
+                        lease=lease,
+                        amount=lease.monthly_rent,
+                        payment_date=paid_on,
+                        payment_method=rng.choice(PAYMENT_METHODS),
+                        status=Payment.STATUS_COMPLETED,
+                    )
+                    payments.append(payment)
+                    if paid_on > month_start + timedelta(days=LATE_FEE_GRACE_DAYS):
+                        late_fee = (lease.monthly_rent * Decimal("0.05")).quantize(Decimal("0.01"))
+                        events.append((paid_on, RentLedgerEntry.TYPE_LATE_FEE, late_fee, None))
+                    events.append((paid_on, RentLedgerEntry.TYPE_PAYMENT, -lease.monthly_rent, payment))
+            ledger_events.append((lease, events))
+        self._bulk_create(Payment, payments)
+
+        journal_entries = self._bulk_create(
+            JournalEntry,
+            [
+                JournalEntry(
+                    organization=organization,
+                    entry_date=payment.payment_date,
+                    memo=f"Rent payment for lease {payment.lease_id}",
+                    status=JournalEntry.STATUS_POSTED,
+                    source_type="rent_payment",
+                    source_id=payment.id,
+                    created_by=owner,
+                    posted_at=self.posted_at,
+                )
+                for payment in payments
+            ],
+        )
+        lines = []
+        rent_transactions = []
+        for payment, journal_entry in zip(payments, journal_entries):
+            lease = payment.lease
+            dimensions = {
+                "property": property_obj,
+                "unit": lease.unit,
+                "tenant": lease.tenant,
+                "lease": lease,
+            }
+            lines += [
+                JournalEntryLine(
+                    organization=organization,
+                    journal_entry=journal_entry,
+                    account=self.accounts[CASH_ACCOUNT],
+                    debit_amount=payment.amount,
+                    credit_amount=Decimal("0.00"),
+                    description=journal_entry.memo,
+                    **dimensions,
+                ),
+                JournalEntryLine(
+                    organization=organization,
+                    journal_entry=journal_entry,
+                    account=self.accounts[RENT_INCOME_ACCOUNT],
+                    debit_amount=Decimal("0.00"),
+                    credit_amount=payment.amount,
+                    description=journal_entry.memo,
+                    **dimensions,
+                ),
+            ]
+            rent_transactions.append(
+                Transaction(
+                    organization=organization,
+                    transaction_type=Transaction.TYPE_INCOME,
+                    category=self.rent_income_category,
+                    journal_entry=journal_entry,
+                    amount=payment.amount,
+                    date=payment.payment_date,
+                    description=journal_entry.memo,
+                    payment=payment,
+                    created_by=owner,
+                    **dimensions,
+                )
+            )
+        self._bulk_create(JournalEntryLine, lines)
+        self._bulk_create(Transaction, rent_transactions)
+
+        ledger_entries = []
+        for lease, events in ledger_events:
+            balance = Decimal("0.00")
+            for entry_date, entry_type, amount, payment in events:
+                balance += amount
+                ledger_entries.append(
+                    RentLedgerEntry(
+                        organization=organization,
+                        lease=lease,
+                        entry_type=entry_type,
+                        description=self._ledger_description(entry_type, entry_date),
+                        amount=amount,
+                        balance=balance,
+                        payment=payment,
+                        date=entry_date,
+                    )
+                )
+        self._bulk_create(RentLedgerEntry, ledger_entries)
+
+        return {
+            "leases": len(leases),
+            "payments": len(payments),
+            "ledger entries": len(ledger_entries),
+            "journal lines": len(lines),
+        }
+
+    @staticmethod
+    def _ledger_description(entry_type, entry_date):
+        if entry_type == RentLedgerEntry.TYPE_CHARGE:
+            return entry_date.strftime("%B %Y Rent")
+        if entry_type == RentLedgerEntry.TYPE_LATE_FEE:
+            return entry_date.strftime("%B %Y Late Fee")
+        return "Payment Received"
+
+    def _generate_bank_imports(self, organization, owner, rows_per_month, rng):
+        """Monthly bank-feed imports. Past months are booked; the latest stays pending review."""
+        if not rows_per_month:
+            return {"imported rows": 0, "import journal lines": 0}
+        months = list(month_starts(self.start_date, self.end_date))
+        imports = self._bulk_create(
+            TransactionImport,
+            [
+                TransactionImport(
+                    organization=organization,
+                    uploaded_by=owner,
+                    filename=month_start.strftime("bank-%Y-%m.csv"),
+                    status=(
+                        TransactionImport.STATUS_MAPPED
+                        if month_start == months[-1]
+                        else TransactionImport.STATUS_COMPLETED
+                    ),
+                    row_count=rows_per_month,
+                )
+                for month_start in months
+            ],
+        )
+
+        rows = []
+        for month_start, transaction_import in zip(months, imports):
+            booked = transaction_import.status == TransactionImport.STATUS_COMPLETED
+            last_day = min(add_months(month_start, 1) - timedelta(days=1), self.end_date)
+            for _ in range(rows_per_month):
+                code, template, low, high = rng.choice(BANK_EXPENSES)
+                description = template.format(ref=rng.randint(1000, 99999))
+                row_date = month_start + timedelta(days=rng.randint(0, (last_day - month_start).days))
+                amount = -Decimal(rng.randint(low * 100, high * 100)) / 100
+                rows.append(
+                    ImportedTransaction(
+                        transaction_import=transaction_import,
+                        organization=organization,
+                        date=row_date,
+                        description=description,
+                        amount=amount,
+                        reference=f"BANK{rng.randint(100000, 999999)}",
+                        category=self.accounts[code] if booked else None,
+                        status=(
+                            ImportedTransaction.STATUS_BOOKED
+                            if booked
+                            else ImportedTransaction.STATUS_PENDING
+                        ),
+                        transaction_hash=TransactionImport.compute_hash(
+                            organization.id, row_date, amount, description
+                        ),
+                    )
+                )
+        self._bulk_create(ImportedTransaction, rows)
+
+        booked_rows = [row for row in rows if row.status == ImportedTransaction.STATUS_BOOKED]
+        journal_entries = self._bulk_create(
+            JournalEntry,
+            [
+                JournalEntry(
+                    organization=organization,
+                    entry_date=row.date,
+                    memo=f"Import #{row.transaction_import_id} row #{row.id}",
+                    status=JournalEntry.STATUS_POSTED,
+                    source_type="import",
+                    source_id=row.id,
+                    created_by=owner,
+                    posted_at=self.posted_at,
+                )
+                for row in booked_rows
+            ],
+        )
+        lines = []
+        for row, journal_entry in zip(booked_rows, journal_entries):
+            row.journal_entry = journal_entry
+            amount = abs(row.amount)
+            lines += [
+                JournalEntryLine(
+                    organization=organization,
+                    journal_entry=journal_entry,
+                    account=row.category,
+                    debit_amount=amount,
+                    credit_amount=Decimal("0.00"),
+                    reference=row.reference,
+                ),
+                JournalEntryLine(
+                    organization=organization,
+                    journal_entry=journal_entry,
+                    account=self.accounts[CASH_ACCOUNT],
+                    debit_amount=Decimal("0.00"),
+                    credit_amount=amount,
+                    reference=row.reference,
+                ),
+            ]
+        self._bulk_create(JournalEntryLine, lines)
+        ImportedTransaction.objects.bulk_update(
+            booked_rows, ["journal_entry"], batch_size=self.batch_size
+        )
+        return {"imported rows": len(rows), "import journal lines": len(lines)}
@@ -0,0 +1,170 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from properties.models import Organization, OrganizationShard
+from properties.sharding import (
+    organization_models,
+    organization_rows_filter,
+    organization_shard,
+    shard_aliases,
+    sharding_enabled,
+    sync_reference_rows,
+)
+
+
+def _chunks(values, size):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+class Command(BaseCommand):
+    help = (
+        "Move an organization's data to another shard database and point the "
+        "shard directory at it. Writes for the organization are refused while it moves."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("organization", type=int, help="Id of the organization to move.")
+        parser.add_argument("target", help="Database alias to move it to.")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows per insert (default 1000).")
+        parser.add_argument(
+            "--drain-seconds",
+            type=float,
+            default=30.0,
+            help=(
+                "How long requests and jobs may keep using the directory entry they read: "
+                "waited after marking the organization as moving and again before deleting "
+                "the source rows (default 30)."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        if not sharding_enabled():
+            raise CommandError("No shard databases are configured (SHARD_DATABASES).")
+        organization = Organization.objects.filter(id=options["organization"]).first()
+        if organization is None:
+            raise CommandError(f"Organization {options['organization']} does not exist.")
+        target = options["target"]
+        if target not in shard_aliases():
+            raise CommandError(f"Unknown shard {target!r}; choose from {', '.join(shard_aliases())}.")
+        source, moving = organization_shard(organization.id)
+        if moving:
+            raise CommandError(f"Organization {organization.id} is already being moved.")
+        if source == target:
+            raise CommandError(f"Organization {organization.id} is already on {target!r}.")
+
+        models = organization_models()
+        row_ids = {
+            model: list(
+                model._base_manager.using(source)
+                .filter(organization_rows_filter(model, organization.id))
+                .order_by("pk")
+                .values_list("pk", flat=True)
+            )
+            for model in models
+        }
+        self._check_free_ids(target, row_ids, options["batch_size"])
+
+        directory, _ = OrganizationShard.objects.get_or_create(
+            organization=organization, defaults={"alias": source}
+        )
+        self._set_directory(directory, source, moving=True)
+        try:
+            # Writes already routed to the source before the flag was set.
+            self._drain(options["drain_seconds"])
+            if target != DEFAULT_DB_ALIAS:
+                sync_reference_rows(target)
+            self._copy(source, target, row_ids, options["batch_size"])
+            try:
+                self._verify(source, target, organization, row_ids, options["batch_size"])
+            except CommandError:
+                self._delete(target, row_ids, options["batch_size"])
+                raise
+        except Exception:
+            self._set_directory(directory, source, moving=False)
+            raise
+        self._set_directory(directory, target, moving=False)
+        # Reads still routed to the source by the old entry.
+        self._drain(options["drain_seconds"])
+        self._delete(source, row_ids, options["batch_size"])
+
+        moved = sum(len(ids) for ids in row_ids.values())
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Moved organization {organization.id} from {source!r} to {target!r}: {moved} rows."
+            )
+        )
+
+    def _drain(self, seconds):
+        if seconds > 0:
+            self.stdout.write(f"Waiting {seconds:g}s for in-flight requests...")
+            time.sleep(seconds)
+
+    def _set_directory(self, directory, alias, moving):
+        directory.alias = alias
+        directory.is_moving = moving
+        directory.save(update_fields=["alias", "is_moving", "updated_at"])
+
+    def _check_free_ids(self, target, row_ids, batch_size):
+        for model, ids in row_ids.items():
+            for chunk in _chunks(ids, batch_size):
+                if model._base_manager.using(target).filter(pk__in=chunk).exists():
+                    raise CommandError(
+                        f"{model._meta.label} ids of this organization are already used on "
+                        f"{target!r}. Give each shard its own id range before moving."
+                    )
+
+    def _copy(self, source, target, row_ids, batch_size):
+        with transaction.atomic(using=target):
+            for model, ids in row_ids.items():
+                timestamps = [
+                    field.attname
+                    for field in model._meta.concrete_fields
+                    if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False)
+                ]
+                for chunk in _chunks(ids, batch_size):
+                    rows = list(model._base_manager.using(source).filter(pk__in=chunk))
+                    original = [[getattr(row, name) for name in timestamps] for row in rows]
+                    model._base_manager.using(target).bulk_create(rows)
+                    if timestamps:
+                        # bulk_create stamps auto_now fields; restore the originals.
+                        for row, values in zip(rows, original):
+                            for name, value in zip(timestamps, values):
+                                setattr(row, name, value)
+                        model._base_manager.using(target).bulk_update(rows, timestamps)
+                if ids:
+                    self.stdout.write(f"{model._meta.label}: {len(ids)} rows")
+            connection = connections[target]
+            statements = connection.ops.sequence_reset_sql(no_style(), list(row_ids))
+            if statements:
+                with connection.cursor() as cursor:
+                    for sql in statements:
+                        cursor.execute(sql)
+
+    def _verify(self, source, target, organization, row_ids, batch_size):
+        for model, ids in row_ids.items():
+            copied = sum(
+                model._base_manager.using(target).filter(pk__in=chunk).count()
+                for chunk in _chunks(ids, batch_size)
+            )
+            remaining = (
+                model._base_manager.using(source)
+                .filter(organization_rows_filter(model, organization.id))
+                .count()
+            )
+            if copied != len(ids) or remaining != len(ids):
+                raise CommandError(
+                    f"{model._meta.label}: copied {copied} of {len(ids)} rows and the source now "
+                    f"has {remaining}; the organization was left on its current shard."
+                )
+
+    def _delete(self, alias, row_ids, batch_size):
+        with transaction.atomic(using=alias):
+            for model, ids in reversed(row_ids.items()):
+                for chunk in _chunks(ids, batch_size):
+                    # Raw deletes: cascades and signals would reach rows that
+                    # are not part of this organization, such as user profiles.
+                    model._base_manager.using(alias).filter(pk__in=chunk)._raw_delete(alias)
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Q
+
+from properties.management.commands.run_agents import RESOLVED_STATUS_VALUES
+from properties.models import AgentSkill, AgentTask
+
+
+class Command(BaseCommand):
+    help = "Recount agent skill task counters and fix any that have drifted."
+
+    def handle(self, *args, **options):
+        skills = AgentSkill.objects.annotate(
+            actual_pending=Count("tasks", filter=Q(tasks__status=AgentTask.STATUS_PENDING)),
+            actual_completed=Count("tasks", filter=Q(tasks__status__in=RESOLVED_STATUS_VALUES)),
+        ).order_by("organization_id", "id")
+
+        fixed = []
+        for skill in skills:
+            if (skill.tasks_pending, skill.tasks_completed) == (
+                skill.actual_pending,
+                skill.actual_completed,
+            ):
+                continue
+            self.stdout.write(
+                f"Org {skill.organization_id} {skill.skill_type}: "
+                f"pending {skill.tasks_pending} -> {skill.actual_pending}, "
+                f"completed {skill.tasks_completed} -> {skill.actual_completed}"
+            )
+            skill.tasks_pending = skill.actual_pending
+            skill.tasks_completed = skill.actual_completed
+            fixed.append(skill)
+
+        AgentSkill.objects.bulk_update(fixed, ["tasks_pending", "tasks_completed"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Agent counters reconciled. Skills corrected: {len(fixed)}")
+        )
@@ -3,9 +3,10 @@ import json
 import logging
 
 from django.core.management.base import BaseCommand
+from django.db.models import F
 from django.utils import timezone
 
-from properties.agent_executors import generate_preview
+from properties.agent_executors import get_task_preview, preview_inputs
 from properties.models import (
     AgentSkill,
     AgentTask,
@@ -16,6 +17,8 @@ from properties.models import (
     Organization,
     Payment,
 )
+from properties.request_cache import request_cache_scope, request_cached
+from properties.sharding import organization_scope, shard_atomic
 
 logger = logging.getLogger(__name__)
 
@@ -27,10 +30,15 @@ RESOLVED_STATUS_VALUES = [
 ]
 
 
+@request_cached
+def agent_skill(organization, skill_type):
+    return AgentSkill.objects.get(organization=organization, skill_type=skill_type)
+
+
 def enhance_task_with_ai(task):
     """Optionally enhance a task's recommendation with AI content."""
     try:
-        preview = generate_preview(task)
+        preview = get_task_preview(task)
         if isinstance(preview, dict):
             task.recommended_action = json.dumps(preview)
             task.save(update_fields=["recommended_action"])
@@ -67,9 +75,9 @@ def scan_collections(org, with_ai=False):
         unit_number = lease.unit.unit_number if lease.unit else "N/A"
         tenant_email = tenant.email if tenant else "tenant"
 
-        task = AgentTask.objects.create(
+        task = create_agent_task(
             organization=org,
-            skill=AgentSkill.objects.get(organization=org, skill_type="collections"),
+            skill=agent_skill(org, "collections"),
             task_type="rent_overdue",
             title=f"Rent overdue: {tenant_name}",
             description=(
@@ -119,9 +127,9 @@ def scan_compliance(org, with_ai=False):
         tenant_name = f"{tenant.first_name} {tenant.last_name}" if tenant else "Unknown tenant"
         unit_number = lease.unit.unit_number if lease.unit else "N/A"
 
-        task = AgentTask.objects.create(
+        task = create_agent_task(
             organization=org,
-            skill=AgentSkill.objects.get(organization=org, skill_type="compliance"),
+            skill=agent_skill(org, "compliance"),
             task_type="lease_expiring",
             title=f"Lease expiring in {days_left} days: {tenant_name}",
             description=(
@@ -172,9 +180,9 @@ def scan_maintenance(org, with_ai=False):
         if existing:
             continue
 
-        task = AgentTask.objects.create(
+        task = create_agent_task(
             organization=org,
-            skill=AgentSkill.objects.get(organization=org, skill_type="maintenance"),
+            skill=agent_skill(org, "maintenance"),
             task_type="vendor_assignment",
             title=f"Assign vendor: {req.title}",
             description=(
@@ -224,9 +232,9 @@ def scan_leasing(org, with_ai=False):
         days_stale = (timezone.now() - lead.updated_at).days
         property_name = lead.property.name if lead.property else "general inquiry"
 
-        task = AgentTask.objects.create(
+        task = create_agent_task(
             organization=org,
-            skill=AgentSkill.objects.get(organization=org, skill_type="leasing"),
+            skill=agent_skill(org, "leasing"),
             task_type="lead_follow_up",
             title=f"Follow up: {lead.first_name} {lead.last_name}",
             description=(
@@ -277,9 +285,9 @@ def scan_bookkeeping(org, with_ai=False):
             f"Balance: ${bill.balance_due}."
         )
 
-        task = AgentTask.objects.create(
+        task = create_agent_task(
             organization=org,
-            skill=AgentSkill.objects.get(organization=org, skill_type="bookkeeping"),
+            skill=agent_skill(org, "bookkeeping"),
             task_type=task_type,
             title=(
                 f"Bill due: {bill.vendor.name} - ${bill.balance_due}"
@@ -318,14 +326,72 @@ AGENT_SCANNERS = {
 }
 
 
-def sync_skill_counts(skill):
-    skill.tasks_pending = AgentTask.objects.filter(
-        skill=skill, status=AgentTask.STATUS_PENDING
-    ).count()
-    skill.tasks_completed = AgentTask.objects.filter(
-        skill=skill, status__in=RESOLVED_STATUS_VALUES
-    ).count()
-    skill.save(update_fields=["tasks_pending", "tasks_completed"])
+def adjust_skill_counts(skill_id, old_status=None, new_status=None):
+    """Move a task between a skill's pending/completed counters atomically."""
+    pending_delta = int(new_status == AgentTask.STATUS_PENDING) - int(
+        old_status == AgentTask.STATUS_PENDING
+    )
+    completed_delta = int(new_status in RESOLVED_STATUS_VALUES) - int(
+        old_status in RESOLVED_STATUS_VALUES
+    )
+    updates = {}
+    if pending_delta:
+        updates["tasks_pending"] = F("tasks_pending") + pending_delta
+    if completed_delta:
+        updates["tasks_completed"] = F("tasks_completed") + completed_delta
+    if updates:
+        AgentSkill.objects.filter(pk=skill_id).update(**updates)
+
+
+def create_agent_task(**fields):
+    with shard_atomic():
+        task = AgentTask.objects.create(**fields)
+        adjust_skill_counts(task.skill_id, new_status=task.status)
+    return task
+
+
+def transition_task(task, new_status, **fields):
+    """Set a task's status (and `fields`), keeping its skill's counters in step.
+
+    The update is conditional on the status the caller loaded, so two
+    concurrent transitions of the same task never count twice. Returns
+    False when the task had already been changed by someone else.
+    """
+    old_status = task.status
+    fields["updated_at"] = timezone.now()
+    with shard_atomic():
+        changed = AgentTask.objects.filter(pk=task.pk, status=old_status).update(
+            status=new_status, **fields
+        )
+        if changed:
+            adjust_skill_counts(task.skill_id, old_status, new_status)
+    if not changed:
+        task.refresh_from_db()
+        return False
+    task.status = new_status
+    for name, value in fields.items():
+        setattr(task, name, value)
+    return True
+
+
+def refresh_stale_previews(organization):
+    """Regenerate stored previews of pending tasks whose inputs have changed."""
+    refreshed = 0
+    tasks = AgentTask.objects.filter(
+        organization=organization,
+        status=AgentTask.STATUS_PENDING,
+        preview__isnull=False,
+    )
+    for task in tasks:
+        inputs = preview_inputs(task)
+        if inputs[1] is None or inputs[1] == task.preview_hash:
+            continue
+        try:
+            get_task_preview(task, inputs=inputs)
+            refreshed += 1
+        except Exception as e:
+            logger.warning("Could not refresh preview for task %s: %s", task.id, e)
+    return refreshed
 
 
 def ensure_agent_skills(organization):
@@ -343,22 +409,23 @@ def run_skill_scan(organization, skill, with_ai=False):
         return 0
     created = scanner(organization, with_ai=with_ai)
     skill.last_run_at = timezone.now()
-    sync_skill_counts(skill)
+    skill.save(update_fields=["last_run_at"])
+    skill.refresh_from_db(fields=["tasks_pending", "tasks_completed"])
     return created
 
 
 def run_organization_scan(organization, with_ai=False):
     ensure_agent_skills(organization)
 
-    now = timezone.now()
     created_total = 0
     for skill in AgentSkill.objects.filter(organization=organization):
         if skill.status == AgentSkill.STATUS_ACTIVE:
             scanner = AGENT_SCANNERS.get(skill.skill_type)
             if scanner:
                 created_total += scanner(organization, with_ai=with_ai)
-        skill.last_run_at = now
-        sync_skill_counts(skill)
+    AgentSkill.objects.filter(organization=organization).update(last_run_at=timezone.now())
+    if with_ai:
+        refresh_stale_previews(organization)
 
     return created_total
 
@@ -382,7 +449,8 @@ class Command(BaseCommand):
 
         total_created = 0
         for organization in organizations:
-            created_count = run_organization_scan(organization, with_ai=with_ai)
+            with request_cache_scope(), organization_scope(organization):
+                created_count = run_organization_scan(organization, with_ai=with_ai)
             total_created += created_count
             self.stdout.write(
                 f"Scanned org {organization.id}: created {created_count} new tasks"
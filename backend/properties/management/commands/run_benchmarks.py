@@ -0,0 +1,136 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.utils import timezone
+
+from properties.benchmarks import (
+    BENCHMARKS,
+    BenchmarkContext,
+    BenchmarkError,
+    compare_results,
+    run_benchmarks,
+)
+from properties.models import (
+    ImportedTransaction,
+    JournalEntryLine,
+    Lease,
+    Organization,
+    RentLedgerEntry,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the accounting and reporting hot paths against the current database, "
+        "optionally failing on regressions against a baseline JSON file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--org",
+            type=int,
+            help="Organization to benchmark. Defaults to the one with the most leases.",
+        )
+        parser.add_argument(
+            "--only",
+            nargs="+",
+            choices=sorted(BENCHMARKS),
+            help="Run only these paths.",
+        )
+        parser.add_argument("--repeat", type=int, default=3, help="Timed runs per path.")
+        parser.add_argument("--output", help="Write JSON results to this file ('-' for stdout).")
+        parser.add_argument("--baseline", help="JSON results from an earlier run to compare against.")
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.2,
+            help="Flag metrics that grew by more than this ratio over the baseline (default 0.2).",
+        )
+        parser.add_argument("--label", default="", help="Free-form label stored with the results.")
+
+    def handle(self, *args, **options):
+        if options["repeat"] < 1:
+            raise CommandError("--repeat must be at least 1.")
+        organization = self._organization(options.get("org"))
+        baseline = self._load_baseline(options.get("baseline"))
+
+        context = BenchmarkContext(organization, organization.owner)
+        try:
+            results = run_benchmarks(context, options.get("only"), repeat=options["repeat"])
+        except BenchmarkError as exc:
+            raise CommandError(str(exc)) from exc
+
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<18} {result['wall_seconds'] * 1000:10.1f} ms "
+                f"{result['queries']:7d} queries "
+                f"{result['peak_memory_bytes'] / 1048576:8.1f} MiB peak"
+            )
+
+        payload = {
+            "meta": {
+                "label": options["label"],
+                "created_at": timezone.now().isoformat(),
+                "database": connection.vendor,
+                "organization": organization.id,
+                "repeat": options["repeat"],
+                "dataset": self._dataset_size(organization),
+            },
+            "results": results,
+        }
+        if options.get("output") == "-":
+            self.stdout.write(json.dumps(payload, indent=2))
+        elif options.get("output"):
+            with open(options["output"], "w", encoding="utf-8") as handle:
+                json.dump(payload, handle, indent=2)
+            self.stdout.write(f"Wrote {options['output']}")
+
+        if baseline is None:
+            return
+        regressions = compare_results(baseline["results"], results, options["threshold"])
+        for name, metric, old, new in regressions:
+            change = f" ({new / old - 1:+.0%})" if old else ""
+            self.stdout.write(self.style.ERROR(f"Regression: {name} {metric} {old} -> {new}{change}"))
+        if regressions:
+            raise CommandError(
+                f"{len(regressions)} metric(s) regressed by more than {options['threshold']:.0%}."
+            )
+        self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
+
+    def _organization(self, org_id):
+        organizations = Organization.objects.select_related("owner")
+        if org_id:
+            organization = organizations.filter(id=org_id).first()
+        else:
+            organization = (
+                organizations.annotate(lease_total=Count("leases"))
+                .order_by("-lease_total", "id")
+                .first()
+            )
+        if organization is None:
+            raise CommandError("No organization to benchmark; run generate_load_data first.")
+        return organization
+
+    def _load_baseline(self, path):
+        if not path:
+            return None
+        try:
+            with open(path, encoding="utf-8") as handle:
+                baseline = json.load(handle)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Cannot read baseline {path}: {exc}") from exc
+        if not isinstance(baseline.get("results"), dict):
+            raise CommandError(f"Baseline {path} has no results.")
+        return baseline
+
+    def _dataset_size(self, organization):
+        return {
+            "leases": Lease.objects.filter(organization=organization).count(),
+            "ledger_entries": RentLedgerEntry.objects.filter(organization=organization).count(),
+            "journal_lines": JournalEntryLine.objects.filter(organization=organization).count(),
+            "imported_transactions": ImportedTransaction.objects.filter(
+                organization=organization
+            ).count(),
+        }
@@ -2,6 +2,8 @@ from django.core.management.base import BaseCommand
 
 from properties.models import Organization
 
+from properties.request_cache import request_cache_scope
+from properties.sharding import organization_scope
 from properties.utils import run_all_due_recurring
 
 
@@ -16,7 +18,8 @@ class Command(BaseCommand):
 
         total_created = 0
         for organization in organizations:
-            created_count = run_all_due_recurring(organization)
+            with request_cache_scope(), organization_scope(organization):
+                created_count = run_all_due_recurring(organization)
             total_created += created_count
             self.stdout.write(
                 f"Org {organization.id}: created {created_count} entries"
@@ -0,0 +1,71 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from properties.models import ScheduledJob
+from properties.scheduler import JOBS, JobWorkers, node_name, prune_runs, run_due_jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the scheduled jobs (outbox, agents, recurring transactions, late fees, "
+        "notifications) in one long-running process, each job in its own thread. Each "
+        "due run is leased in the database, so any number of nodes can run the scheduler "
+        "without duplicates."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Run the jobs that are due, then exit.")
+        parser.add_argument(
+            "--tick", type=float, default=30.0, help="Seconds between checks for due jobs (default 30)."
+        )
+        parser.add_argument(
+            "--job", action="append", dest="jobs", metavar="NAME", help="Only schedule this job (repeatable)."
+        )
+        parser.add_argument("--list", action="store_true", help="Show each job's last and next run, then exit.")
+
+    def handle(self, *args, **options):
+        jobs = JOBS
+        if options["jobs"]:
+            unknown = set(options["jobs"]) - {job.name for job in JOBS}
+            if unknown:
+                raise CommandError(f"Unknown job(s): {', '.join(sorted(unknown))}.")
+            jobs = [job for job in JOBS if job.name in options["jobs"]]
+
+        if options["list"]:
+            self._list(jobs)
+            return
+
+        node = node_name()
+        self.stdout.write(f"Scheduler {node} running {', '.join(job.name for job in jobs)}.")
+        if options["once"]:
+            self._report(run_due_jobs(jobs, node=node))
+            return
+        workers = JobWorkers(jobs, node)
+        while True:
+            workers.start_due()
+            time.sleep(options["tick"])
+            self._report(workers.collect())
+
+    def _report(self, runs):
+        for run in runs:
+            caught_up = f", caught up {run.missed_runs} missed" if run.missed_runs else ""
+            self.stdout.write(
+                f"{run.job.name} {run.status} in {run.duration_ms:.0f} ms "
+                f"(slot {run.scheduled_for:%Y-%m-%d %H:%M}{caught_up})"
+            )
+        if runs:
+            prune_runs()
+
+    def _list(self, jobs):
+        now = timezone.now()
+        last_slots = dict(ScheduledJob.objects.values_list("name", "last_scheduled_for"))
+        for job in jobs:
+            last = last_slots.get(job.name)
+            slot = job.due_slot(now)
+            next_run = slot if last is None or last < slot else slot + job.every
+            last_text = f"{last:%Y-%m-%d %H:%M} UTC" if last else "never"
+            self.stdout.write(
+                f"{job.name}: every {job.every}, last {last_text}, next {next_run:%Y-%m-%d %H:%M} UTC"
+            )
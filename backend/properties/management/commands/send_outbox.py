@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from properties.outbox import DEFAULT_BATCH_SIZE, send_pending_emails
+
+
+class Command(BaseCommand):
+    help = "Send queued outbox emails over one mail connection per batch, retrying failures with backoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+            help=f"Emails sent per connection (default {DEFAULT_BATCH_SIZE}).",
+        )
+        parser.add_argument("--loop", action="store_true", help="Keep draining the outbox until interrupted.")
+        parser.add_argument(
+            "--interval", type=float, default=10.0, help="Seconds between passes with --loop (default 10)."
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = send_pending_emails(options["batch_size"])
+            if sent or failed or not options["loop"]:
+                self.stdout.write(self.style.SUCCESS(f"Sent {sent} emails; {failed} failed."))
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+
+from properties.categorizer import train_classifier
+from properties.models import CategoryClassifier, Organization
+from properties.request_cache import request_cache_scope
+from properties.sharding import organization_scope
+
+
+class Command(BaseCommand):
+    help = "Train each organization's transaction categorizer from booked history."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Rebuild from all history instead of only entries booked since the last run.",
+        )
+        parser.add_argument("--org", type=int, help="Only train this organization id.")
+        parser.add_argument(
+            "--stale",
+            action="store_true",
+            help="Only train organizations with history booked since their last training run.",
+        )
+
+    def handle(self, *args, **options):
+        organizations = Organization.objects.all().order_by("id")
+        if options.get("org"):
+            organizations = organizations.filter(id=options["org"])
+        if not organizations.exists():
+            self.stdout.write(self.style.WARNING("No organizations found."))
+            return
+
+        total_added = 0
+        for organization in organizations:
+            with request_cache_scope(), organization_scope(organization):
+                if options.get("stale") and not CategoryClassifier.objects.filter(
+                    organization=organization, is_stale=True
+                ).exists():
+                    continue
+                added = train_classifier(organization, full=options["full"])
+            total_added += added
+            self.stdout.write(f"Org {organization.id}: learned {added} samples")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Categorizer training complete. Total organizations: {organizations.count()}, "
+                f"samples learned: {total_added}"
+            )
+        )
@@ -0,0 +1,186 @@
+import logging
+import re
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import connections
+
+from .ai_service import LatencyHistogram, provider_latency_snapshot
+from .report_cache import report_cache_stats
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+RESPONSE_BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+DEFAULT_SLOW_REQUEST_SECONDS = 1.0
+DEFAULT_SLOW_REQUEST_QUERIES = 50
+TOP_FINGERPRINTS = 5
+
+_IN_LIST_RE = re.compile(r"\(\s*%s(?:\s*,\s*%s)+\s*\)")
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def metrics_enabled():
+    return getattr(settings, "REQUEST_METRICS_ENABLED", False)
+
+
+def sql_fingerprint(sql):
+    """SQL with literals and placeholder lists collapsed, so N+1 repeats group together."""
+    sql = _LITERAL_RE.sub("%s", sql)
+    sql = _IN_LIST_RE.sub("(...)", sql)
+    return _SPACE_RE.sub(" ", sql).strip()
+
+
+class QueryRecorder:
+    """`connection.execute_wrapper` that counts, times and fingerprints queries."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.monotonic()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.monotonic() - started
+            self.count += 1
+            self.fingerprints[sql_fingerprint(sql)] += 1
+
+    def wrap_connections(self, stack):
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(self))
+        return self
+
+
+class EndpointMetrics:
+    def __init__(self):
+        self.requests = Counter()
+        self.duration = LatencyHistogram(DURATION_BUCKETS)
+        self.db_duration = LatencyHistogram(DURATION_BUCKETS)
+        self.queries = LatencyHistogram(QUERY_COUNT_BUCKETS)
+        self.response_bytes = LatencyHistogram(RESPONSE_BYTES_BUCKETS)
+
+
+class MetricsRegistry:
+    """In-process per-endpoint request metrics, keyed by `(view, method)`."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.endpoints = {}
+
+    def endpoint(self, view, method):
+        with self._lock:
+            metrics = self.endpoints.get((view, method))
+            if metrics is None:
+                metrics = self.endpoints[(view, method)] = EndpointMetrics()
+            return metrics
+
+    def observe(self, view, method, status_code, duration, recorder, response_bytes=None):
+        metrics = self.endpoint(view, method)
+        with self._lock:
+            metrics.requests[f"{status_code // 100}xx"] += 1
+        metrics.duration.observe(duration)
+        metrics.db_duration.observe(recorder.duration)
+        metrics.queries.observe(recorder.count)
+        if response_bytes is not None:
+            metrics.response_bytes.observe(response_bytes)
+
+    def items(self):
+        with self._lock:
+            return sorted(self.endpoints.items())
+
+
+REQUEST_METRICS = MetricsRegistry()
+
+
+def log_if_slow(view, method, duration, recorder):
+    max_seconds = getattr(settings, "SLOW_REQUEST_SECONDS", DEFAULT_SLOW_REQUEST_SECONDS)
+    max_queries = getattr(settings, "SLOW_REQUEST_QUERIES", DEFAULT_SLOW_REQUEST_QUERIES)
+    if duration < max_seconds and recorder.count < max_queries:
+        return False
+    repeated = "; ".join(
+        f"{count}x {fingerprint[:200]}"
+        for fingerprint, count in recorder.fingerprints.most_common(TOP_FINGERPRINTS)
+    )
+    logger.warning(
+        "Slow request %s %s: %.3fs, %d queries (%.3fs in DB). Top SQL: %s",
+        method,
+        view,
+        duration,
+        recorder.count,
+        recorder.duration,
+        repeated,
+    )
+    return True
+
+
+def _labels(**labels):
+    def escape(value):
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return ",".join(f'{name}="{escape(value)}"' for name, value in labels.items())
+
+
+def _histogram_lines(name, snapshot, **labels):
+    lines = []
+    for bound, count in snapshot["buckets"]:
+        lines.append(f"{name}_bucket{{{_labels(**labels, le=bound)}}} {count}")
+    lines.append(f'{name}_bucket{{{_labels(**labels, le="+Inf")}}} {snapshot["count"]}')
+    lines.append(f"{name}_sum{{{_labels(**labels)}}} {snapshot['sum']}")
+    lines.append(f"{name}_count{{{_labels(**labels)}}} {snapshot['count']}")
+    return lines
+
+
+HISTOGRAMS = (
+    ("http_request_duration_seconds", "duration", "Total request time."),
+    ("http_request_db_duration_seconds", "db_duration", "Time spent in database queries."),
+    ("http_request_db_queries", "queries", "Database queries per request."),
+    ("http_response_size_bytes", "response_bytes", "Response body size."),
+)
+
+
+def render_prometheus():
+    """All process metrics in the Prometheus text exposition format."""
+    endpoints = REQUEST_METRICS.items()
+    lines = [
+        "# HELP onyx_http_requests_total Requests by view, method and status class.",
+        "# TYPE onyx_http_requests_total counter",
+    ]
+    for (view, method), metrics in endpoints:
+        for status_class, count in sorted(metrics.requests.items()):
+            labels = _labels(view=view, method=method, status=status_class)
+            lines.append(f"onyx_http_requests_total{{{labels}}} {count}")
+
+    for name, attribute, help_text in HISTOGRAMS:
+        lines += [f"# HELP onyx_{name} {help_text}", f"# TYPE onyx_{name} histogram"]
+        for (view, method), metrics in endpoints:
+            snapshot = getattr(metrics, attribute).snapshot()
+            lines += _histogram_lines(f"onyx_{name}", snapshot, view=view, method=method)
+
+    lines += [
+        "# HELP onyx_ai_provider_latency_seconds AI provider call latency.",
+        "# TYPE onyx_ai_provider_latency_seconds histogram",
+    ]
+    for provider, snapshot in sorted(provider_latency_snapshot().items()):
+        lines += _histogram_lines("onyx_ai_provider_latency_seconds", snapshot, provider=provider)
+
+    lines += [
+        "# HELP onyx_report_cache_requests_total Report cache lookups by result.",
+        "# TYPE onyx_report_cache_requests_total counter",
+    ]
+    for report, stats in report_cache_stats().items():
+        for result, key in (("hit", "hits"), ("miss", "misses")):
+            labels = _labels(report=report, result=result)
+            lines.append(f"onyx_report_cache_requests_total{{{labels}}} {stats[key]}")
+    return "\n".join(lines) + "\n"
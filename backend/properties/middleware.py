@@ -1,7 +1,23 @@
+import contextlib
+import time
+
+from django.http import HttpResponse
 from django.utils.deprecation import MiddlewareMixin
 from django.contrib.auth.models import AnonymousUser
 
+from .db_routing import mark_sticky, request_organization_id, write_tracking
+from .metrics import REQUEST_METRICS, QueryRecorder, log_if_slow, metrics_enabled
 from .models import UserProfile
+from .profiling import (
+    INLINE_VALUE,
+    PROFILE_PARAM,
+    profile_request,
+    profiling_requested,
+    profiling_user,
+    store_report,
+)
+from .request_cache import request_cache_scope
+from .sharding import organization_scope
 
 
 class OrganizationMiddleware(MiddlewareMixin):
@@ -20,3 +36,102 @@ class OrganizationMiddleware(MiddlewareMixin):
             request.organization = profile.organization
         else:
             request.organization = None
+
+
+class ShardRoutingMiddleware:
+    """Open the per-request organization scope used for shard routing."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        organization = getattr(request, "organization", None)
+        with organization_scope(organization):
+            return self.get_response(request)
+
+
+class RequestCacheMiddleware:
+    """Scope `request_cached` lookups to a single request."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with request_cache_scope():
+            return self.get_response(request)
+
+
+class RequestMetricsMiddleware:
+    """Record per-view request, query, timing and size metrics.
+
+    Opt in with `REQUEST_METRICS_ENABLED`; requests over `SLOW_REQUEST_SECONDS`
+    or `SLOW_REQUEST_QUERIES` are logged with their most repeated SQL.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not metrics_enabled():
+            return self.get_response(request)
+
+        started = time.monotonic()
+        with contextlib.ExitStack() as stack:
+            recorder = QueryRecorder().wrap_connections(stack)
+            response = self.get_response(request)
+        duration = time.monotonic() - started
+
+        match = getattr(request, "resolver_match", None)
+        view = match.view_name if match else "unresolved"
+        response_bytes = None if response.streaming else len(response.content)
+        REQUEST_METRICS.observe(
+            view, request.method, response.status_code, duration, recorder, response_bytes
+        )
+        log_if_slow(view, request.method, duration, recorder)
+        return response
+
+
+class RequestProfilingMiddleware:
+    """Profile a request when a staff user adds `?__profile=1`.
+
+    The report is stored as a `RequestProfile` (downloadable from the admin)
+    and its id returned in `X-Profile-Id`; `?__profile=inline` returns the
+    report as the response body instead. Everyone else is served normally.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not profiling_requested(request):
+            return self.get_response(request)
+        user = profiling_user(request)
+        if user is None:
+            return self.get_response(request)
+
+        response, report, summary = profile_request(self.get_response, request)
+        if request.GET.get(PROFILE_PARAM) == INLINE_VALUE:
+            return HttpResponse(report, content_type="text/plain; charset=utf-8")
+        profile = store_report(request, user, response, report, summary)
+        response["X-Profile-Id"] = str(profile.id)
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """Keep the next reads of a request's writer on the primary.
+
+    Writes are tracked for the whole request; afterwards the user and the
+    organizations written to are marked sticky (see `db_routing.mark_sticky`).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with write_tracking() as writes:
+            response = self.get_response(request)
+        if writes.wrote:
+            user = getattr(request, "user", None)
+            user_id = user.pk if user is not None and user.is_authenticated else None
+            mark_sticky(user_id, writes.organization_ids | {request_organization_id(request)})
+        return response
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:15
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0026_chatsession_chatmessage'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryClassifier',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('state', models.BinaryField(default=b'', help_text='zlib-compressed JSON token/label counts')),
+                ('sample_count', models.IntegerField(default=0)),
+                ('last_journal_entry_id', models.BigIntegerField(default=0, help_text='Booked imported rows up to this journal entry are trained')),
+                ('last_journal_line_id', models.BigIntegerField(default=0, help_text='Journal lines up to this id are trained')),
+                ('trained_at', models.DateTimeField(blank=True, null=True)),
+                ('organization', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='category_classifier', to='properties.organization')),
+            ],
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:18
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0027_categoryclassifier'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AgentSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('skill_type', models.CharField(choices=[('leasing', 'Leasing Agent'), ('collections', 'Collections Agent'), ('maintenance', 'Maintenance Triage'), ('bookkeeping', 'Bookkeeping Agent'), ('compliance', 'Compliance Monitor'), ('rent_optimizer', 'Rent Optimizer')], max_length=30)),
+                ('status', models.CharField(choices=[('active', 'Active'), ('paused', 'Paused'), ('disabled', 'Disabled')], default='active', max_length=20)),
+                ('last_run_at', models.DateTimeField(blank=True, null=True)),
+                ('tasks_completed', models.IntegerField(default=0)),
+                ('tasks_pending', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='agent_skills', to='properties.organization')),
+            ],
+            options={
+                'ordering': ['skill_type'],
+                'unique_together': {('organization', 'skill_type')},
+            },
+        ),
+        migrations.CreateModel(
+            name='AgentTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_type', models.CharField(choices=[('lead_follow_up', 'Follow Up With Lead'), ('tour_reminder', 'Tour Reminder'), ('application_review', 'Review Application'), ('rent_overdue', 'Rent Overdue'), ('payment_reminder', 'Send Payment Reminder'), ('late_fee_apply', 'Apply Late Fee'), ('maintenance_triage', 'Triage Maintenance Request'), ('vendor_assignment', 'Assign Vendor'), ('work_order_follow_up', 'Follow Up on Work Order'), ('categorize_transaction', 'Categorize Transaction'), ('reconciliation_needed', 'Reconciliation Needed'), ('anomaly_detected', 'Anomaly Detected'), ('lease_expiring', 'Lease Expiring Soon'), ('insurance_renewal', 'Insurance Renewal Due'), ('inspection_due', 'Inspection Due'), ('rent_adjustment', 'Rent Adjustment Suggested'), ('market_alert', 'Market Rate Alert')], max_length=40)),
+                ('title', models.CharField(max_length=300)),
+                ('description', models.TextField()),
+                ('priority', models.CharField(choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High'), ('urgent', 'Urgent')], default='medium', max_length=10)),
+                ('status', models.CharField(choices=[('pending', 'Pending Review'), ('approved', 'Approved'), ('dismissed', 'Dismissed'), ('auto_resolved', 'Auto-Resolved'), ('in_progress', 'In Progress')], default='pending', max_length=20)),
+                ('recommended_action', models.TextField(blank=True, default='')),
+                ('confidence', models.FloatField(default=0.8, help_text='0.0-1.0 confidence score')),
+                ('resolved_at', models.DateTimeField(blank=True, null=True)),
+                ('resolution_note', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('expires_at', models.DateTimeField(blank=True, null=True)),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='agent_tasks', to='properties.organization')),
+                ('related_bill', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='properties.bill')),
+                ('related_lead', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='properties.lead')),
+                ('related_lease', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='properties.lease')),
+                ('related_maintenance', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='properties.maintenancerequest')),
+                ('related_property', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='properties.property')),
+                ('related_tenant', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='properties.tenant')),
+                ('related_unit', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='properties.unit')),
+                ('resolved_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tasks', to='properties.agentskill')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
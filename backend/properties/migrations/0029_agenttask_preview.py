@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0028_agentskill_agenttask'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='agenttask',
+            name='preview',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='agenttask',
+            name='preview_generated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='agenttask',
+            name='preview_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:49
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0029_agenttask_preview'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='agenttask',
+            index=models.Index(fields=['organization', 'task_type', 'status'], name='agenttask_org_type_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bill',
+            index=models.Index(fields=['organization', 'status', 'due_date'], name='bill_org_status_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='journalentry',
+            index=models.Index(fields=['organization', 'status', 'entry_date'], name='je_org_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='journalentryline',
+            index=models.Index(fields=['account', 'journal_entry'], name='jeline_account_entry_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['recipient', '-created_at'], name='notif_recipient_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['recipient'], name='notif_unread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['lease', 'status', 'payment_date'], name='payment_lease_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rentledgerentry',
+            index=models.Index(fields=['lease', 'date', 'created_at', 'id'], name='ledger_lease_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['organization', 'date', 'transaction_type'], name='txn_org_date_type_idx'),
+        ),
+    ]
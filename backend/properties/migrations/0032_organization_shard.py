@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0031_request_profile'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='organizationinvitation',
+            name='tenant',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='organization_invitations', to='properties.tenant'),
+        ),
+        migrations.AlterField(
+            model_name='userprofile',
+            name='tenant',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='user_profile', to='properties.tenant'),
+        ),
+        migrations.CreateModel(
+            name='OrganizationShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('alias', models.CharField(max_length=100)),
+                ('is_moving', models.BooleanField(default=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('organization', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='shard', to='properties.organization')),
+            ],
+            options={
+                'ordering': ['organization_id'],
+            },
+        ),
+    ]
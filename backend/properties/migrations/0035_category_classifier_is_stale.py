@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0034_scheduled_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='categoryclassifier',
+            name='is_stale',
+            field=models.BooleanField(default=False, help_text='New history was booked since the last training run'),
+        ),
+    ]
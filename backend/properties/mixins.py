@@ -1,22 +1,56 @@
+import hashlib
+import json
 import logging
+
+from django.core.exceptions import FieldDoesNotExist
+from django.utils import timezone
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from rest_framework import serializers, status
 from rest_framework.exceptions import PermissionDenied
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from .authentication import request_claims
+from .cache_versions import cache_shared, get_domain_versions, model_domains
+from .db_routing import start_replica_reads, stop_replica_reads
+from .models import Organization
+from .request_cache import request_cached
+from .sharding import activate_organization
 
 logger = logging.getLogger(__name__)
 
 
+@request_cached
 def resolve_request_organization(request):
     """Resolve organization from request context.
 
     `OrganizationMiddleware` runs before DRF authentication, so JWT-authenticated
     requests can arrive with `request.user` populated as anonymous at middleware
     time. In that case, we fall back to `request.user.profile.organization` once
-    DRF has set the authenticated user.
+    DRF has set the authenticated user. Users authenticated from token
+    claims resolve straight from the organization id claim.
+
+    The organization found is activated for shard routing for the rest of
+    the request.
     """
+    organization = _resolve_request_organization(request)
+    activate_organization(organization)
+    return organization
+
 
+def _resolve_request_organization(request):
     organization = getattr(request, "organization", None)
     if organization:
         return organization
 
+    claims = request_claims(request)
+    if claims is not None:
+        if not claims["org_id"]:
+            return None
+        organization = Organization.objects.filter(pk=claims["org_id"]).first()
+        request.organization = organization
+        return organization
+
     user = getattr(request, "user", None)
     if not user or not user.is_authenticated:
         return None
@@ -25,7 +59,237 @@ def resolve_request_organization(request):
     return getattr(profile, "organization", None)
 
 
-class OrganizationQuerySetMixin:
+def _query_param_set(request, name):
+    raw = request.query_params.get(name) if request is not None else None
+    if not raw:
+        return None
+    return {part.strip() for part in raw.split(",") if part.strip()}
+
+
+def prune_serializer_fields(serializer, request):
+    """Drop fields not selected by `?fields=` or excluded by `?omit=`.
+
+    Works on a serializer or a `many=True` list serializer. Returns the
+    names of the fields that remain.
+    """
+    target = getattr(serializer, "child", serializer)
+    if not isinstance(target, serializers.Serializer):
+        return None
+    selected = _query_param_set(request, "fields")
+    omitted = _query_param_set(request, "omit") or set()
+    if selected is None and not omitted:
+        return None
+    for name in list(target.fields):
+        if (selected is not None and name not in selected) or name in omitted:
+            target.fields.pop(name)
+    return list(target.fields)
+
+
+def _only_columns(serializer):
+    """Model columns backing every field of `serializer`, or None if some are computed."""
+    model = getattr(getattr(serializer, "Meta", None), "model", None)
+    if model is None:
+        return None
+    columns = {model._meta.pk.name}
+    for field in serializer.fields.values():
+        if field.source == "*" or "." in field.source or isinstance(
+            field, (serializers.SerializerMethodField, serializers.BaseSerializer)
+        ):
+            return None
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            return None
+        if not model_field.concrete or model_field.many_to_many:
+            return None
+        if model_field.is_relation and not (
+            isinstance(field, serializers.PrimaryKeyRelatedField)
+            and field.use_pk_only_optimization()
+        ):
+            return None
+        columns.add(model_field.name)
+    return columns
+
+
+class SparseFieldsetMixin:
+    """Let GET requests choose response fields with `?fields=a,b` or `?omit=c`.
+
+    When every remaining field is a plain model column, list and detail
+    querysets are narrowed with `.only()` and drop their joins/prefetches,
+    so trimmed responses are cheaper to load as well as to serialize.
+    """
+
+    sparse_actions = ("list", "retrieve")
+
+    def _sparse_request(self):
+        request = getattr(self, "request", None)
+        return (
+            request is not None
+            and request.method == "GET"
+            and getattr(self, "action", None) in self.sparse_actions
+        )
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if self._sparse_request():
+            prune_serializer_fields(serializer, self.request)
+        return serializer
+
+    def _sparse_serializer(self):
+        if not self._sparse_request():
+            return None
+        serializer = self.get_serializer_class()(context=self.get_serializer_context())
+        if prune_serializer_fields(serializer, self.request) is None:
+            return None
+        return serializer
+
+    def sparse_fields(self):
+        """Names of the fields this request will return, or None when not restricted."""
+        serializer = self._sparse_serializer()
+        return set(serializer.fields) if serializer is not None else None
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        serializer = self._sparse_serializer()
+        if serializer is None:
+            return queryset
+        columns = _only_columns(serializer)
+        if columns is None:
+            return queryset
+        # Cursor pagination reads its ordering fields off the last row.
+        ordering = getattr(self.paginator, "ordering", None) or ()
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        columns.update(field.lstrip("-") for field in ordering)
+        return queryset.select_related(None).prefetch_related(None).only(*columns)
+
+
+class NotModified(Exception):
+    def __init__(self, etag):
+        super().__init__(etag)
+        self.etag = etag
+
+
+def etag_matches(if_none_match, etag):
+    """Weak comparison of an `If-None-Match` header against `etag`."""
+    if not if_none_match or not etag:
+        return False
+    candidates = {tag.strip() for tag in if_none_match.split(",")}
+    if "*" in candidates:
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.removeprefix("W/") == opaque for tag in candidates)
+
+
+def compute_etag(request, organization_id, domains):
+    """ETag for a GET from the organization's domain versions and the request.
+
+    The path, query parameters, user and current date are part of the tag:
+    responses differ per user (roles, notifications) and reports default
+    their periods to today.
+    """
+    versions = get_domain_versions(organization_id, sorted(set(domains)))
+    payload = [
+        request.path,
+        sorted(request.query_params.lists()),
+        organization_id,
+        getattr(request.user, "id", None),
+        request.headers.get("Accept", ""),
+        timezone.localdate().isoformat(),
+        versions,
+    ]
+    digest = hashlib.sha1(json.dumps(payload, default=str).encode("utf-8")).hexdigest()
+    return f'W/"{digest}"'
+
+
+class ConditionalGetMixin:
+    """Answer repeat GETs with `304 Not Modified` while the data is unchanged.
+
+    The ETag is derived from the per-organization versions of
+    `etag_domains` (see `cache_versions.DATA_DOMAINS`), so matching
+    `If-None-Match` requests are answered right after authentication and
+    permission checks, without running the view. Viewsets default to the
+    domains of their model and only tag `list`/`retrieve`; set
+    `etag_domains` when a response also reads other domains. No ETags are
+    issued while the default cache is process-local (`CACHE_SHARED`), as
+    writes from other processes would not advance the versions.
+    """
+
+    etag_domains = None
+    etag_actions = ("list", "retrieve")
+
+    def get_etag_domains(self):
+        if self.etag_domains is not None:
+            return self.etag_domains
+        if getattr(self, "action", None) not in self.etag_actions:
+            return ()
+        queryset = getattr(self, "queryset", None)
+        model = getattr(queryset, "model", None) or getattr(
+            getattr(getattr(self, "serializer_class", None), "Meta", None), "model", None
+        )
+        return model_domains(model._meta.label_lower) if model is not None else ()
+
+    def initial(self, request, *args, **kwargs):
+        self._etag = None
+        super().initial(request, *args, **kwargs)
+        if request.method not in ("GET", "HEAD") or not cache_shared():
+            return
+        domains = self.get_etag_domains()
+        organization = resolve_request_organization(request) if domains else None
+        if not organization:
+            return
+        self._etag = compute_etag(request, organization.id, domains)
+        if etag_matches(request.headers.get("If-None-Match"), self._etag):
+            raise NotModified(self._etag)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": exc.etag})
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        etag = getattr(self, "_etag", None)
+        if etag and response.status_code in (200, 304):
+            if not response.has_header("ETag"):
+                response["ETag"] = etag
+            # Browsers keep the body and revalidate it on every use.
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ["Authorization"])
+        return response
+
+
+class ReplicaReadMixin:
+    """Serve the view's GET/HEAD requests from the read replica.
+
+    For read-heavy views (reports, public pages) that tolerate replication
+    lag. Users and organizations that wrote recently still read from the
+    primary, as do all requests when the replica is down.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        self._replica_token = None
+        super().initial(request, *args, **kwargs)
+        if request.method not in SAFE_METHODS:
+            return
+        user = request.user
+        if user and user.is_authenticated:
+            organization = resolve_request_organization(request)
+            self._replica_token = start_replica_reads(
+                user.pk, organization.id if organization else None
+            )
+        else:
+            self._replica_token = start_replica_reads()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, "_replica_token", None)
+        if token is not None:
+            self._replica_token = None
+            stop_replica_reads(token)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class OrganizationQuerySetMixin(ConditionalGetMixin, SparseFieldsetMixin):
     """Scope querysets and create mutations to the authenticated user's organization."""
 
     def get_queryset(self):
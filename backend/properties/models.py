@@ -2,7 +2,8 @@ from django.contrib.auth.models import User
 from decimal import Decimal
 from django.db import models
 from django.core.exceptions import ValidationError
-from django.db.models import Q, Sum
+from django.db.models import Count, Q, Sum, Value
+from django.db.models.functions import Coalesce
 from django.template.defaultfilters import slugify
 from django.utils import timezone
 from django.utils.timezone import now
@@ -270,6 +271,12 @@ class Payment(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["lease", "status", "payment_date"],
+                name="payment_lease_status_date_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"Payment {self.amount} for Lease #{self.lease_id}"
@@ -339,12 +346,14 @@ class UserProfile(models.Model):
     role = models.CharField(
         max_length=20, choices=ROLE_CHOICES, default=ROLE_LANDLORD
     )
+    # Tenants may live on an organization shard (see properties.sharding).
     tenant = models.ForeignKey(
         Tenant,
         on_delete=models.SET_NULL,
         null=True,
         blank=True,
         related_name="user_profile",
+        db_constraint=False,
     )
     organization = models.ForeignKey(
         Organization,
@@ -395,6 +404,7 @@ class OrganizationInvitation(models.Model):
         null=True,
         blank=True,
         related_name="organization_invitations",
+        db_constraint=False,
     )
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -447,6 +457,16 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["recipient", "-created_at"], name="notif_recipient_created_idx"),
+            # Boolean filters compile to `NOT is_read`, which only a partial
+            # index on the same condition can serve.
+            models.Index(
+                fields=["recipient"],
+                condition=models.Q(is_read=False),
+                name="notif_unread_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title} -> {self.recipient.username}"
@@ -911,6 +931,8 @@ class Bill(models.Model):
         (STATUS_CANCELLED, "Cancelled"),
     ]
 
+    OUTSTANDING_STATUSES = [STATUS_PENDING, STATUS_PARTIAL, STATUS_OVERDUE]
+
     BILL_RECURRENCE_MONTHLY = "monthly"
     BILL_RECURRENCE_QUARTERLY = "quarterly"
     BILL_RECURRENCE_ANNUALLY = "annually"
@@ -967,10 +989,42 @@ class Bill(models.Model):
 
     class Meta:
         ordering = ["-due_date"]
+        indexes = [
+            models.Index(
+                fields=["organization", "status", "due_date"],
+                name="bill_org_status_due_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"Bill #{self.bill_number or self.id} - {self.vendor.name} - ${self.total_amount}"
 
+    @staticmethod
+    def aggregates(prefix=""):
+        """Conditional bill aggregates, computed in a single query.
+
+        Use as `Bill.objects.aggregate(**Bill.aggregates())`, or with a relation
+        prefix to annotate another model, e.g.
+        `Vendor.objects.annotate(**Bill.aggregates("bills__"))`.
+        """
+        zero = Value(Decimal("0.00"), output_field=models.DecimalField(max_digits=14, decimal_places=2))
+
+        def money(field, condition=None):
+            return Coalesce(Sum(f"{prefix}{field}", filter=condition), zero)
+
+        def status_in(*statuses):
+            return Q(**{f"{prefix}status__in": statuses})
+
+        aggregates = {
+            "bill_count": Count(f"{prefix}id"),
+            "total_paid": money("amount_paid"),
+            "outstanding_balance": money("balance_due", status_in(*Bill.OUTSTANDING_STATUSES)),
+            "earned_total": money("amount_paid", status_in(Bill.STATUS_PAID)),
+        }
+        for status, _label in Bill.STATUS_CHOICES:
+            aggregates[f"bill_count_{status}"] = Count(f"{prefix}id", filter=status_in(status))
+        return aggregates
+
     def save(self, *args, **kwargs):
         self.total_amount = self.amount + self.tax_amount
         self.balance_due = self.total_amount - self.amount_paid
@@ -1155,6 +1209,12 @@ class RentLedgerEntry(models.Model):
 
     class Meta:
         ordering = ["date", "created_at", "id"]
+        indexes = [
+            models.Index(
+                fields=["lease", "date", "created_at", "id"],
+                name="ledger_lease_order_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"Ledger {self.lease_id} {self.entry_type} {self.amount}"
@@ -1334,6 +1394,12 @@ class Transaction(models.Model):
 
     class Meta:
         ordering = ["-date", "-created_at"]
+        indexes = [
+            models.Index(
+                fields=["organization", "date", "transaction_type"],
+                name="txn_org_date_type_idx",
+            ),
+        ]
 
     def save(self, *args, **kwargs):
         if self.amount is not None and self.amount < 0:
@@ -1529,6 +1595,14 @@ class JournalEntry(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["organization", "status", "entry_date"],
+                name="je_org_status_date_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"Journal Entry #{self.id} ({self.entry_date})"
 
@@ -1583,6 +1657,11 @@ class JournalEntryLine(models.Model):
     vendor = models.CharField(max_length=200, blank=True)
     reference = models.CharField(max_length=100, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["account", "journal_entry"], name="jeline_account_entry_idx"),
+        ]
+
     def clean(self):
         super().clean()
         debit_positive = self.debit_amount > 0
@@ -2169,6 +2248,9 @@ class AgentTask(models.Model):
     confidence = models.FloatField(
         default=0.8, help_text="0.0-1.0 confidence score"
     )
+    preview = models.JSONField(null=True, blank=True)
+    preview_hash = models.CharField(max_length=64, blank=True, default="")
+    preview_generated_at = models.DateTimeField(null=True, blank=True)
 
     resolved_at = models.DateTimeField(null=True, blank=True)
     resolved_by = models.ForeignKey(
@@ -2182,7 +2264,203 @@ class AgentTask(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["organization", "task_type", "status"],
+                name="agenttask_org_type_status_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"[{self.get_task_type_display()}] {self.title}"
 
+
+
+class ChatSession(models.Model):
+    organization = models.ForeignKey(
+        "Organization",
+        on_delete=models.CASCADE,
+        related_name="chat_sessions",
+        null=True,
+        blank=True,
+    )
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="chat_sessions")
+    title = models.CharField(max_length=200, blank=True)
+    summary = models.TextField(
+        blank=True, default="", help_text="Condensed older turns trimmed from the live history"
+    )
+    summary_cursor = models.BigIntegerField(
+        default=0, help_text="Messages with an id at or below this are folded into summary"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-updated_at"]
+
+    def __str__(self):
+        return f"Chat session #{self.id} ({self.user_id})"
+
+
+class ChatMessage(models.Model):
+    ROLE_USER = "user"
+    ROLE_ASSISTANT = "assistant"
+    ROLE_CHOICES = [
+        (ROLE_USER, "User"),
+        (ROLE_ASSISTANT, "Assistant"),
+    ]
+
+    session = models.ForeignKey(ChatSession, on_delete=models.CASCADE, related_name="messages")
+    role = models.CharField(max_length=20, choices=ROLE_CHOICES)
+    content = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["created_at", "id"]
+
+    def __str__(self):
+        return f"{self.role}: {self.content[:50]}"
+
+
+class CategoryClassifier(models.Model):
+    """Per-organization transaction categorizer trained from booked history."""
+
+    organization = models.OneToOneField(
+        "Organization", on_delete=models.CASCADE, related_name="category_classifier"
+    )
+    state = models.BinaryField(
+        default=b"", help_text="zlib-compressed JSON token/label counts"
+    )
+    sample_count = models.IntegerField(default=0)
+    last_journal_entry_id = models.BigIntegerField(
+        default=0, help_text="Booked imported rows up to this journal entry are trained"
+    )
+    last_journal_line_id = models.BigIntegerField(
+        default=0, help_text="Journal lines up to this id are trained"
+    )
+    trained_at = models.DateTimeField(null=True, blank=True)
+    is_stale = models.BooleanField(
+        default=False, help_text="New history was booked since the last training run"
+    )
+
+    def __str__(self):
+        return f"Category classifier ({self.organization_id}, {self.sample_count} samples)"
+
+
+class RequestProfile(models.Model):
+    """A staff-requested `?__profile=1` report: cProfile, SQL and allocations."""
+
+    user = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name="request_profiles"
+    )
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=500)
+    status_code = models.PositiveSmallIntegerField()
+    duration_ms = models.FloatField()
+    query_count = models.IntegerField(default=0)
+    report = models.TextField()
+    size_bytes = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at", "-id"]
+
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.duration_ms:.0f} ms)"
+
+
+class OrganizationShard(models.Model):
+    """Directory entry placing an organization's data on a shard database."""
+
+    organization = models.OneToOneField(
+        Organization, on_delete=models.CASCADE, related_name="shard"
+    )
+    alias = models.CharField(max_length=100)
+    is_moving = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["organization_id"]
+
+    def __str__(self):
+        return f"{self.organization_id} -> {self.alias}"
+
+
+class OutgoingEmail(models.Model):
+    """An email queued by a request and delivered by `manage.py send_outbox`."""
+
+    STATUS_PENDING = "pending"
+    STATUS_SENDING = "sending"
+    STATUS_SENT = "sent"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_SENDING, "Sending"),
+        (STATUS_SENT, "Sent"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    recipient = models.EmailField(max_length=254)
+    subject = models.CharField(max_length=998)
+    body = models.TextField()
+    html = models.TextField(blank=True, default="")
+    dedupe_key = models.CharField(max_length=64, db_index=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at", "-id"]
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="outgoing_email_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.recipient} ({self.status})"
+
+
+class ScheduledJob(models.Model):
+    """Lease and progress of a `manage.py scheduler` job, shared by all nodes."""
+
+    name = models.CharField(max_length=100, unique=True)
+    last_scheduled_for = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=255, blank=True, default="")
+    locked_until = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["name"]
+
+    def __str__(self):
+        return self.name
+
+
+class ScheduledJobRun(models.Model):
+    """One run of a scheduled job, covering every slot missed since the last one."""
+
+    STATUS_RUNNING = "running"
+    STATUS_SUCCEEDED = "succeeded"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_RUNNING, "Running"),
+        (STATUS_SUCCEEDED, "Succeeded"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    job = models.ForeignKey(ScheduledJob, on_delete=models.CASCADE, related_name="runs")
+    scheduled_for = models.DateTimeField()
+    missed_runs = models.PositiveIntegerField(default=0)
+    node = models.CharField(max_length=255)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_RUNNING)
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField(null=True, blank=True)
+    duration_ms = models.FloatField(null=True, blank=True)
+    output = models.TextField(blank=True, default="")
+
+    class Meta:
+        ordering = ["-started_at", "-id"]
+
+    def __str__(self):
+        return f"{self.job.name} @ {self.scheduled_for:%Y-%m-%d %H:%M} ({self.status})"
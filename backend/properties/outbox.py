@@ -0,0 +1,170 @@
+import hashlib
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import OutgoingEmail
+from .sharding import active_organization_id, organization_db
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 100
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def email_dedupe_key(recipient, key):
+    payload = "\x00".join([recipient.strip().lower(), key])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def queue_email(recipient, subject, body, html="", dedupe_key=None):
+    """Add an email to the outbox, in the caller's transaction.
+
+    The outbox lives on the default database. For an organization on a
+    shard the email is queued once the shard's transaction commits, so a
+    rolled-back request sends nothing; it returns None then. With a
+    `dedupe_key` naming the event (e.g. a payment), an email to the same
+    recipient queued under that key within `EMAIL_OUTBOX_DEDUPE_SECONDS` is
+    not queued again. Returns the queued row, or None for duplicates.
+    """
+    alias = organization_db(active_organization_id())
+    if alias != DEFAULT_DB_ALIAS:
+        transaction.on_commit(
+            lambda: _queue_email(recipient, subject, body, html, dedupe_key), using=alias, robust=True
+        )
+        return None
+    return _queue_email(recipient, subject, body, html, dedupe_key)
+
+
+def _queue_email(recipient, subject, body, html, dedupe_key):
+    # A savepoint: a failed insert must not break the caller's transaction.
+    with transaction.atomic(using=DEFAULT_DB_ALIAS):
+        if not dedupe_key:
+            return OutgoingEmail.objects.create(
+                recipient=recipient, subject=subject, body=body, html=html, dedupe_key=""
+            )
+        key = email_dedupe_key(recipient, dedupe_key)
+        window = timedelta(seconds=_setting("EMAIL_OUTBOX_DEDUPE_SECONDS", 86400))
+        duplicate = OutgoingEmail.objects.filter(
+            dedupe_key=key,
+            created_at__gte=timezone.now() - window,
+        ).exclude(status=OutgoingEmail.STATUS_FAILED)
+        if duplicate.exists():
+            logger.info("Skipping duplicate email %r to %s", subject, recipient)
+            return None
+        return OutgoingEmail.objects.create(
+            recipient=recipient, subject=subject, body=body, html=html, dedupe_key=key
+        )
+
+
+def retry_delay(attempts):
+    """Exponential backoff after `attempts` failed deliveries, capped."""
+    base = _setting("EMAIL_OUTBOX_RETRY_SECONDS", 60)
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), _setting("EMAIL_OUTBOX_MAX_RETRY_SECONDS", 3600)))
+
+
+def claim_due_emails(batch_size=DEFAULT_BATCH_SIZE):
+    """Mark up to `batch_size` due emails as sending and return them.
+
+    Rows left in `sending` by a worker that died are claimed again once
+    `EMAIL_OUTBOX_CLAIM_SECONDS` have passed.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=_setting("EMAIL_OUTBOX_CLAIM_SECONDS", 600))
+    with transaction.atomic():
+        emails = list(
+            OutgoingEmail.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status=OutgoingEmail.STATUS_PENDING, next_attempt_at__lte=now)
+                | Q(status=OutgoingEmail.STATUS_SENDING, next_attempt_at__lte=stale)
+            )
+            .order_by("next_attempt_at", "id")[:batch_size]
+        )
+        OutgoingEmail.objects.filter(pk__in=[email.pk for email in emails]).update(
+            status=OutgoingEmail.STATUS_SENDING, next_attempt_at=now
+        )
+    return emails
+
+
+def _message(email, connection):
+    message = EmailMultiAlternatives(
+        subject=email.subject, body=email.body, to=[email.recipient], connection=connection
+    )
+    if email.html:
+        message.attach_alternative(email.html, "text/html")
+    return message
+
+
+def _record_failure(email, error):
+    email.attempts += 1
+    email.last_error = str(error)[:2000]
+    if email.attempts >= _setting("EMAIL_OUTBOX_MAX_ATTEMPTS", 8):
+        email.status = OutgoingEmail.STATUS_FAILED
+        logger.error("Giving up on email %s to %s: %s", email.pk, email.recipient, error)
+    else:
+        email.status = OutgoingEmail.STATUS_PENDING
+        email.next_attempt_at = timezone.now() + retry_delay(email.attempts)
+    email.save(update_fields=["attempts", "last_error", "status", "next_attempt_at"])
+
+
+def deliver(emails, connection=None):
+    """Send claimed emails over one mail connection. Returns the number sent.
+
+    Messages go out one `send_messages` call at a time on the open
+    connection, so a rejected recipient fails only its own email and
+    nothing already accepted is sent twice.
+    """
+    if not emails:
+        return 0
+    connection = connection or get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as exc:
+        # Not the emails' fault: an outage must not use up their attempts.
+        logger.warning("Mail server unavailable, %s emails rescheduled: %s", len(emails), exc)
+        OutgoingEmail.objects.filter(pk__in=[email.pk for email in emails]).update(
+            status=OutgoingEmail.STATUS_PENDING,
+            next_attempt_at=timezone.now() + retry_delay(1),
+            last_error=str(exc)[:2000],
+        )
+        return 0
+
+    sent = 0
+    try:
+        for email in emails:
+            try:
+                connection.send_messages([_message(email, connection)])
+            except Exception as exc:
+                _record_failure(email, exc)
+                continue
+            email.status = OutgoingEmail.STATUS_SENT
+            email.attempts += 1
+            email.sent_at = timezone.now()
+            email.save(update_fields=["status", "attempts", "sent_at"])
+            sent += 1
+    finally:
+        connection.close()
+    return sent
+
+
+def send_pending_emails(batch_size=DEFAULT_BATCH_SIZE):
+    """Drain due emails in batches until none are left. Returns `(sent, failed)`."""
+    sent = attempted = 0
+    while True:
+        emails = claim_due_emails(batch_size)
+        if not emails:
+            return sent, attempted - sent
+        attempted += len(emails)
+        batch_sent = deliver(emails)
+        sent += batch_sent
+        if not batch_sent:
+            # Nothing got through (e.g. the server is down); retry later.
+            return sent, attempted - sent
@@ -0,0 +1,56 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+def paginate_by_default():
+    return bool(getattr(settings, "API_PAGINATE_BY_DEFAULT", True))
+
+
+class PaginationPolicyMixin:
+    """Project pagination policy shared by the page-number and cursor paginators.
+
+    While `API_PAGINATE_BY_DEFAULT` is off (frontend compatibility), list
+    endpoints still return a bare list unless the request opts in by passing
+    one of the paginator's query parameters.
+    """
+
+    def opted_in(self, request):
+        params = {
+            getattr(self, "page_query_param", None),
+            getattr(self, "cursor_query_param", None),
+            self.page_size_query_param,
+        }
+        return any(param in request.query_params for param in params if param)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not paginate_by_default() and not self.opted_in(request):
+            return None
+        return super().paginate_queryset(queryset, request, view=view)
+
+
+class StandardPagination(PaginationPolicyMixin, PageNumberPagination):
+    page_size = settings.REST_FRAMEWORK.get("PAGE_SIZE", 50)
+    page_size_query_param = "page_size"
+    max_page_size = getattr(settings, "API_MAX_PAGE_SIZE", 250)
+
+
+class TimelineCursorPagination(PaginationPolicyMixin, CursorPagination):
+    """Cursor paging for append-mostly tables.
+
+    Cursor pages stay equally cheap however deep the client scrolls and do
+    not skip or repeat rows while new ones are being inserted.
+    """
+
+    page_size = StandardPagination.page_size
+    page_size_query_param = "page_size"
+    max_page_size = StandardPagination.max_page_size
+    ordering = ("-created_at", "-id")
+
+
+def cursor_pagination(*ordering):
+    """A `TimelineCursorPagination` subclass ordered by `ordering`."""
+    return type(
+        "TimelineCursorPagination",
+        (TimelineCursorPagination,),
+        {"ordering": ordering},
+    )
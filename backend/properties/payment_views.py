@@ -2,7 +2,6 @@ from decimal import Decimal
 import logging
 
 from django.conf import settings
-from django.db import transaction as db_transaction
 from django.db.models import Q
 from django.utils import timezone
 from rest_framework import status
@@ -20,7 +19,9 @@ from .models import (
     UserProfile,
 )
 from .mixins import resolve_request_organization
+from .pagination import cursor_pagination
 from .serializers import PaymentSerializer
+from .sharding import shard_atomic
 from .emails import send_payment_confirmation, send_payment_received_landlord
 
 
@@ -82,7 +83,7 @@ def _create_payment_journal_entry(payment, transaction_obj, user):
     unit = lease.unit if lease else None
     tenant = lease.tenant if lease else None
 
-    with db_transaction.atomic():
+    with shard_atomic():
         journal_entry = JournalEntry.objects.create(
             organization=payment.organization,
             entry_date=payment.payment_date,
@@ -330,6 +331,7 @@ class ConfirmStripePaymentView(APIView):
                 amount=payment.amount,
                 property_name=property_obj.name if property_obj else "",
                 unit_number=unit.unit_number if unit else "",
+                payment_id=payment.id,
             )
         except Exception:
             logging.getLogger(__name__).exception(
@@ -341,6 +343,9 @@ class ConfirmStripePaymentView(APIView):
         )
 
 
+PaymentHistoryPagination = cursor_pagination("-created_at", "-id")
+
+
 class PaymentHistoryView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -354,5 +359,9 @@ class PaymentHistoryView(APIView):
         tenant_id = _tenant_for_user(request.user)
         if tenant_id:
             queryset = queryset.filter(lease__tenant_id=tenant_id)
+        paginator = PaymentHistoryPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        if page is not None:
+            return paginator.get_paginated_response(PaymentSerializer(page, many=True).data)
         serializer = PaymentSerializer(queryset, many=True)
         return Response(serializer.data)
@@ -1,10 +1,15 @@
 from rest_framework.permissions import BasePermission
 
+from .authentication import request_claims
 from .mixins import resolve_request_organization
+from .models import UserProfile
 
 
 class IsLandlord(BasePermission):
     def has_permission(self, request, view):
+        claims = request_claims(request)
+        if claims is not None:
+            return claims["role"] == UserProfile.ROLE_LANDLORD
         profile = getattr(request.user, "profile", None)
         return bool(
             request.user
@@ -23,6 +28,9 @@ class IsVendor(BasePermission):
 
 class IsOrgAdmin(BasePermission):
     def has_permission(self, request, view):
+        claims = request_claims(request)
+        if claims is not None:
+            return bool(claims["is_org_admin"] and claims["org_id"])
         profile = getattr(request.user, "profile", None)
         organization = resolve_request_organization(request)
         return bool(
@@ -35,6 +43,14 @@ class IsOrgAdmin(BasePermission):
         )
 
     def has_object_permission(self, request, view, obj):
+        claims = request_claims(request)
+        if claims is not None:
+            obj_org_id = getattr(obj, "organization_id", None)
+            return bool(
+                claims["is_org_admin"]
+                and claims["org_id"]
+                and (obj_org_id is None or obj_org_id == claims["org_id"])
+            )
         profile = getattr(request.user, "profile", None)
         if not profile:
             return False
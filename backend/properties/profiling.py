@@ -0,0 +1,231 @@
+import cProfile
+import contextlib
+import io
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connections
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .metrics import sql_fingerprint
+from .models import RequestProfile
+
+PROFILE_PARAM = "__profile"
+INLINE_VALUE = "inline"
+
+DEFAULT_PROFILE_REPORT_MAX_BYTES = 512 * 1024
+DEFAULT_PROFILE_REPORTS_MAX_TOTAL_BYTES = 50 * 1024 * 1024
+
+TOP_FUNCTIONS = 40
+TOP_QUERIES = 15
+TOP_ALLOCATIONS = 15
+ORIGIN_DEPTH = 3
+
+_PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_THIS_FILE = os.path.abspath(__file__)
+
+
+def profiling_requested(request):
+    return PROFILE_PARAM in request.GET
+
+
+def profiling_user(request):
+    """The staff user behind `request`, or None.
+
+    API requests authenticate in the view, after middleware has run, so the
+    configured DRF authenticators are consulted here when the session has
+    no user.
+    """
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        authenticators = [auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+        try:
+            user = Request(request, authenticators=authenticators).user
+        except APIException:
+            return None
+    if user is None or not user.is_authenticated or not user.is_staff:
+        return None
+    return user
+
+
+def _query_origin():
+    """The innermost project frames that issued a query, outermost first."""
+    origin = []
+    frame = sys._getframe(1)
+    while frame is not None and len(origin) < ORIGIN_DEPTH:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if filename.startswith(_PROJECT_DIR) and filename != _THIS_FILE and "site-packages" not in filename:
+            relative = os.path.relpath(filename, _PROJECT_DIR)
+            origin.append(f"{relative}:{frame.f_lineno} in {frame.f_code.co_name}")
+        frame = frame.f_back
+    return list(reversed(origin))
+
+
+class SQLCapture:
+    """`connection.execute_wrapper` that keeps each query with its timing and origin."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append(
+                {
+                    "sql": sql,
+                    "params": repr(params),
+                    "duration": time.perf_counter() - started,
+                    "origin": _query_origin(),
+                }
+            )
+
+    @property
+    def total_duration(self):
+        return sum(query["duration"] for query in self.queries)
+
+    def repeated(self, key):
+        """Groups of more than one query sharing `key(query)`, most frequent first."""
+        groups = defaultdict(list)
+        for query in self.queries:
+            groups[key(query)].append(query)
+        return sorted(
+            (group for group in groups.values() if len(group) > 1),
+            key=lambda group: (-len(group), -sum(query["duration"] for query in group)),
+        )
+
+
+def _format_mib(size):
+    return f"{size / 1048576:.2f} MiB"
+
+
+def _query_lines(group):
+    duration = sum(query["duration"] for query in group) * 1000
+    first = group[0]
+    lines = [f"{len(group):5d}x {duration:9.1f} ms  {first['sql'][:400]}"]
+    lines += [f"{'':18}at {frame}" for frame in first["origin"]]
+    return lines
+
+
+def build_report(request, response, duration, profiler, capture, allocations):
+    stats_stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stats_stream)
+    stats.sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+
+    lines = [
+        f"Request profile: {request.method} {request.get_full_path()} -> {response.status_code}",
+        f"Duration: {duration * 1000:.1f} ms under profiling",
+        f"Queries: {len(capture.queries)} in {capture.total_duration * 1000:.1f} ms",
+        f"Allocated: {_format_mib(allocations['total'])} total, "
+        f"{_format_mib(allocations['peak'])} peak",
+        "",
+        "== Top functions by cumulative time ==",
+        stats_stream.getvalue().strip(),
+        "",
+        "== Duplicated queries (same SQL and parameters) ==",
+    ]
+    for group in capture.repeated(lambda query: (query["sql"], query["params"]))[:TOP_QUERIES]:
+        lines += _query_lines(group)
+    lines += ["", "== Repeated query shapes =="]
+    for group in capture.repeated(lambda query: sql_fingerprint(query["sql"]))[:TOP_QUERIES]:
+        lines += _query_lines(group)
+    lines += ["", "== Slowest queries =="]
+    for query in sorted(capture.queries, key=lambda query: -query["duration"])[:TOP_QUERIES]:
+        lines += _query_lines([query])
+    lines += ["", "== Allocations by line =="]
+    for stat in allocations["top"]:
+        frame = stat.traceback[0]
+        lines.append(
+            f"{_format_mib(stat.size_diff):>12} {stat.count_diff:8d} blocks  "
+            f"{frame.filename}:{frame.lineno}"
+        )
+    return "\n".join(lines) + "\n"
+
+
+@contextlib.contextmanager
+def _traced_allocations():
+    started_here = not tracemalloc.is_tracing()
+    if started_here:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.take_snapshot()
+    result = {"total": 0, "peak": 0, "top": []}
+    try:
+        yield result
+    finally:
+        after = tracemalloc.take_snapshot()
+        result["peak"] = tracemalloc.get_traced_memory()[1]
+        if started_here:
+            tracemalloc.stop()
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        diff = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), "lineno")
+        result["total"] = sum(stat.size_diff for stat in diff if stat.size_diff > 0)
+        result["top"] = [stat for stat in diff if stat.size_diff > 0][:TOP_ALLOCATIONS]
+
+
+def profile_request(get_response, request):
+    """Run `get_response(request)` under cProfile, SQL capture and tracemalloc.
+
+    Returns the response, the text report and a summary of duration and
+    query count.
+    """
+    profiler = cProfile.Profile()
+    capture = SQLCapture()
+    with contextlib.ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(capture))
+        allocations = stack.enter_context(_traced_allocations())
+        started = time.perf_counter()
+        response = profiler.runcall(get_response, request)
+        duration = time.perf_counter() - started
+    report = build_report(request, response, duration, profiler, capture, allocations)
+    return response, report, {"duration": duration, "query_count": len(capture.queries)}
+
+
+def _truncate(report, max_bytes):
+    encoded = report.encode("utf-8")
+    if len(encoded) <= max_bytes:
+        return report
+    marker = f"\n[report truncated at {max_bytes} bytes]\n"
+    return encoded[: max(0, max_bytes - len(marker))].decode("utf-8", errors="ignore") + marker
+
+
+def prune_reports():
+    """Delete the oldest reports once their total size exceeds the retention cap."""
+    cap = getattr(
+        settings, "PROFILE_REPORTS_MAX_TOTAL_BYTES", DEFAULT_PROFILE_REPORTS_MAX_TOTAL_BYTES
+    )
+    kept = 0
+    expired = []
+    for report_id, size in RequestProfile.objects.values_list("id", "size_bytes"):
+        kept += size
+        if kept > cap:
+            expired.append(report_id)
+    if expired:
+        RequestProfile.objects.filter(id__in=expired).delete()
+    return len(expired)
+
+
+def store_report(request, user, response, report, summary):
+    max_bytes = getattr(settings, "PROFILE_REPORT_MAX_BYTES", DEFAULT_PROFILE_REPORT_MAX_BYTES)
+    report = _truncate(report, max_bytes)
+    profile = RequestProfile.objects.create(
+        user=user if user.pk else None,
+        method=request.method,
+        path=request.get_full_path()[:500],
+        status_code=response.status_code,
+        duration_ms=summary["duration"] * 1000,
+        query_count=summary["query_count"],
+        report=report,
+        size_bytes=len(report.encode("utf-8")),
+    )
+    prune_reports()
+    return profile
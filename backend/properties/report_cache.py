@@ -0,0 +1,132 @@
+import functools
+import hashlib
+import json
+import logging
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from rest_framework.response import Response
+
+from .cache_versions import cache_shared, get_domain_versions
+from .mixins import resolve_request_organization
+
+logger = logging.getLogger(__name__)
+
+REPORT_KEY_PREFIX = "report"
+# Parameters that change how a response is rendered, not what it contains.
+IGNORED_PARAMS = {"format"}
+
+
+def report_cache_enabled():
+    return getattr(settings, "REPORT_CACHE_ENABLED", True) and cache_shared()
+
+
+def report_cache():
+    return caches[getattr(settings, "REPORT_CACHE_ALIAS", "default")]
+
+
+class ReportCacheStats:
+    """Thread-safe per-report hit/miss counters for this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counts = {}
+
+    def record(self, report, hit):
+        with self._lock:
+            hits, misses = self.counts.get(report, (0, 0))
+            self.counts[report] = (hits + 1, misses) if hit else (hits, misses + 1)
+
+    def snapshot(self):
+        with self._lock:
+            counts = dict(self.counts)
+        return {
+            report: {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+            }
+            for report, (hits, misses) in sorted(counts.items())
+        }
+
+
+REPORT_CACHE_STATS = ReportCacheStats()
+
+
+def report_cache_stats():
+    """Return `{report: {"hits", "misses", "hit_rate"}}` for this process."""
+    return REPORT_CACHE_STATS.snapshot()
+
+
+def normalize_params(query_params):
+    """Sorted, de-duplicated query parameters without empty or presentation-only values."""
+    normalized = []
+    for name, values in query_params.lists():
+        if name in IGNORED_PARAMS:
+            continue
+        values = sorted({value.strip() for value in values if value.strip()})
+        if values:
+            normalized.append((name, values))
+    return sorted(normalized)
+
+
+def report_cache_key(organization_id, report, params, domains):
+    """Key for a report result at the organization's current data versions.
+
+    A write advances a domain version and with it every key built from it;
+    superseded entries are never read again and age out of the cache. The
+    date is included because reports default their periods to today.
+    """
+    payload = [
+        params,
+        get_domain_versions(organization_id, sorted(set(domains))),
+        timezone.localdate().isoformat(),
+    ]
+    digest = hashlib.sha1(json.dumps(payload, default=str).encode("utf-8")).hexdigest()
+    return f"{REPORT_KEY_PREFIX}:{organization_id}:{report}:{digest}"
+
+
+def cached_report(report, domains=None):
+    """Serve a report view's successful responses from the report cache.
+
+    Wraps a view method or action taking `(self, request, ...)`. `domains`
+    defaults to the view's `etag_domains`. Only 200 responses are stored.
+    """
+
+    def decorator(view_method):
+        @functools.wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            organization = resolve_request_organization(request)
+            if not organization or not report_cache_enabled():
+                return view_method(self, request, *args, **kwargs)
+
+            key = report_cache_key(
+                organization.id,
+                report,
+                [normalize_params(request.query_params), sorted(kwargs.items())],
+                domains or self.etag_domains,
+            )
+            cache = report_cache()
+            data = cache.get(key)
+            if data is not None:
+                REPORT_CACHE_STATS.record(report, hit=True)
+                return Response(data)
+
+            REPORT_CACHE_STATS.record(report, hit=False)
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                try:
+                    cache.set(key, response.data, None)
+                except Exception as e:
+                    logger.warning("Could not cache %s report: %s", report, e)
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,66 @@
+import contextlib
+import functools
+from contextvars import ContextVar
+
+from django.db.models import Model
+
+# Memoized results for the current request or job step. Outside a scope
+# (e.g. in background threads, which do not inherit it) nothing is cached.
+_scope_store = ContextVar("request_cache_store", default=None)
+
+
+@contextlib.contextmanager
+def request_cache_scope():
+    """Memoize `request_cached` calls until the block exits.
+
+    `RequestCacheMiddleware` opens one per HTTP request; management
+    commands open one per organization they process.
+    """
+    token = _scope_store.set({})
+    try:
+        yield
+    finally:
+        _scope_store.reset(token)
+
+
+def clear_request_cache():
+    store = _scope_store.get()
+    if store is not None:
+        store.clear()
+
+
+def _key_part(value):
+    if isinstance(value, Model) and value.pk is not None:
+        return (value._meta.label_lower, value.pk)
+    return value
+
+
+def request_cached(func):
+    """Memoize `func` per argument values within the current cache scope.
+
+    Model instance arguments are keyed by model and primary key. Meant for
+    lookups of organization-level configuration that many rows of one
+    request or job would otherwise repeat.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        store = _scope_store.get()
+        if store is None:
+            return func(*args, **kwargs)
+        key = (
+            func.__module__,
+            func.__qualname__,
+            tuple(_key_part(arg) for arg in args),
+            tuple(sorted((name, _key_part(value)) for name, value in kwargs.items())),
+        )
+        try:
+            return store[key]
+        except KeyError:
+            pass
+        except TypeError:
+            return func(*args, **kwargs)
+        result = store[key] = func(*args, **kwargs)
+        return result
+
+    return wrapper
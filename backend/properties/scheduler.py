@@ -0,0 +1,226 @@
+"""In-process job scheduler behind `manage.py scheduler`.
+
+Jobs are management commands run on fixed schedules. Each schedule is a
+series of slots `every` apart, offset by `at` from midnight UTC of the Unix
+epoch, so every node computes the same slots. A node runs a due slot only
+after taking the job's lease in the database, which records the slot as
+taken; other nodes see it as done. The lease is renewed while the job runs,
+so it only lapses when the node dies, and the next slot then catches up.
+Slots missed while no scheduler was running are caught up in one run that
+records how many were missed, since the jobs scan current data rather than
+a given date. Each job runs in its own thread (see `JobWorkers`), so a long
+run does not hold up the others.
+"""
+
+import io
+import logging
+import os
+import queue
+import socket
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import close_old_connections, connections
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ScheduledJob, ScheduledJobRun
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class Job:
+    """A management command run every `every`, `at` past each period's start (UTC)."""
+
+    def __init__(self, name, every, at=timedelta(0), command=None, options=None, lease=timedelta(hours=1)):
+        self.name = name
+        self.every = every
+        self.at = at
+        self.command = command or name
+        self.options = options or {}
+        # Renewed every third of this while the job runs: it only lapses when
+        # the node running the job dies.
+        self.lease = lease
+
+    def due_slot(self, now):
+        """The latest slot at or before `now`."""
+        periods = (now - EPOCH - self.at) // self.every
+        return EPOCH + self.at + periods * self.every
+
+    def missed_runs(self, last_slot, slot):
+        """Slots strictly between the last one run and `slot`."""
+        if last_slot is None:
+            return 0
+        return max(int((slot - last_slot) / self.every) - 1, 0)
+
+    def run(self):
+        output = io.StringIO()
+        call_command(self.command, stdout=output, stderr=output, **self.options)
+        return output.getvalue()
+
+
+JOBS = [
+    Job("send_outbox", every=timedelta(minutes=1), lease=timedelta(minutes=10)),
+    Job("run_agents", every=timedelta(hours=1)),
+    Job("run_recurring_transactions", every=timedelta(days=1), at=timedelta(hours=5)),
+    Job("apply_late_fees", every=timedelta(days=1), at=timedelta(hours=6)),
+    Job("check_notifications", every=timedelta(days=1), at=timedelta(hours=12)),
+    # Incremental training misses late-posted drafts and never unlearns voids.
+    Job("train_categorizers", every=timedelta(days=1), at=timedelta(hours=4), options={"full": True}),
+    # Bookings only mark the classifier stale; retrain those off the request path.
+    Job("train_categorizers_stale", every=timedelta(minutes=10), command="train_categorizers", options={"stale": True}),
+]
+
+
+def node_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def acquire(job, slot, node, now):
+    """Take `job`'s lease for `slot` and record the slot as taken.
+
+    Returns the job's row as it was before, whose `last_scheduled_for` is
+    the previous slot taken, or None if the lease is held or the slot was
+    already taken.
+    """
+    record, _ = ScheduledJob.objects.get_or_create(name=job.name)
+    taken = (
+        ScheduledJob.objects.filter(name=job.name)
+        .filter(Q(last_scheduled_for__isnull=True) | Q(last_scheduled_for__lt=slot))
+        .filter(Q(locked_until__isnull=True) | Q(locked_until__lte=now))
+        .update(last_scheduled_for=slot, locked_by=node, locked_until=now + job.lease)
+    )
+    return record if taken else None
+
+
+def renew_lease(job, node, now=None):
+    """Extend `node`'s lease on `job`; False if the node no longer holds it."""
+    return bool(
+        ScheduledJob.objects.filter(name=job.name, locked_by=node).update(
+            locked_until=(now or timezone.now()) + job.lease
+        )
+    )
+
+
+def release(job, node):
+    ScheduledJob.objects.filter(name=job.name, locked_by=node).update(locked_by="", locked_until=None)
+
+
+def _heartbeat(job, node, stop):
+    try:
+        while not stop.wait(job.lease.total_seconds() / 3):
+            try:
+                if not renew_lease(job, node):
+                    logger.warning("Scheduler %s lost the lease of %s", node, job.name)
+            except Exception:
+                logger.exception("Could not renew the lease of %s", job.name)
+    finally:
+        connections.close_all()
+
+
+def run_job(job, slot, node, now=None, last_slot=None):
+    """Run `job` for `slot` under its lease and record the run.
+
+    `last_slot` is the slot taken before this one, for counting missed runs.
+    """
+    record = ScheduledJob.objects.get(name=job.name)
+    run = ScheduledJobRun.objects.create(
+        job=record,
+        scheduled_for=slot,
+        missed_runs=job.missed_runs(last_slot, slot),
+        node=node,
+        started_at=now or timezone.now(),
+    )
+    if run.missed_runs:
+        logger.warning("Catching up %s: %s runs were missed", job.name, run.missed_runs)
+    close_old_connections()
+    stop = threading.Event()
+    heartbeat = threading.Thread(
+        target=_heartbeat, args=(job, node, stop), name=f"scheduler-lease-{job.name}", daemon=True
+    )
+    heartbeat.start()
+    started = time.perf_counter()
+    try:
+        run.output = job.run()
+        run.status = ScheduledJobRun.STATUS_SUCCEEDED
+    except Exception:
+        logger.exception("Scheduled job %s failed", job.name)
+        run.output = traceback.format_exc()
+        run.status = ScheduledJobRun.STATUS_FAILED
+    finally:
+        stop.set()
+        heartbeat.join()
+        close_old_connections()
+    run.duration_ms = (time.perf_counter() - started) * 1000
+    run.finished_at = timezone.now()
+    run.save(update_fields=["output", "status", "duration_ms", "finished_at"])
+    # A failed slot is not retried; the next slot runs the job again.
+    release(job, node)
+    return run
+
+
+def run_due_jobs(jobs=None, now=None, node=None):
+    """Run every job with a slot due at `now` that no other node holds. Returns the runs."""
+    now = now or timezone.now()
+    node = node or node_name()
+    runs = []
+    for job in JOBS if jobs is None else jobs:
+        slot = job.due_slot(now)
+        previous = acquire(job, slot, node, now)
+        if previous is not None:
+            runs.append(run_job(job, slot, node, now, last_slot=previous.last_scheduled_for))
+    return runs
+
+
+class JobWorkers:
+    """Runs each job's due slots in a thread of its own.
+
+    An hour-long `run_agents` must not hold up the every-minute
+    `send_outbox`. A job whose thread is still running is not started again.
+    """
+
+    def __init__(self, jobs, node):
+        self.jobs = jobs
+        self.node = node
+        self.threads = {}
+        self.finished = queue.SimpleQueue()
+
+    def start_due(self):
+        for job in self.jobs:
+            thread = self.threads.get(job.name)
+            if thread and thread.is_alive():
+                continue
+            thread = threading.Thread(target=self._run, args=(job,), name=f"scheduler-{job.name}", daemon=True)
+            self.threads[job.name] = thread
+            thread.start()
+
+    def _run(self, job):
+        try:
+            for run in run_due_jobs([job], node=self.node):
+                self.finished.put(run)
+        except Exception:
+            logger.exception("Scheduler could not run %s", job.name)
+        finally:
+            connections.close_all()
+
+    def collect(self):
+        """Runs finished since the last call."""
+        runs = []
+        while True:
+            try:
+                runs.append(self.finished.get_nowait())
+            except queue.Empty:
+                return runs
+
+
+def prune_runs(now=None):
+    """Delete run history older than `SCHEDULER_HISTORY_DAYS`."""
+    cutoff = (now or timezone.now()) - timedelta(days=getattr(settings, "SCHEDULER_HISTORY_DAYS", 30))
+    deleted, _ = ScheduledJobRun.objects.filter(started_at__lt=cutoff).delete()
+    return deleted
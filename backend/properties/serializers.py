@@ -1,5 +1,16 @@
 from django.contrib.auth.models import User
-from django.db.models import Sum, Count
+from django.db.models import (
+    Count,
+    DecimalField,
+    IntegerField,
+    OuterRef,
+    Prefetch,
+    Subquery,
+    Sum,
+    Value,
+    prefetch_related_objects,
+)
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from datetime import timedelta
 from decimal import Decimal
@@ -45,6 +56,8 @@ from .models import (
     WorkOrderNote,
     AgentSkill,
     AgentTask,
+    ChatMessage,
+    ChatSession,
 )
 from .mixins import resolve_request_organization
 
@@ -621,6 +634,15 @@ class BillCreateSerializer(serializers.ModelSerializer):
         return bill
 
 
+def _vendor_bill_stats(vendor):
+    """Bill aggregates annotated by `VendorViewSet`, computed here for a lone instance."""
+    if not hasattr(vendor, "bill_count"):
+        stats = Bill.objects.filter(vendor=vendor).aggregate(**Bill.aggregates())
+        for name, value in stats.items():
+            setattr(vendor, name, value)
+    return vendor
+
+
 class VendorListSerializer(serializers.ModelSerializer):
     total_bills = serializers.SerializerMethodField(read_only=True)
     outstanding_balance = serializers.SerializerMethodField(read_only=True)
@@ -642,12 +664,10 @@ class VendorListSerializer(serializers.ModelSerializer):
         read_only_fields = ["organization"]
 
     def get_total_bills(self, obj):
-        return obj.bills.count()
+        return _vendor_bill_stats(obj).bill_count
 
     def get_outstanding_balance(self, obj):
-        return obj.bills.filter(status__in=[Bill.STATUS_PENDING, Bill.STATUS_PARTIAL, Bill.STATUS_OVERDUE]).aggregate(
-            total=Sum("balance_due")
-        )["total"] or 0
+        return _vendor_bill_stats(obj).outstanding_balance
 
 
 class VendorSerializer(serializers.ModelSerializer):
@@ -681,29 +701,19 @@ class VendorSerializer(serializers.ModelSerializer):
         read_only_fields = ["organization"]
 
     def get_total_bills(self, obj):
-        return obj.bills.count()
+        return _vendor_bill_stats(obj).bill_count
 
     def get_total_paid(self, obj):
-        return obj.bills.aggregate(
-            total=Sum("payments__amount")
-        )["total"] or 0
+        return _vendor_bill_stats(obj).total_paid
 
     def get_outstanding_balance(self, obj):
-        return obj.bills.filter(
-            status__in=[Bill.STATUS_PENDING, Bill.STATUS_PARTIAL, Bill.STATUS_OVERDUE]
-        ).aggregate(total=Sum("balance_due"))["total"] or 0
+        return _vendor_bill_stats(obj).outstanding_balance
 
     def get_bill_count_by_status(self, obj):
-        counts = dict(
-            obj.bills.values("status").annotate(count=Count("id")).values_list("status", "count")
-        )
+        stats = _vendor_bill_stats(obj)
         return {
-            Bill.STATUS_DRAFT: counts.get(Bill.STATUS_DRAFT, 0),
-            Bill.STATUS_PENDING: counts.get(Bill.STATUS_PENDING, 0),
-            Bill.STATUS_PARTIAL: counts.get(Bill.STATUS_PARTIAL, 0),
-            Bill.STATUS_PAID: counts.get(Bill.STATUS_PAID, 0),
-            Bill.STATUS_OVERDUE: counts.get(Bill.STATUS_OVERDUE, 0),
-            Bill.STATUS_CANCELLED: counts.get(Bill.STATUS_CANCELLED, 0),
+            status: getattr(stats, f"bill_count_{status}")
+            for status, _label in Bill.STATUS_CHOICES
         }
 
 
@@ -919,6 +929,36 @@ class LateFeeRuleSerializer(serializers.ModelSerializer):
         read_only_fields = ["organization"]
 
 
+def _per_account(queryset, aggregate, output_field):
+    subquery = (
+        queryset.filter(account=OuterRef("pk"))
+        .order_by()
+        .values("account")
+        .annotate(total=aggregate)
+        .values("total")
+    )
+    return Coalesce(Subquery(subquery, output_field=output_field), Value(0), output_field=output_field)
+
+
+def annotate_category_totals(queryset):
+    """Annotate what `AccountingCategorySerializer` counts and sums per account."""
+    amount = DecimalField(max_digits=14, decimal_places=2)
+    posted_lines = JournalEntryLine.objects.filter(journal_entry__status=JournalEntry.STATUS_POSTED)
+    children = (
+        AccountingCategory.objects.filter(parent_account=OuterRef("pk"))
+        .order_by()
+        .values("parent_account")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    return queryset.annotate(
+        children_total=Coalesce(Subquery(children, output_field=IntegerField()), Value(0)),
+        journal_lines_total=_per_account(JournalEntryLine.objects.all(), Count("pk"), IntegerField()),
+        posted_debits=_per_account(posted_lines, Sum("debit_amount"), amount),
+        posted_credits=_per_account(posted_lines, Sum("credit_amount"), amount),
+    )
+
+
 class AccountingCategorySerializer(serializers.ModelSerializer):
     parent_account = serializers.PrimaryKeyRelatedField(
         queryset=AccountingCategory.objects.all(),
@@ -961,23 +1001,29 @@ class AccountingCategorySerializer(serializers.ModelSerializer):
         if obj.is_header:
             return None
 
-        posted_lines = obj.journal_lines.filter(journal_entry__status=JournalEntry.STATUS_POSTED)
-        totals = posted_lines.aggregate(
-            total_debits=Sum("debit_amount"),
-            total_credits=Sum("credit_amount"),
-        )
-        debits = Decimal(totals["total_debits"] or 0)
-        credits = Decimal(totals["total_credits"] or 0)
+        if hasattr(obj, "posted_debits"):
+            debits = Decimal(obj.posted_debits or 0)
+            credits = Decimal(obj.posted_credits or 0)
+        else:
+            posted_lines = obj.journal_lines.filter(journal_entry__status=JournalEntry.STATUS_POSTED)
+            totals = posted_lines.aggregate(
+                total_debits=Sum("debit_amount"),
+                total_credits=Sum("credit_amount"),
+            )
+            debits = Decimal(totals["total_debits"] or 0)
+            credits = Decimal(totals["total_credits"] or 0)
 
         if obj.normal_balance == AccountingCategory.NORMAL_BALANCE_CREDIT:
             return float(credits - debits)
         return float(debits - credits)
 
     def get_children_count(self, obj):
-        return obj.sub_accounts.count()
+        count = getattr(obj, "children_total", None)
+        return obj.sub_accounts.count() if count is None else count
 
     def get_journal_lines_count(self, obj):
-        return obj.journal_lines.count()
+        count = getattr(obj, "journal_lines_total", None)
+        return obj.journal_lines.count() if count is None else count
 
 
 class JournalEntryLineSerializer(serializers.ModelSerializer):
@@ -1023,6 +1069,11 @@ class JournalEntryLineSerializer(serializers.ModelSerializer):
         return obj.property.name if obj.property else None
 
 
+def journal_lines_prefetch():
+    """Prefetch for a journal entry's lines with what `JournalEntrySerializer` reads."""
+    return Prefetch("lines", queryset=JournalEntryLine.objects.select_related("account", "property"))
+
+
 class JournalEntrySerializer(serializers.ModelSerializer):
     lines = JournalEntryLineSerializer(many=True)
     total_debits = serializers.SerializerMethodField()
@@ -1066,11 +1117,20 @@ class JournalEntrySerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("At least one line is required.")
         return lines
 
+    def to_representation(self, instance):
+        # Lines and totals are both read from one prefetch of the entry's lines.
+        reads_lines = any(
+            name in self.fields for name in ("lines", "total_debits", "total_credits", "is_balanced")
+        )
+        if reads_lines and "lines" not in getattr(instance, "_prefetched_objects_cache", {}):
+            prefetch_related_objects([instance], journal_lines_prefetch())
+        return super().to_representation(instance)
+
     def get_total_debits(self, obj):
-        return obj.lines.aggregate(total=Sum("debit_amount"))["total"] or 0
+        return sum((line.debit_amount for line in obj.lines.all()), Decimal("0.00"))
 
     def get_total_credits(self, obj):
-        return obj.lines.aggregate(total=Sum("credit_amount"))["total"] or 0
+        return sum((line.credit_amount for line in obj.lines.all()), Decimal("0.00"))
 
     def get_is_balanced(self, obj):
         return self.get_total_debits(obj) == self.get_total_credits(obj)
@@ -1184,6 +1244,58 @@ class BlogPostDetailSerializer(serializers.ModelSerializer):
         ]
 
 
+def _subquery_total(queryset, aggregate, output_field):
+    subquery = queryset.order_by().values("organization").annotate(total=aggregate).values("total")
+    return Coalesce(Subquery(subquery, output_field=output_field), Value(0), output_field=output_field)
+
+
+def annotate_reconciliation_totals(queryset):
+    """Annotate the counts and balances `BankReconciliationSerializer` reports.
+
+    Each total mirrors the per-object query in the serializer, so a list
+    costs one query however many reconciliations it holds.
+    """
+    amount = DecimalField(max_digits=14, decimal_places=2)
+    matches = ReconciliationMatch.objects.filter(reconciliation=OuterRef(OuterRef("pk")))
+    account_lines = JournalEntryLine.objects.filter(
+        organization=OuterRef("organization"),
+        account=OuterRef("account"),
+        journal_entry__status=JournalEntry.STATUS_POSTED,
+    )
+    balance_lines = account_lines.filter(journal_entry__entry_date__lte=OuterRef("end_date"))
+    unmatched_lines = account_lines.filter(
+        journal_entry__entry_date__gte=OuterRef("start_date"),
+        journal_entry__entry_date__lte=OuterRef("end_date"),
+    ).exclude(
+        id__in=matches.filter(journal_entry_line_id__isnull=False).values("journal_entry_line_id")
+    )
+    unmatched_imports = ImportedTransaction.objects.filter(
+        organization=OuterRef("organization"),
+        status=ImportedTransaction.STATUS_BOOKED,
+        date__gte=OuterRef("start_date"),
+        date__lte=OuterRef("end_date"),
+        journal_entry__lines__account=OuterRef("account"),
+    ).exclude(
+        id__in=matches.filter(imported_transaction_id__isnull=False).values("imported_transaction_id")
+    )
+    matched = (
+        ReconciliationMatch.objects.filter(reconciliation=OuterRef("pk"))
+        .order_by()
+        .values("reconciliation")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    return queryset.select_related("account").annotate(
+        matched_total=Coalesce(Subquery(matched, output_field=IntegerField()), Value(0)),
+        book_debits=_subquery_total(balance_lines, Sum("debit_amount"), amount),
+        book_credits=_subquery_total(balance_lines, Sum("credit_amount"), amount),
+        unmatched_book_total=_subquery_total(unmatched_lines, Count("pk"), IntegerField()),
+        unmatched_bank_total=_subquery_total(
+            unmatched_imports, Count("pk", distinct=True), IntegerField()
+        ),
+    )
+
+
 class BankReconciliationSerializer(serializers.ModelSerializer):
     account_name = serializers.SerializerMethodField(read_only=True)
     matched_count = serializers.SerializerMethodField(read_only=True)
@@ -1232,7 +1344,8 @@ class BankReconciliationSerializer(serializers.ModelSerializer):
         return obj.account.name
 
     def get_matched_count(self, obj):
-        return obj.matches.count()
+        count = getattr(obj, "matched_total", None)
+        return obj.matches.count() if count is None else count
 
     def get_matched_import_queryset(self, obj):
         return obj.matches.exclude(imported_transaction_id__isnull=True)
@@ -1241,24 +1354,34 @@ class BankReconciliationSerializer(serializers.ModelSerializer):
         return obj.matches.exclude(journal_entry_line_id__isnull=True)
 
     def get_unmatched_bank_count(self, obj):
+        count = getattr(obj, "unmatched_bank_total", None)
+        if count is not None and obj.account_id:
+            return count
         return self._unmatched_bank_transactions(obj).count()
 
     def get_unmatched_book_count(self, obj):
+        count = getattr(obj, "unmatched_book_total", None)
+        if count is not None and obj.account_id:
+            return count
         return self._unmatched_book_lines(obj).count()
 
     def get_book_balance(self, obj):
-        lines = JournalEntryLine.objects.filter(
-            organization=obj.organization,
-            account=obj.account,
-            journal_entry__status=JournalEntry.STATUS_POSTED,
-            journal_entry__entry_date__lte=obj.end_date,
-        )
-        totals = lines.aggregate(
-            total_debits=Sum("debit_amount"),
-            total_credits=Sum("credit_amount"),
-        )
-        debits = Decimal(totals["total_debits"] or 0)
-        credits = Decimal(totals["total_credits"] or 0)
+        if hasattr(obj, "book_debits"):
+            debits = Decimal(obj.book_debits or 0)
+            credits = Decimal(obj.book_credits or 0)
+        else:
+            lines = JournalEntryLine.objects.filter(
+                organization=obj.organization,
+                account=obj.account,
+                journal_entry__status=JournalEntry.STATUS_POSTED,
+                journal_entry__entry_date__lte=obj.end_date,
+            )
+            totals = lines.aggregate(
+                total_debits=Sum("debit_amount"),
+                total_credits=Sum("credit_amount"),
+            )
+            debits = Decimal(totals["total_debits"] or 0)
+            credits = Decimal(totals["total_credits"] or 0)
         if obj.account and obj.account.normal_balance == AccountingCategory.NORMAL_BALANCE_CREDIT:
             return float(credits - debits)
         return float(debits - credits)
@@ -1638,15 +1761,17 @@ class AgentSkillSerializer(serializers.ModelSerializer):
         ]
 
     def get_pending_count(self, obj):
-        return obj.tasks.filter(status=AgentTask.STATUS_PENDING).count()
+        return obj.tasks_pending
 
     def get_recent_tasks(self, obj):
-        tasks = obj.tasks.order_by("-created_at")[:3]
+        tasks = getattr(obj, "recent_task_list", None)
+        if tasks is None:
+            tasks = obj.tasks.order_by("-created_at")[:3]
         return AgentTaskListSerializer(tasks, many=True, read_only=True).data
 
 
 class AgentTaskListSerializer(serializers.ModelSerializer):
-    skill = serializers.PrimaryKeyRelatedField(source="skill", read_only=True)
+    skill = serializers.PrimaryKeyRelatedField(read_only=True)
     skill_type = serializers.CharField(source="skill.skill_type", read_only=True)
     related_property_name = serializers.CharField(
         source="related_property.name", read_only=True
@@ -1683,16 +1808,12 @@ class AgentTaskListSerializer(serializers.ModelSerializer):
 
 
 class AgentTaskDetailSerializer(AgentTaskListSerializer):
-    related_property = serializers.PrimaryKeyRelatedField(
-        source="related_property", read_only=True
-    )
-    related_unit = serializers.PrimaryKeyRelatedField(source="related_unit", read_only=True)
-    related_lease = serializers.PrimaryKeyRelatedField(source="related_lease", read_only=True)
-    related_maintenance = serializers.PrimaryKeyRelatedField(
-        source="related_maintenance", read_only=True
-    )
-    related_lead = serializers.PrimaryKeyRelatedField(source="related_lead", read_only=True)
-    related_bill = serializers.PrimaryKeyRelatedField(source="related_bill", read_only=True)
+    related_property = serializers.PrimaryKeyRelatedField(read_only=True)
+    related_unit = serializers.PrimaryKeyRelatedField(read_only=True)
+    related_lease = serializers.PrimaryKeyRelatedField(read_only=True)
+    related_maintenance = serializers.PrimaryKeyRelatedField(read_only=True)
+    related_lead = serializers.PrimaryKeyRelatedField(read_only=True)
+    related_bill = serializers.PrimaryKeyRelatedField(read_only=True)
     resolved_by = serializers.PrimaryKeyRelatedField(read_only=True)
     full_description = serializers.CharField(source="description", read_only=True)
 
@@ -1712,3 +1833,22 @@ class AgentTaskDetailSerializer(AgentTaskListSerializer):
             "full_description",
         ]
 
+
+
+class ChatMessageSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ChatMessage
+        fields = ["id", "role", "content", "created_at"]
+
+
+class ChatSessionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ChatSession
+        fields = ["id", "title", "created_at", "updated_at"]
+
+
+class ChatSessionDetailSerializer(ChatSessionSerializer):
+    messages = ChatMessageSerializer(many=True, read_only=True)
+
+    class Meta(ChatSessionSerializer.Meta):
+        fields = ChatSessionSerializer.Meta.fields + ["summary", "messages"]
@@ -0,0 +1,227 @@
+"""Optional organization sharding.
+
+Every shard database carries the full schema. Organization-scoped rows live
+on the shard the `OrganizationShard` directory assigns their organization
+to (the default database when unassigned); users, profiles, organizations
+and the directory itself live on the default database. Users and
+organizations are also copied to each shard as reference rows so the
+foreign keys of organization data hold there.
+
+Rows are routed by the organization of the instance involved or, for plain
+querysets, by the organization active in the current request or job (see
+`organization_scope`).
+"""
+
+import contextlib
+from contextvars import ContextVar
+
+from django.apps import apps
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Q
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .request_cache import request_cached
+
+# properties models kept on the default database with auth and sessions.
+GLOBAL_MODELS = {
+    "properties.blogpost",
+    "properties.organization",
+    "properties.organizationinvitation",
+    "properties.organizationshard",
+    "properties.outgoingemail",
+    "properties.requestprofile",
+    "properties.scheduledjob",
+    "properties.scheduledjobrun",
+    "properties.userprofile",
+}
+# Global models copied to every shard so organization data can reference them.
+REFERENCE_MODELS = ("auth.user", "properties.organization")
+
+_active = ContextVar("shard_active_organization", default=None)
+
+
+class OrganizationMoving(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "This organization is being moved to another database. Try again shortly."
+    default_code = "organization_moving"
+
+
+def shard_aliases():
+    """Database aliases organizations can be assigned to, the default first."""
+    return [DEFAULT_DB_ALIAS] + [
+        alias for alias in getattr(settings, "SHARD_DATABASES", []) if alias != DEFAULT_DB_ALIAS
+    ]
+
+
+def sharding_enabled():
+    return bool(getattr(settings, "SHARD_DATABASES", None))
+
+
+def is_organization_scoped(model):
+    return model._meta.app_label == "properties" and model._meta.label_lower not in GLOBAL_MODELS
+
+
+@request_cached
+def organization_shard(organization_id):
+    """`(alias, moving)` for an organization, from the directory.
+
+    Read from the default database once per request or job step (see
+    `request_cached`), never from a cache shared across requests: every
+    worker must notice a move as soon as the directory changes.
+    `move_organization` waits for in-flight requests before copying and
+    before deleting.
+    """
+    if not organization_id or not sharding_enabled():
+        return DEFAULT_DB_ALIAS, False
+    OrganizationShard = apps.get_model("properties", "OrganizationShard")
+    row = (
+        OrganizationShard.objects.using(DEFAULT_DB_ALIAS)
+        .filter(organization_id=organization_id)
+        .values_list("alias", "is_moving")
+        .first()
+    )
+    return tuple(row) if row else (DEFAULT_DB_ALIAS, False)
+
+
+def organization_db(organization):
+    """Database alias holding `organization`'s data (an instance or an id)."""
+    organization_id = getattr(organization, "pk", organization)
+    return organization_shard(organization_id)[0]
+
+
+class _Scope:
+    def __init__(self, organization_id=None):
+        self.organization_id = organization_id
+
+
+@contextlib.contextmanager
+def organization_scope(organization=None):
+    """Route organization-scoped querysets in the block to `organization`'s shard.
+
+    `ShardRoutingMiddleware` opens an empty scope per request, which
+    `resolve_request_organization` fills in; jobs open one per organization.
+    """
+    token = _active.set(_Scope(getattr(organization, "pk", organization)))
+    try:
+        yield
+    finally:
+        _active.reset(token)
+
+
+def activate_organization(organization):
+    """Make `organization` the one routed to for the rest of the current scope."""
+    scope = _active.get()
+    if scope is not None:
+        scope.organization_id = getattr(organization, "pk", organization)
+
+
+def active_organization_id():
+    scope = _active.get()
+    return scope.organization_id if scope is not None else None
+
+
+def shard_atomic():
+    """`transaction.atomic()` on the database of the active organization."""
+    return transaction.atomic(using=organization_db(active_organization_id()))
+
+
+def _instance_organization_id(instance):
+    if instance is None:
+        return None
+    if instance._meta.label_lower == "properties.organization":
+        return instance.pk
+    return getattr(instance, "organization_id", None)
+
+
+class OrganizationShardRouter:
+    """Route organization-scoped models to their organization's shard.
+
+    Organizations on the default database are left to the next router, so
+    the read replica keeps working for them.
+    """
+
+    def _shard(self, model, hints, for_write):
+        if not sharding_enabled():
+            return None
+        instance = hints.get("instance")
+        instance_db = instance._state.db if instance is not None else None
+        if not is_organization_scoped(model):
+            # Users and organizations related to shard rows are read from the
+            # default database rather than from the shard's reference copies.
+            return DEFAULT_DB_ALIAS if instance_db in settings.SHARD_DATABASES else None
+        organization_id = _instance_organization_id(instance)
+        if organization_id is None and instance_db in settings.SHARD_DATABASES:
+            return instance_db
+        if organization_id is None:
+            organization_id = active_organization_id()
+        alias, moving = organization_shard(organization_id)
+        if for_write and moving:
+            raise OrganizationMoving()
+        return None if alias == DEFAULT_DB_ALIAS else alias
+
+    def db_for_read(self, model, **hints):
+        return self._shard(model, hints, for_write=False)
+
+    def db_for_write(self, model, **hints):
+        return self._shard(model, hints, for_write=True)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if sharding_enabled() and {obj1._state.db, obj2._state.db} <= set(shard_aliases()):
+            return True
+        return None
+
+
+def _reference_models():
+    return [apps.get_model(label) for label in REFERENCE_MODELS]
+
+
+def copy_reference_row(instance, alias):
+    """Insert or update the reference copy of a user or organization on `alias`."""
+    model = type(instance)
+    values = {field.attname: getattr(instance, field.attname) for field in model._meta.concrete_fields}
+    manager = model._base_manager.using(alias)
+    if not manager.filter(pk=instance.pk).update(**values):
+        # bulk_create sends no signals, so no profile is created for the copy.
+        manager.bulk_create([model(**values)])
+
+
+def sync_reference_rows(alias, batch_size=1000):
+    """Copy every user and organization to shard `alias`."""
+    for model in _reference_models():
+        for instance in model._base_manager.using(DEFAULT_DB_ALIAS).order_by("pk").iterator(batch_size):
+            copy_reference_row(instance, alias)
+
+
+def _parent_fields(model):
+    return [
+        field
+        for field in model._meta.concrete_fields
+        if field.many_to_one
+        and field.name != "organization"
+        and is_organization_scoped(field.related_model)
+        and any(f.name == "organization" for f in field.related_model._meta.concrete_fields)
+    ]
+
+
+def organization_rows_filter(model, organization_id):
+    """`Q` selecting the rows of an organization-scoped model that belong to an organization.
+
+    Rows with a null `organization` (and models without one) belong to the
+    organization of their parent.
+    """
+    has_organization = any(field.name == "organization" for field in model._meta.concrete_fields)
+    condition = Q(organization_id=organization_id) if has_organization else Q(pk__in=[])
+    for field in _parent_fields(model):
+        parent = Q(**{f"{field.name}__organization_id": organization_id})
+        condition |= (Q(organization__isnull=True) & parent) if has_organization else parent
+    return condition
+
+
+def organization_models():
+    return [
+        model
+        for model in apps.get_app_config("properties").get_models()
+        if is_organization_scoped(model) and not model._meta.proxy
+    ]
@@ -1,10 +1,21 @@
 from decimal import Decimal
 
+from django.apps import apps
+from django.conf import settings
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from .models import Payment, RentLedgerEntry, UserProfile
+from .authentication import bump_profile_version
+from .cache_versions import (
+    DATA_DOMAINS,
+    SHARED_MODELS,
+    bump_on_commit,
+    instance_organization_id,
+)
+from .models import Organization, Payment, RentLedgerEntry, UserProfile
+from .sharding import copy_reference_row
 
 import logging
 
@@ -21,6 +32,15 @@ def create_user_profile(sender, instance, created, **kwargs):
         )
 
 
+@receiver(post_save, sender=User, dispatch_uid="profile-version-user-save")
+@receiver(post_delete, sender=User, dispatch_uid="profile-version-user-delete")
+@receiver(post_save, sender=UserProfile, dispatch_uid="profile-version-profile-save")
+@receiver(post_delete, sender=UserProfile, dispatch_uid="profile-version-profile-delete")
+def invalidate_token_claims(sender, instance, **kwargs):
+    user_id = instance.pk if sender is User else instance.user_id
+    transaction.on_commit(lambda: bump_profile_version(user_id))
+
+
 def recalculate_lease_balances(lease_id):
     running = Decimal("0.00")
     entries = RentLedgerEntry.objects.filter(lease_id=lease_id).order_by("date", "created_at", "id")
@@ -51,3 +71,40 @@ def create_ledger_entry_for_completed_payment(sender, instance, created, **kwarg
         date=instance.payment_date,
     )
     recalculate_lease_balances(instance.lease_id)
+
+
+# Models whose writes advance the per-organization data versions used by
+# cached derived data (AI portfolio context, report caches, ETags).
+VERSIONED_MODELS = [
+    apps.get_model(label)
+    for label in sorted(set(SHARED_MODELS).union(*DATA_DOMAINS.values()))
+]
+
+
+def bump_data_version(sender, instance, **kwargs):
+    organization_id = instance_organization_id(instance)
+    bump_on_commit(organization_id, sender._meta.label_lower)
+
+
+for _model in VERSIONED_MODELS:
+    post_save.connect(bump_data_version, sender=_model, dispatch_uid=f"data-version-save-{_model.__name__}")
+    post_delete.connect(bump_data_version, sender=_model, dispatch_uid=f"data-version-delete-{_model.__name__}")
+
+
+@receiver(post_save, sender=User, dispatch_uid="shard-reference-user-save")
+@receiver(post_save, sender=Organization, dispatch_uid="shard-reference-organization-save")
+def copy_reference_row_to_shards(sender, instance, using, **kwargs):
+    if using != DEFAULT_DB_ALIAS:
+        return
+    for alias in getattr(settings, "SHARD_DATABASES", []):
+        copy_reference_row(instance, alias)
+
+
+@receiver(post_delete, sender=User, dispatch_uid="shard-reference-user-delete")
+@receiver(post_delete, sender=Organization, dispatch_uid="shard-reference-organization-delete")
+def delete_reference_row_from_shards(sender, instance, using, **kwargs):
+    if using != DEFAULT_DB_ALIAS:
+        return
+    for alias in getattr(settings, "SHARD_DATABASES", []):
+        # Cascades to the organization data on the shard, as it does here.
+        sender._base_manager.using(alias).filter(pk=instance.pk).delete()
@@ -0,0 +1,34 @@
+import os
+import tempfile
+
+from django.conf import settings
+from django.db import connections
+
+
+def add_sqlite_databases(*aliases):
+    """Create and migrate a temporary SQLite database for each alias.
+
+    For test classes that need extra databases (shards, a replica): call it
+    before `super().setUpClass()`, with `databases = "__all__"` on the class
+    (the runner checks listed aliases before the class sets them up), and
+    undo it with `remove_databases` in `tearDownClass`. Other test modules
+    never see these aliases.
+    """
+    for alias in aliases:
+        path = os.path.join(tempfile.gettempdir(), f"{alias}-{os.getpid()}.sqlite3")
+        config = {**settings.DATABASES["default"], "NAME": path, "TEST": {"NAME": path}}
+        settings.DATABASES[alias] = config
+        connections.settings[alias] = connections.configure_settings(
+            {"default": settings.DATABASES["default"], alias: config}
+        )[alias]
+        connections[alias].creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+
+
+def remove_databases(*aliases):
+    for alias in aliases:
+        connection = connections[alias]
+        connection.creation.destroy_test_db(connection.settings_dict["NAME"], verbosity=0)
+        del connections[alias]
+        # Usually the same dict as settings.DATABASES.
+        connections.settings.pop(alias, None)
+        settings.DATABASES.pop(alias, None)
@@ -15,7 +15,9 @@ from datetime import date, timedelta
 from decimal import Decimal
 
 from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.test import APIClient
 
@@ -312,6 +314,25 @@ class TestJournalEntryLifecycle(AccountingTestBase):
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         return response.data
 
+    def test_journal_list_query_count_is_constant(self):
+        self._create_posted_entry(amount=Decimal("10.00"))
+        self.client.get("/api/accounting/journal-entries/")
+        with CaptureQueriesContext(connection) as one_entry:
+            self.client.get("/api/accounting/journal-entries/")
+
+        for index in range(5):
+            self._create_posted_entry(amount=Decimal("20.00") + index, memo=f"JE {index}")
+        with CaptureQueriesContext(connection) as six_entries:
+            response = self.client.get("/api/accounting/journal-entries/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(six_entries), len(one_entry))
+        entries = response.data["results"] if isinstance(response.data, dict) else response.data
+        self.assertEqual(len(entries), 6)
+        for entry in entries:
+            self.assertTrue(entry["is_balanced"])
+            self.assertEqual(entry["total_debits"], entry["total_credits"])
+
     def test_create_draft_journal_entry(self):
         data = self._create_draft_entry()
         entry = JournalEntry.objects.get(id=data["id"])
@@ -0,0 +1,234 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from properties.management.commands.run_agents import create_agent_task, ensure_agent_skills
+from properties.models import (
+    AgentSkill,
+    AgentTask,
+    Lease,
+    Message,
+    Organization,
+    Payment,
+    Property,
+    Tenant,
+    Unit,
+    UserProfile,
+)
+
+
+class TestAgentSkillCounters(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="owner", password="SecurePass123!")
+        self.organization = Organization.objects.create(name="Agents Org", owner=self.user)
+        UserProfile.objects.filter(user=self.user).update(
+            role=UserProfile.ROLE_LANDLORD, organization=self.organization
+        )
+        self.user.refresh_from_db()
+        ensure_agent_skills(self.organization)
+        self.skill = AgentSkill.objects.get(organization=self.organization, skill_type="collections")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _task(self, title="Rent overdue", **fields):
+        return create_agent_task(
+            organization=self.organization,
+            skill=self.skill,
+            task_type="rent_overdue",
+            title=title,
+            description="No payment received.",
+            **fields,
+        )
+
+    def _counts(self):
+        self.skill.refresh_from_db()
+        return self.skill.tasks_pending, self.skill.tasks_completed
+
+    def test_counters_follow_task_lifecycle(self):
+        first, second, third = self._task("A"), self._task("B"), self._task("C")
+        self.assertEqual(self._counts(), (3, 0))
+
+        response = self.client.post(f"/api/agent-tasks/{first.id}/approve/", {}, format="json")
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(self._counts(), (2, 1))
+
+        response = self.client.post(f"/api/agent-tasks/{second.id}/dismiss/", {}, format="json")
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(self._counts(), (1, 2))
+
+        # Repeating a transition does not count twice.
+        self.client.post(f"/api/agent-tasks/{second.id}/dismiss/", {}, format="json")
+        self.assertEqual(self._counts(), (1, 2))
+
+        response = self.client.delete(f"/api/agent-tasks/{third.id}/")
+        self.assertEqual(response.status_code, 204, response.content)
+        self.assertEqual(self._counts(), (0, 2))
+
+    def test_skill_list_reads_counters(self):
+        for title in ("A", "B"):
+            self._task(title)
+        response = self.client.get("/api/agent-skills/")
+        self.assertEqual(response.status_code, 200, response.content)
+        skills = response.data["results"] if isinstance(response.data, dict) else response.data
+        collections = next(skill for skill in skills if skill["skill_type"] == "collections")
+        self.assertEqual(collections["pending_count"], 2)
+        self.assertEqual(len(collections["recent_tasks"]), 2)
+
+        summary = self.client.get("/api/agent-tasks/summary/").data
+        self.assertEqual(summary["total_pending"], 2)
+        self.assertEqual(summary["total_by_skill"]["collections"], 2)
+
+    def test_filtered_summary_counts_only_matching_tasks(self):
+        self._task("A", priority=AgentTask.PRIORITY_URGENT)
+        self._task("B", priority=AgentTask.PRIORITY_LOW)
+
+        summary = self.client.get("/api/agent-tasks/summary/", {"priority": AgentTask.PRIORITY_URGENT}).data
+
+        self.assertEqual(summary["total_pending"], 1)
+        self.assertEqual(summary["total_by_skill"]["collections"], 1)
+        self.assertEqual(summary["total_by_priority"][AgentTask.PRIORITY_URGENT], 1)
+        self.assertEqual(summary["total_by_priority"][AgentTask.PRIORITY_LOW], 0)
+
+    def test_reconcile_command_fixes_drift(self):
+        self._task()
+        AgentSkill.objects.filter(pk=self.skill.pk).update(tasks_pending=7, tasks_completed=3)
+        AgentTask.objects.create(
+            organization=self.organization,
+            skill=self.skill,
+            task_type="rent_overdue",
+            title="Resolved elsewhere",
+            description="",
+            status=AgentTask.STATUS_AUTO_RESOLVED,
+        )
+
+        call_command("reconcile_agent_counts", stdout=StringIO())
+
+        self.assertEqual(self._counts(), (1, 1))
+
+
+class TestAgentTaskPreviews(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="owner", password="SecurePass123!")
+        self.organization = Organization.objects.create(name="Preview Org", owner=self.user)
+        UserProfile.objects.filter(user=self.user).update(
+            role=UserProfile.ROLE_LANDLORD, organization=self.organization
+        )
+        self.user.refresh_from_db()
+        ensure_agent_skills(self.organization)
+        prop = Property.objects.create(
+            organization=self.organization,
+            name="Elm Court",
+            address_line1="1 Elm St",
+            city="Springfield",
+            state="IL",
+            zip_code="62701",
+            property_type=Property.PROPERTY_TYPE_RESIDENTIAL,
+        )
+        unit = Unit.objects.create(
+            property=prop,
+            organization=self.organization,
+            unit_number="1A",
+            bedrooms=2,
+            bathrooms=Decimal("1.0"),
+            square_feet=800,
+            rent_amount=Decimal("1200.00"),
+        )
+        tenant = Tenant.objects.create(
+            organization=self.organization,
+            first_name="Ada",
+            last_name="Lane",
+            email="ada@example.test",
+            phone="555-0100",
+        )
+        self.lease = Lease.objects.create(
+            unit=unit,
+            tenant=tenant,
+            organization=self.organization,
+            start_date=date.today() - timedelta(days=300),
+            end_date=date.today() + timedelta(days=60),
+            monthly_rent=Decimal("1200.00"),
+            security_deposit=Decimal("1200.00"),
+        )
+        self.task = create_agent_task(
+            organization=self.organization,
+            skill=AgentSkill.objects.get(organization=self.organization, skill_type="collections"),
+            task_type="rent_overdue",
+            title="Rent overdue: Ada Lane",
+            description="No payment received.",
+            related_lease=self.lease,
+            related_tenant=tenant,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        patcher = mock.patch(
+            "properties.agent_executors.get_ai_json",
+            return_value={"subject": "Rent reminder", "body": "Please pay."},
+        )
+        self.get_ai_json = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_preview_is_stored_and_reused_by_execute(self):
+        first = self.client.get(f"/api/agent-tasks/{self.task.id}/preview/")
+        second = self.client.get(f"/api/agent-tasks/{self.task.id}/preview/")
+
+        self.assertEqual(first.data["preview"], {"subject": "Rent reminder", "body": "Please pay."})
+        self.assertEqual(second.data["preview"], first.data["preview"])
+        self.assertFalse(second.data["stale"])
+
+        response = self.client.post(f"/api/agent-tasks/{self.task.id}/execute/")
+        self.assertTrue(response.data["success"], response.data)
+        self.assertEqual(self.get_ai_json.call_count, 1)
+        self.assertEqual(Message.objects.get().subject, "Rent reminder")
+
+    def test_task_is_executed_once(self):
+        first = self.client.post(f"/api/agent-tasks/{self.task.id}/execute/")
+        second = self.client.post(f"/api/agent-tasks/{self.task.id}/execute/")
+        third = self.client.post(
+            f"/api/agent-tasks/{self.task.id}/approve/", {"execute": True}, format="json"
+        )
+
+        self.assertTrue(first.data["success"], first.data)
+        self.assertEqual((second.status_code, third.status_code), (409, 409))
+        self.assertEqual(Message.objects.count(), 1)
+
+    def test_lost_transition_skips_executor(self):
+        # Another request changed the task between loading and transitioning it.
+        with mock.patch("properties.agent_views.transition_task", return_value=False), mock.patch(
+            "properties.agent_executors.execute_task"
+        ) as execute_task:
+            response = self.client.post(f"/api/agent-tasks/{self.task.id}/execute/")
+            approve = self.client.post(
+                f"/api/agent-tasks/{self.task.id}/approve/", {"execute": True}, format="json"
+            )
+
+        self.assertEqual((response.status_code, approve.status_code), (409, 409))
+        execute_task.assert_not_called()
+
+    def test_stale_preview_is_served_while_refreshing(self):
+        self.client.get(f"/api/agent-tasks/{self.task.id}/preview/")
+        Payment.objects.create(
+            lease=self.lease,
+            amount=Decimal("1200.00"),
+            payment_date=date.today(),
+            payment_method=Payment.PAYMENT_METHOD_CHECK,
+            status=Payment.STATUS_COMPLETED,
+        )
+
+        with mock.patch("properties.agent_executors.schedule_preview_refresh") as refresh:
+            response = self.client.get(f"/api/agent-tasks/{self.task.id}/preview/")
+
+        self.assertTrue(response.data["stale"])
+        self.assertEqual(response.data["preview"]["subject"], "Rent reminder")
+        refresh.assert_called_once()
+        self.assertEqual(self.get_ai_json.call_count, 1)
+
+        # Executing with changed inputs regenerates rather than sending stale content.
+        self.client.post(f"/api/agent-tasks/{self.task.id}/execute/")
+        self.assertEqual(self.get_ai_json.call_count, 2)
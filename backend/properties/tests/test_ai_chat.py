@@ -0,0 +1,218 @@
+import json
+import os
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from properties.ai_views import (
+    FAKE_STREAM_REPLY,
+    LlmProviderError,
+    build_chat_system_prompt,
+    complete_llm,
+    stream_llm,
+    trim_session_history,
+)
+from properties.models import ChatMessage, ChatSession, Organization, UserProfile
+
+
+def _parse_sse(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+class TestAiChatStreaming(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="landlord", password="SecurePass123!")
+        self.organization = Organization.objects.create(name="Stream Org", owner=self.user)
+        UserProfile.objects.filter(user=self.user).update(organization=self.organization)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        env = mock.patch.dict(os.environ, {"AI_PROVIDER": "fake"})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def test_stream_relays_deltas_as_server_sent_events(self):
+        response = self.client.post("/api/ai/chat/", {"message": "Hi", "stream": True}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        events = _parse_sse(b"".join(response.streaming_content).decode())
+
+        self.assertEqual(events[0][0], "start")
+        self.assertEqual(events[0][1]["context_summary"], "0 properties, 0 units")
+        deltas = [data["text"] for name, data in events if name == "delta"]
+        self.assertGreater(len(deltas), 1)
+        self.assertEqual(events[-1][0], "done")
+        self.assertEqual(events[-1][1]["message"], "".join(deltas))
+        self.assertEqual("".join(deltas), FAKE_STREAM_REPLY)
+
+    def test_non_streaming_request_returns_full_message(self):
+        response = self.client.post("/api/ai/chat/", {"message": "Hi"}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["message"], FAKE_STREAM_REPLY)
+
+    def test_closing_the_response_stops_the_stream(self):
+        response = self.client.post(
+            "/api/ai/chat/", {"message": "Hi"}, format="json", HTTP_ACCEPT="text/event-stream"
+        )
+        iterator = iter(response.streaming_content)
+        next(iterator)
+        next(iterator)
+        response.close()
+
+        self.assertEqual(list(iterator), [])
+
+
+class TestAiChatSessions(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="landlord", password="SecurePass123!")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        env = mock.patch.dict(os.environ, {"AI_PROVIDER": "fake"})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def test_turns_are_stored_server_side(self):
+        first = self.client.post("/api/ai/chat/", {"message": "How many units?"}, format="json")
+        session_id = first.data["session_id"]
+
+        with mock.patch("properties.ai_views.complete_llm", return_value="Two.") as complete:
+            second = self.client.post(
+                "/api/ai/chat/", {"message": "And vacant?", "session_id": session_id}, format="json"
+            )
+
+        self.assertEqual(second.data["session_id"], session_id)
+        sent_messages = complete.call_args.args[1]
+        self.assertEqual(
+            sent_messages,
+            [
+                {"role": "user", "content": "How many units?"},
+                {"role": "assistant", "content": FAKE_STREAM_REPLY},
+                {"role": "user", "content": "And vacant?"},
+            ],
+        )
+        self.assertEqual(ChatMessage.objects.filter(session_id=session_id).count(), 4)
+
+        detail = self.client.get(f"/api/ai/chat/sessions/{session_id}/")
+        self.assertEqual([m["content"] for m in detail.data["messages"]][-1], "Two.")
+
+    def test_stream_returns_new_session_id_when_done(self):
+        response = self.client.post("/api/ai/chat/", {"message": "Hi", "stream": True}, format="json")
+        events = _parse_sse(b"".join(response.streaming_content).decode())
+
+        self.assertNotIn("session_id", events[0][1])
+        session = ChatSession.objects.get()
+        self.assertEqual(events[-1][1]["session_id"], session.id)
+        self.assertEqual(session.messages.count(), 2)
+
+    def test_failed_reply_leaves_no_session(self):
+        with mock.patch("properties.ai_views.complete_llm", side_effect=LlmProviderError("down")):
+            response = self.client.post("/api/ai/chat/", {"message": "Hi"}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("session_id", response.data)
+        self.assertFalse(ChatSession.objects.exists())
+
+    def test_invalid_session_id_is_rejected(self):
+        response = self.client.post(
+            "/api/ai/chat/", {"message": "Hi", "session_id": "abc"}, format="json"
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_other_users_sessions_are_not_found(self):
+        other = User.objects.create_user(username="other", password="SecurePass123!")
+        session = ChatSession.objects.create(user=other, title="Private")
+
+        response = self.client.post(
+            "/api/ai/chat/", {"message": "Hi", "session_id": session.id}, format="json"
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_old_turns_are_folded_into_summary(self):
+        session = ChatSession.objects.create(user=self.user)
+        for idx in range(10):
+            ChatMessage.objects.create(session=session, role="user", content=f"question {idx} " + "x" * 400)
+            ChatMessage.objects.create(session=session, role="assistant", content=f"answer {idx} " + "y" * 400)
+
+        live = trim_session_history(session, budget=500)
+
+        self.assertLessEqual(sum(len(m["content"]) // 4 for m in live), 500)
+        self.assertEqual(live[0]["role"], "user")
+        self.assertEqual(live[-1]["content"][:8], "answer 9")
+        session.refresh_from_db()
+        self.assertIn("- User: question", session.summary)
+        self.assertEqual(trim_session_history(session, budget=500), live)
+
+
+class TestStreamLlmParsing(SimpleTestCase):
+    def test_anthropic_text_deltas_are_yielded(self):
+        lines = [
+            "event: message_start",
+            'data: {"type": "message_start"}',
+            "",
+            "event: content_block_delta",
+            'data: {"type": "content_block_delta", "delta": {"type": "text_delta", "text": "Hello"}}',
+            "event: content_block_delta",
+            'data: {"type": "content_block_delta", "delta": {"type": "text_delta", "text": " there"}}',
+            'data: {"type": "message_stop"}',
+        ]
+        upstream = mock.MagicMock(status_code=200)
+        upstream.__enter__.return_value = upstream
+        upstream.iter_lines.return_value = iter(lines)
+
+        with mock.patch.dict(os.environ, {"ANTHROPIC_API_KEY": "test-key"}), mock.patch(
+            "properties.ai_views.requests.post", return_value=upstream
+        ) as post:
+            chunks = list(stream_llm("system", [{"role": "user", "content": "Hi"}], "anthropic"))
+
+        self.assertEqual(chunks, ["Hello", " there"])
+        self.assertTrue(post.call_args.kwargs["stream"])
+        self.assertTrue(post.call_args.kwargs["json"]["stream"])
+
+    def test_stable_prefix_is_marked_for_prompt_caching(self):
+        upstream = mock.MagicMock(status_code=200)
+        upstream.json.return_value = {"content": [{"text": "ok"}]}
+        system_prompt = build_chat_system_prompt("Portfolio: 1 properties", summary="- User: hi")
+
+        with mock.patch.dict(os.environ, {"ANTHROPIC_API_KEY": "test-key"}), mock.patch(
+            "properties.ai_views.requests.Session.post", return_value=upstream
+        ) as post:
+            self.assertEqual(complete_llm(system_prompt, [{"role": "user", "content": "Hi"}]), "ok")
+
+        system = post.call_args.kwargs["json"]["system"]
+        self.assertEqual(system[0]["cache_control"], {"type": "ephemeral"})
+        self.assertIn("Portfolio: 1 properties", system[0]["text"])
+        self.assertNotIn("cache_control", system[1])
+
+
+class TestAiChatStreamingAsgi(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="landlord", password="SecurePass123!")
+        self.token = str(AccessToken.for_user(self.user))
+
+    async def test_stream_runs_under_asgi(self):
+        with mock.patch.dict(os.environ, {"AI_PROVIDER": "fake"}):
+            response = await self.async_client.post(
+                "/api/ai/chat/",
+                {"message": "Hi", "stream": True},
+                content_type="application/json",
+                headers={"Authorization": f"Bearer {self.token}"},
+            )
+            body = b"".join([chunk async for chunk in response.streaming_content]).decode()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(_parse_sse(body)[-1][1]["message"], FAKE_STREAM_REPLY)
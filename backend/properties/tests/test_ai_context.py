@@ -0,0 +1,96 @@
+import warnings
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.cache.backends.base import CacheKeyWarning
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from properties.ai_views import gather_context
+from properties.models import Lease, Organization, Property, Tenant, Unit
+
+
+@override_settings(CACHE_SHARED=True)
+class TestGatherContextCache(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="owner", password="SecurePass123!")
+        self.organization = Organization.objects.create(name="Context Org", owner=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.property = Property.objects.create(
+                organization=self.organization,
+                name="Elm Court",
+                address_line1="1 Elm St",
+                city="Springfield",
+                state="IL",
+                zip_code="62701",
+                property_type=Property.PROPERTY_TYPE_RESIDENTIAL,
+            )
+            self.unit = Unit.objects.create(
+                property=self.property,
+                organization=self.organization,
+                unit_number="1A",
+                bedrooms=2,
+                bathrooms=Decimal("1.0"),
+                square_feet=800,
+                rent_amount=Decimal("1200.00"),
+            )
+            self.tenant = Tenant.objects.create(
+                organization=self.organization,
+                first_name="Ada",
+                last_name="Lane",
+                email="ada@example.test",
+                phone="555-0100",
+            )
+
+    def test_second_call_is_served_from_cache(self):
+        context, summary = gather_context(self.organization)
+        self.assertIn("Property: Elm Court", context)
+        self.assertIn("1 units, 0 occupied", context)
+        self.assertEqual(summary, "1 properties, 1 units")
+
+        with self.assertNumQueries(0):
+            self.assertEqual(gather_context(self.organization), (context, summary))
+
+    def test_cache_keys_are_portable(self):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            gather_context(self.organization)
+
+        self.assertFalse([w for w in caught if issubclass(w.category, CacheKeyWarning)])
+
+    @override_settings(CACHE_SHARED=False)
+    def test_not_cached_with_process_local_cache(self):
+        gather_context(self.organization)
+
+        with CaptureQueriesContext(connection) as queries:
+            gather_context(self.organization)
+
+        self.assertGreater(len(queries), 0)
+
+    def test_write_refreshes_only_affected_sections(self):
+        gather_context(self.organization)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Lease.objects.create(
+                unit=self.unit,
+                tenant=self.tenant,
+                organization=self.organization,
+                start_date=date.today() - timedelta(days=300),
+                end_date=date.today() + timedelta(days=30),
+                monthly_rent=Decimal("1200.00"),
+                security_deposit=Decimal("1200.00"),
+            )
+
+        context, _summary = gather_context(self.organization)
+        self.assertIn("1 active leases", context)
+        self.assertIn("1 units, 1 occupied", context)
+        self.assertIn("Leases expiring in next 60 days: 1", context)
+        self.assertNotIn("Vacant units", context)
+
+        # Payments, maintenance and accounting sections were still fresh.
+        with self.assertNumQueries(0):
+            gather_context(self.organization)
@@ -0,0 +1,87 @@
+import threading
+
+from django.test import SimpleTestCase
+
+from properties.ai_service import LatencyHistogram, ProviderCall, get_provider_histogram, hedged_call
+
+
+class TestHedgedCall(SimpleTestCase):
+    def setUp(self):
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+
+    def test_fast_primary_never_fires_secondary(self):
+        fired = []
+
+        def secondary():
+            fired.append(True)
+            return "secondary"
+
+        provider, result = hedged_call(
+            [ProviderCall("primary", lambda: "primary"), ProviderCall("secondary", secondary)],
+            delay=1.0,
+        )
+        self.assertEqual((provider, result), ("primary", "primary"))
+        self.assertEqual(fired, [])
+
+    def test_slow_primary_is_hedged_and_cancelled(self):
+        cancelled = []
+        threads = []
+
+        def slow_primary():
+            threads.append(threading.current_thread())
+            self.release.wait(5)
+            raise ConnectionError("closed")
+
+        def cancel():
+            # Closing the client makes the blocked request raise.
+            cancelled.append(True)
+            self.release.set()
+
+        primary = ProviderCall("slow-primary", slow_primary, cancel=cancel)
+        samples = get_provider_histogram("slow-primary").count
+
+        provider, result = hedged_call(
+            [primary, ProviderCall("secondary", lambda: "secondary")],
+            delay=0.01,
+        )
+        self.assertEqual((provider, result), ("secondary", "secondary"))
+        self.assertTrue(primary.cancelled)
+        self.assertEqual(cancelled, [True])
+        # The primary runs on the caller's thread, not in the hedge pool.
+        self.assertEqual(threads, [threading.current_thread()])
+        # Its elapsed time still counts as a (lower bound) latency sample.
+        self.assertEqual(get_provider_histogram("slow-primary").count, samples + 1)
+
+    def test_failed_primary_falls_over_immediately(self):
+        def failing():
+            raise RuntimeError("boom")
+
+        provider, result = hedged_call(
+            [ProviderCall("primary", failing), ProviderCall("secondary", lambda: "secondary")],
+            delay=30,
+        )
+        self.assertEqual((provider, result), ("secondary", "secondary"))
+
+    def test_all_failures_raise_last_error(self):
+        def failing():
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            hedged_call([ProviderCall("primary", failing), ProviderCall("secondary", failing)], delay=0)
+
+
+class TestLatencyHistogram(SimpleTestCase):
+    def test_quantile_uses_bucket_upper_bound(self):
+        histogram = LatencyHistogram(buckets=(1.0, 2.0, 5.0))
+        for seconds in (0.5, 0.7, 1.5, 4.0):
+            histogram.observe(seconds)
+        histogram.observe(9.0, outcome="error")
+        histogram.observe(4.5, outcome="cancelled")
+
+        self.assertEqual(histogram.quantile(0.5), 2.0)
+        self.assertEqual(histogram.quantile(0.9), 5.0)
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot["count"], 5)
+        self.assertEqual((snapshot["errors"], snapshot["cancelled"]), (1, 1))
+        self.assertEqual(snapshot["buckets"], [(1.0, 2), (2.0, 3), (5.0, 5)])
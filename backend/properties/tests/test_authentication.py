@@ -0,0 +1,99 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from properties.models import Organization, UserProfile, Vendor
+
+
+@override_settings(CACHE_SHARED=True, AUTH_TRUST_TOKEN_CLAIMS=True)
+class TestTokenClaims(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="owner", password="SecurePass123!")
+        self.organization = Organization.objects.create(name="Claims Org", owner=self.user)
+        UserProfile.objects.filter(user=self.user).update(
+            role=UserProfile.ROLE_LANDLORD, organization=self.organization, is_org_admin=True
+        )
+        Vendor.objects.create(organization=self.organization, name="Acme Plumbing")
+        self.client = APIClient()
+
+    def _login(self):
+        response = self.client.post(
+            "/api/token/", {"username": "owner", "password": "SecurePass123!"}, format="json"
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.data
+
+    def _get_vendors(self, access):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/vendors/")
+        return response, [query["sql"] for query in queries.captured_queries]
+
+    def test_token_carries_profile_claims(self):
+        token = AccessToken(self._login()["access"])
+
+        self.assertEqual(token["org_id"], self.organization.id)
+        self.assertEqual(token["role"], UserProfile.ROLE_LANDLORD)
+        self.assertIsNone(token["tenant_id"])
+        self.assertTrue(token["is_org_admin"])
+        self.assertIn("pv", token)
+
+    def test_claims_skip_user_and_profile_queries(self):
+        access = self._login()["access"]
+
+        response, queries = self._get_vendors(access)
+        _, plain_queries = self._get_vendors(str(AccessToken.for_user(self.user)))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 1)
+        self.assertFalse([sql for sql in queries if "userprofile" in sql])
+        # Only `is_active` is read from the user row.
+        user_queries = [sql for sql in queries if '"auth_user"' in sql]
+        self.assertEqual(len(user_queries), 1)
+        self.assertTrue(user_queries[0].startswith('SELECT "auth_user"."is_active"'))
+        self.assertLess(len(queries), len(plain_queries))
+
+    def test_bulk_deactivation_is_not_hidden_by_claims(self):
+        access = self._login()["access"]
+
+        User.objects.filter(id=self.user.id).update(is_active=False)
+        response, _ = self._get_vendors(access)
+
+        self.assertEqual(response.status_code, 401)
+
+    @override_settings(CACHE_SHARED=False)
+    def test_claims_ignored_with_process_local_cache(self):
+        access = self._login()["access"]
+
+        response, queries = self._get_vendors(access)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue([sql for sql in queries if "userprofile" in sql])
+
+    def test_role_change_invalidates_claims(self):
+        access = self._login()["access"]
+        profile = UserProfile.objects.get(user=self.user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.role = UserProfile.ROLE_TENANT
+            profile.save(update_fields=["role"])
+        response, _ = self._get_vendors(access)
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_refresh_reads_current_profile(self):
+        tokens = self._login()
+        with self.captureOnCommitCallbacks(execute=True):
+            UserProfile.objects.get(user=self.user).save()
+
+        response = self.client.post(
+            "/api/token/refresh/", {"refresh": tokens["refresh"]}, format="json"
+        )
+
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertNotEqual(AccessToken(response.data["access"])["pv"], AccessToken(tokens["access"])["pv"])
+        _, queries = self._get_vendors(response.data["access"])
+        self.assertFalse([sql for sql in queries if "userprofile" in sql])
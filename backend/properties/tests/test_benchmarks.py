@@ -0,0 +1,81 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from properties.benchmarks import BENCHMARKS, compare_results
+from properties.models import ImportedTransaction, RentLedgerEntry
+
+
+class TestBenchmarks(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command(
+            "generate_load_data",
+            properties=2,
+            units=3,
+            years=1,
+            imports_per_month=5,
+            prefix="bench",
+            stdout=StringIO(),
+        )
+
+    def run_command(self, *args):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "results.json")
+            call_command("run_benchmarks", "--repeat", "1", "--output", output, *args, stdout=StringIO())
+            with open(output, encoding="utf-8") as handle:
+                return json.load(handle)
+
+    def test_runs_every_path_and_leaves_data_unchanged(self):
+        ledger_count = RentLedgerEntry.objects.count()
+        imported_count = ImportedTransaction.objects.count()
+
+        payload = self.run_command()
+
+        self.assertEqual(set(payload["results"]), set(BENCHMARKS))
+        for name, result in payload["results"].items():
+            with self.subTest(path=name):
+                self.assertGreater(result["wall_seconds"], 0)
+                self.assertGreater(result["queries"], 0)
+                self.assertGreater(result["peak_memory_bytes"], 0)
+        self.assertEqual(payload["meta"]["dataset"]["leases"], 12)
+        self.assertEqual(RentLedgerEntry.objects.count(), ledger_count)
+        self.assertEqual(ImportedTransaction.objects.count(), imported_count)
+
+    def test_fails_on_regression_against_baseline(self):
+        payload = self.run_command("--only", "rent-roll")
+        payload["results"]["rent-roll"]["queries"] = 1
+
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as handle:
+            json.dump(payload, handle)
+        self.addCleanup(os.remove, handle.name)
+
+        with self.assertRaisesMessage(CommandError, "regressed"):
+            call_command(
+                "run_benchmarks", "--only", "rent-roll", "--repeat", "1", "--baseline", handle.name,
+                stdout=StringIO(),
+            )
+
+    def test_compare_results_applies_threshold_and_noise_floor(self):
+        baseline = {
+            "pnl": {"wall_seconds": 0.001, "queries": 10, "peak_memory_bytes": 1000},
+            "dashboard": {"wall_seconds": 0.5, "queries": 10, "peak_memory_bytes": 1000},
+        }
+        current = {
+            "pnl": {"wall_seconds": 0.004, "queries": 12, "peak_memory_bytes": 1100},
+            "dashboard": {"wall_seconds": 0.8, "queries": 10, "peak_memory_bytes": 5000},
+            "rent-roll": {"wall_seconds": 9.0, "queries": 900, "peak_memory_bytes": 1},
+        }
+
+        self.assertEqual(
+            compare_results(baseline, current, threshold=0.2),
+            [
+                ("dashboard", "wall_seconds", 0.5, 0.8),
+                ("dashboard", "peak_memory_bytes", 1000, 5000),
+            ],
+        )
@@ -0,0 +1,189 @@
+from datetime import date
+from io import StringIO
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from properties.categorizer import (
+    NaiveBayesCategorizer,
+    categorize_imported_transactions,
+    mark_classifier_stale,
+    tokenize,
+    train_classifier,
+)
+from properties.models import (
+    AccountingCategory,
+    CategoryClassifier,
+    ImportedTransaction,
+    JournalEntry,
+    JournalEntryLine,
+    Organization,
+    TransactionImport,
+)
+from properties.scheduler import JOBS
+from properties.utils import seed_chart_of_accounts
+
+
+class TestNaiveBayesCategorizer(SimpleTestCase):
+    def setUp(self):
+        self.model = NaiveBayesCategorizer()
+        self.model.train(
+            [(tokenize("Home Depot supplies", -40), "supplies")] * 5
+            + [(tokenize("City water utility bill", -90), "utilities")] * 5
+        )
+
+    def test_predicts_most_likely_label(self):
+        label, confidence = self.model.predict(tokenize("HOME DEPOT #123", -12))
+        self.assertEqual(label, "supplies")
+        self.assertGreater(confidence, 0.8)
+
+    def test_allowed_labels_restrict_answer(self):
+        label, _confidence = self.model.predict(
+            tokenize("Home Depot", -12), allowed_labels={"utilities"}
+        )
+        self.assertEqual(label, "utilities")
+
+    def test_round_trips_through_bytes(self):
+        restored = NaiveBayesCategorizer.from_bytes(self.model.to_bytes())
+        self.assertEqual(
+            restored.predict(tokenize("water utility", -50)),
+            self.model.predict(tokenize("water utility", -50)),
+        )
+
+    def test_unknown_tokens_give_no_answer(self):
+        skewed = NaiveBayesCategorizer()
+        skewed.train(
+            [(tokenize("Plumber repair", -80), "repairs")] * 17
+            + [(tokenize("Insurance premium", -120), "insurance")] * 3
+        )
+
+        # The amount sign is known, but the prior alone must not decide.
+        self.assertEqual(skewed.predict(tokenize("netflix subscription", -50)), (None, 0.0))
+        self.assertEqual(skewed.predict(tokenize("plumber", -50))[0], "repairs")
+
+    def test_empty_model_has_no_answer(self):
+        self.assertEqual(NaiveBayesCategorizer().predict({"w:rent"}), (None, 0.0))
+
+
+class TestImportCategorization(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="owner", password="SecurePass123!")
+        self.organization = Organization.objects.create(name="Books Org", owner=self.user)
+        seed_chart_of_accounts(self.organization)
+        self.supplies = AccountingCategory.objects.get(
+            organization=self.organization, account_code="5800"
+        )
+        self.utilities = AccountingCategory.objects.get(
+            organization=self.organization, account_code="5400"
+        )
+        self.transaction_import = TransactionImport.objects.create(
+            organization=self.organization,
+            uploaded_by=self.user,
+            filename="bank.csv",
+        )
+
+    def _row(self, description, amount, **kwargs):
+        return ImportedTransaction.objects.create(
+            transaction_import=self.transaction_import,
+            organization=self.organization,
+            date=date(2026, 1, 5),
+            description=description,
+            amount=Decimal(amount),
+            transaction_hash=f"{description}:{amount}",
+            **kwargs,
+        )
+
+    def _booked(self, description, amount, category):
+        journal_entry = JournalEntry.objects.create(
+            organization=self.organization,
+            entry_date=date(2026, 1, 5),
+            memo="Import",
+            status=JournalEntry.STATUS_POSTED,
+            source_type="import",
+        )
+        return self._row(
+            description,
+            amount,
+            category=category,
+            status=ImportedTransaction.STATUS_BOOKED,
+            journal_entry=journal_entry,
+        )
+
+    def test_training_is_incremental_and_predictions_fill_categories(self):
+        for _ in range(4):
+            self._booked("HOME DEPOT 4411", "-35.20", self.supplies)
+            self._booked("CITY OF SPRINGFIELD WATER", "-88.00", self.utilities)
+
+        self.assertEqual(train_classifier(self.organization), 8)
+        self.assertEqual(train_classifier(self.organization), 0)
+        self.assertEqual(CategoryClassifier.objects.get(organization=self.organization).sample_count, 8)
+
+        confident = self._row("HOME DEPOT 9902", "-12.00")
+        unknown = self._row("ACH TRANSFER", "-500.00")
+        categorized = categorize_imported_transactions(
+            self.organization, ImportedTransaction.objects.all()
+        )
+
+        self.assertEqual(categorized, [confident.id])
+        confident.refresh_from_db()
+        unknown.refresh_from_db()
+        self.assertEqual(confident.category, self.supplies)
+        self.assertIsNone(unknown.category)
+
+    def test_full_retrain_rebuilds_from_history(self):
+        self._booked("HOME DEPOT 4411", "-35.20", self.supplies)
+        train_classifier(self.organization)
+
+        self.assertEqual(train_classifier(self.organization, full=True), 1)
+
+    def _expense_line(self, description, status=JournalEntry.STATUS_POSTED):
+        journal_entry = JournalEntry.objects.create(
+            organization=self.organization, entry_date=date(2026, 1, 5), memo=description, status=status
+        )
+        JournalEntryLine.objects.create(
+            journal_entry=journal_entry,
+            organization=self.organization,
+            account=self.utilities,
+            debit_amount=Decimal("88.00"),
+            description=description,
+        )
+        return journal_entry
+
+    def test_nightly_full_retrain_catches_late_posts_and_voids(self):
+        draft = self._expense_line("CITY WATER", status=JournalEntry.STATUS_DRAFT)
+        voided = self._expense_line("GAS COMPANY")
+        train_classifier(self.organization)
+        draft.status = JournalEntry.STATUS_POSTED
+        draft.save()
+        voided.status = JournalEntry.STATUS_VOIDED
+        voided.save()
+
+        # The posted draft's line id is behind the incremental cursor.
+        self.assertEqual(train_classifier(self.organization), 0)
+
+        call_command("train_categorizers", "--full", stdout=StringIO())
+
+        record = CategoryClassifier.objects.get(organization=self.organization)
+        self.assertEqual(record.sample_count, 1)
+        model = NaiveBayesCategorizer.from_bytes(record.state)
+        self.assertEqual(model.predict(tokenize("CITY WATER", 1))[0], str(self.utilities.id))
+        self.assertIn(
+            ("train_categorizers", {"full": True}), [(job.command, job.options) for job in JOBS]
+        )
+
+    def test_booking_marks_stale_and_the_scheduler_retrains(self):
+        self._booked("HOME DEPOT 4411", "-35.20", self.supplies)
+        mark_classifier_stale(self.organization)
+        record = CategoryClassifier.objects.get(organization=self.organization)
+        self.assertEqual((record.is_stale, record.sample_count), (True, 0))
+
+        call_command("train_categorizers", "--stale", stdout=StringIO())
+
+        record.refresh_from_db()
+        self.assertEqual((record.is_stale, record.sample_count), (False, 1))
+        out = StringIO()
+        call_command("train_categorizers", "--stale", stdout=out)
+        self.assertNotIn(f"Org {self.organization.id}:", out.getvalue())
+        self.assertIn(("train_categorizers", {"stale": True}), [(job.command, job.options) for job in JOBS])
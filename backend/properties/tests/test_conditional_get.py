@@ -0,0 +1,87 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from properties.models import Notification, Organization, UserProfile, Vendor
+from properties.views import AccountingDashboardView
+
+
+@override_settings(CACHE_SHARED=True)
+class TestConditionalGet(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="owner", password="SecurePass123!")
+        self.organization = Organization.objects.create(name="ETag Org", owner=self.user)
+        UserProfile.objects.filter(user=self.user).update(
+            role=UserProfile.ROLE_LANDLORD, organization=self.organization
+        )
+        self.user.refresh_from_db()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        Vendor.objects.create(organization=self.organization, name="Acme Plumbing")
+
+    @override_settings(CACHE_SHARED=False)
+    def test_no_etags_with_process_local_cache(self):
+        response = self.client.get("/api/vendors/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("ETag"))
+
+    def test_unchanged_list_is_not_modified(self):
+        first = self.client.get("/api/vendors/")
+        etag = first["ETag"]
+
+        second = self.client.get("/api/vendors/", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second["ETag"], etag)
+        self.assertEqual(second.content, b"")
+        self.assertIn("no-cache", first["Cache-Control"])
+
+    def test_write_in_domain_changes_etag(self):
+        etag = self.client.get("/api/vendors/")["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Vendor.objects.create(organization=self.organization, name="Bright Electric")
+        response = self.client.get("/api/vendors/", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(len(response.data), 2)
+
+    def test_query_params_are_part_of_etag(self):
+        etag = self.client.get("/api/accounting/pnl/")["ETag"]
+
+        response = self.client.get(
+            "/api/accounting/pnl/", {"start_date": "2024-01-01"}, HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_not_modified_skips_the_view(self):
+        etag = self.client.get("/api/accounting/dashboard/")["ETag"]
+
+        with mock.patch.object(
+            AccountingDashboardView, "get", side_effect=AssertionError("view ran")
+        ):
+            response = self.client.get("/api/accounting/dashboard/", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_bulk_update_bumps_messaging_domain(self):
+        Notification.objects.create(
+            recipient=self.user,
+            organization=self.organization,
+            title="Rent due",
+            message="",
+            notification_type=Notification.TYPE_GENERAL,
+        )
+        etag = self.client.get("/api/notifications/")["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch("/api/notifications/mark-all-read/")
+        response = self.client.get("/api/notifications/", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data[0]["is_read"])
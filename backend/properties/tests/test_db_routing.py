@@ -0,0 +1,138 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.cache.backends.db import DatabaseCache
+from django.db import OperationalError, connections
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from properties.db_routing import ReplicaRouter, replica_reads, reset_replica_health, write_tracking
+from properties.models import BlogPost, Organization, UserProfile
+from properties.tests.databases import add_sqlite_databases, remove_databases
+
+REPLICA = "test-replica"
+
+
+@override_settings(REPLICA_DATABASE_ALIAS=REPLICA, CACHE_SHARED=True)
+class TestReplicaRouting(TestCase):
+    # Resolved in setUpClass, once the replica below exists.
+    databases = "__all__"
+
+    @classmethod
+    def setUpClass(cls):
+        # A second SQLite file stands in for the replica; rows created only
+        # there (or only on the primary) show which database served a read.
+        add_sqlite_databases(REPLICA)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        remove_databases(REPLICA)
+
+    def setUp(self):
+        cache.clear()
+        reset_replica_health()
+        self.addCleanup(reset_replica_health)
+        self.user = User.objects.create_user(username="owner", password="SecurePass123!")
+        self.organization = Organization.objects.create(name="Routing Org", owner=self.user)
+        UserProfile.objects.filter(user=self.user).update(
+            role=UserProfile.ROLE_LANDLORD, organization=self.organization
+        )
+        self.user.refresh_from_db()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create_post(self, database, slug):
+        return BlogPost.objects.using(database).create(
+            title=slug, slug=slug, content="Body", is_published=True, published_at=timezone.now()
+        )
+
+    def blog_slugs(self):
+        response = self.client.get("/api/blog/")
+        self.assertEqual(response.status_code, 200)
+        return {post["slug"] for post in response.data}
+
+    def test_public_and_report_reads_use_replica(self):
+        self.create_post("default", "primary-only")
+        self.create_post(REPLICA, "replica-only")
+
+        self.assertEqual(self.blog_slugs(), {"replica-only"})
+        with CaptureQueriesContext(connections[REPLICA]) as replica_queries:
+            response = self.client.get("/api/accounting/reports/trial-balance/")
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(len(replica_queries), 0)
+
+    def test_writes_keep_writer_on_primary(self):
+        self.create_post("default", "primary-only")
+
+        response = self.client.post("/api/vendors/", {"name": "Acme Plumbing"}, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.blog_slugs(), {"primary-only"})
+
+        other = User.objects.create_user(username="reader", password="SecurePass123!")
+        self.client.force_authenticate(other)
+        self.assertEqual(self.blog_slugs(), set())
+
+    @override_settings(REPLICA_STICKY_SECONDS=0)
+    def test_stickiness_expires(self):
+        self.create_post(REPLICA, "replica-only")
+
+        self.client.post("/api/vendors/", {"name": "Acme Plumbing"}, format="json")
+
+        self.assertEqual(self.blog_slugs(), {"replica-only"})
+
+    def test_instances_read_from_replica_are_saved_to_primary(self):
+        post = self.create_post("default", "shared")
+        BlogPost.objects.using(REPLICA).create(
+            id=post.id, title="shared", slug="shared", content="Body", is_published=True
+        )
+
+        with replica_reads():
+            replica_post = BlogPost.objects.get(id=post.id)
+            replica_post.title = "Edited"
+            replica_post.save()
+
+        self.assertEqual(replica_post._state.db, "default")
+        self.assertEqual(BlogPost.objects.get(id=post.id).title, "Edited")
+        self.assertEqual(BlogPost.objects.using(REPLICA).get(id=post.id).title, "shared")
+
+    def test_falls_back_to_primary_when_replica_unavailable(self):
+        self.create_post("default", "primary-only")
+        down = mock.patch.object(
+            connections[REPLICA], "ensure_connection", side_effect=OperationalError("replica down")
+        )
+
+        with down as ensure_connection, self.assertLogs("properties.db_routing", "WARNING") as logs:
+            self.assertEqual(self.blog_slugs(), {"primary-only"})
+            self.assertEqual(self.blog_slugs(), {"primary-only"})
+
+        self.assertEqual(ensure_connection.call_count, 1)
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("unavailable", logs.output[0])
+
+    @override_settings(REPLICA_DATABASE_ALIAS="unconfigured")
+    def test_without_replica_reads_use_primary(self):
+        self.create_post("default", "primary-only")
+
+        self.assertEqual(self.blog_slugs(), {"primary-only"})
+
+    @override_settings(CACHE_SHARED=False)
+    def test_replica_needs_shared_cache_for_stickiness(self):
+        self.create_post("default", "primary-only")
+
+        self.assertEqual(self.blog_slugs(), {"primary-only"})
+
+    def test_database_cache_stays_on_primary(self):
+        entry = DatabaseCache("onyx_cache", {}).cache_model_class
+        router = ReplicaRouter()
+
+        with replica_reads(), write_tracking() as writes:
+            self.assertIsNone(router.db_for_read(entry))
+            router.db_for_write(entry)
+            self.assertEqual(router.db_for_read(BlogPost), REPLICA)
+
+        self.assertFalse(writes.wrote)
@@ -0,0 +1,112 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Count, F, Sum
+from django.test import TestCase
+
+from properties.models import (
+    ImportedTransaction,
+    JournalEntry,
+    JournalEntryLine,
+    Lease,
+    Organization,
+    Payment,
+    RentLedgerEntry,
+    Transaction,
+)
+
+SMALL_RUN = {
+    "orgs": 1,
+    "properties": 2,
+    "units": 3,
+    "years": 1,
+    "imports_per_month": 4,
+    "end_date": date(2025, 6, 15),
+    "batch_size": 50,
+}
+
+
+def generate(prefix, **overrides):
+    call_command("generate_load_data", prefix=prefix, stdout=StringIO(), **{**SMALL_RUN, **overrides})
+    return Organization.objects.get(owner__username=f"{prefix}-owner-1")
+
+
+class TestGenerateLoadData(TestCase):
+    def test_journals_balance_and_mirror_payments(self):
+        organization = generate("alpha")
+
+        unbalanced = (
+            JournalEntry.objects.filter(organization=organization)
+            .annotate(debits=Sum("lines__debit_amount"), credits=Sum("lines__credit_amount"))
+            .exclude(debits=F("credits"))
+        )
+        self.assertFalse(unbalanced.exists())
+
+        payments = Payment.objects.filter(organization=organization)
+        self.assertEqual(
+            JournalEntry.objects.filter(organization=organization, source_type="rent_payment").count(),
+            payments.count(),
+        )
+        self.assertEqual(
+            Transaction.objects.filter(organization=organization, payment__isnull=False).count(),
+            payments.count(),
+        )
+        self.assertEqual(
+            ImportedTransaction.objects.filter(
+                organization=organization,
+                status=ImportedTransaction.STATUS_BOOKED,
+                journal_entry__isnull=True,
+            ).count(),
+            0,
+        )
+        self.assertTrue(
+            ImportedTransaction.objects.filter(
+                organization=organization, status=ImportedTransaction.STATUS_PENDING
+            ).exists()
+        )
+        self.assertEqual(
+            JournalEntryLine.objects.filter(organization=organization)
+            .aggregate(total=Sum("debit_amount"))["total"],
+            JournalEntryLine.objects.filter(organization=organization)
+            .aggregate(total=Sum("credit_amount"))["total"],
+        )
+
+    def test_ledger_balances_are_running_totals(self):
+        organization = generate("bravo")
+
+        leases = Lease.objects.filter(organization=organization)
+        self.assertEqual(leases.count(), 2 * 3 * 2)
+        self.assertEqual(leases.filter(is_active=True).count(), 2 * 3)
+        for lease in leases.annotate(entries=Count("ledger_entries")).filter(entries__gt=0):
+            running = Decimal("0.00")
+            for entry in RentLedgerEntry.objects.filter(lease=lease).order_by("date", "created_at", "id"):
+                running += entry.amount
+                self.assertEqual(entry.balance, running)
+
+    def test_output_is_deterministic_by_seed(self):
+        def fingerprint(organization):
+            return list(
+                RentLedgerEntry.objects.filter(organization=organization)
+                .order_by("id")
+                .values_list("entry_type", "amount", "balance", "date")
+            ) + list(
+                ImportedTransaction.objects.filter(organization=organization)
+                .order_by("id")
+                .values_list("date", "amount", "description")
+            )
+
+        first = fingerprint(generate("charlie"))
+        second = fingerprint(generate("delta"))
+        other_seed = fingerprint(generate("echo", seed=7))
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other_seed)
+
+    def test_refuses_to_reuse_prefix(self):
+        generate("foxtrot")
+
+        with self.assertRaises(CommandError):
+            generate("foxtrot")
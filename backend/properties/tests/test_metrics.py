@@ -0,0 +1,67 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from properties.metrics import REQUEST_METRICS, sql_fingerprint
+from properties.models import Organization, UserProfile, Vendor
+
+
+@override_settings(REQUEST_METRICS_ENABLED=True)
+class TestRequestMetrics(TestCase):
+    def setUp(self):
+        REQUEST_METRICS.reset()
+        self.user = User.objects.create_user(username="owner", password="SecurePass123!")
+        self.organization = Organization.objects.create(name="Metrics Org", owner=self.user)
+        UserProfile.objects.filter(user=self.user).update(
+            role=UserProfile.ROLE_LANDLORD, organization=self.organization
+        )
+        self.user.refresh_from_db()
+        Vendor.objects.create(organization=self.organization, name="Acme Plumbing")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_records_per_view_metrics(self):
+        self.client.get("/api/vendors/")
+        self.client.get("/api/vendors/")
+
+        metrics = REQUEST_METRICS.endpoint("vendor-list", "GET")
+        self.assertEqual(metrics.requests["2xx"], 2)
+        self.assertEqual(metrics.queries.count, 2)
+        self.assertGreater(metrics.queries.total, 0)
+        self.assertGreater(metrics.response_bytes.total, 0)
+
+    def test_metrics_endpoint_is_staff_only(self):
+        self.assertEqual(self.client.get("/api/internal/metrics/").status_code, 403)
+
+    def test_metrics_endpoint_renders_prometheus_text(self):
+        self.client.get("/api/vendors/")
+        self.user.is_staff = True
+        self.user.save(update_fields=["is_staff"])
+
+        response = self.client.get("/api/internal/metrics/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        body = response.content.decode()
+        self.assertIn('onyx_http_requests_total{view="vendor-list",method="GET",status="2xx"} 1', body)
+        self.assertIn('onyx_http_request_db_queries_bucket{view="vendor-list",method="GET",le="+Inf"} 1', body)
+
+    @override_settings(SLOW_REQUEST_QUERIES=1)
+    def test_logs_slow_requests_with_repeated_sql(self):
+        with self.assertLogs("properties.metrics", level="WARNING") as logs:
+            self.client.get("/api/vendors/")
+
+        self.assertIn("Slow request GET vendor-list", logs.output[0])
+        self.assertIn("Top SQL:", logs.output[0])
+
+    @override_settings(REQUEST_METRICS_ENABLED=False)
+    def test_disabled_by_default(self):
+        self.client.get("/api/vendors/")
+
+        self.assertEqual(REQUEST_METRICS.items(), [])
+
+    def test_fingerprint_collapses_literals_and_in_lists(self):
+        self.assertEqual(
+            sql_fingerprint("SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = 'x'  LIMIT 21"),
+            "SELECT * FROM t WHERE id IN (...) AND name = %s LIMIT %s",
+        )
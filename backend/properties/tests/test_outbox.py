@@ -0,0 +1,163 @@
+from datetime import timedelta
+from io import StringIO
+from smtplib import SMTPRecipientsRefused, SMTPServerDisconnected
+from unittest import mock
+
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.db import DatabaseError, connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from properties.emails import send_application_received
+from properties.models import OutgoingEmail
+from properties.outbox import queue_email, send_pending_emails
+
+
+class RejectingBackend(EmailBackend):
+    """locmem backend that refuses one recipient and counts connections."""
+
+    opened = 0
+
+    def open(self):
+        RejectingBackend.opened += 1
+
+    def send_messages(self, messages):
+        for message in messages:
+            if "bounce@example.com" in message.to:
+                raise SMTPRecipientsRefused({"bounce@example.com": (550, b"No such user")})
+        return super().send_messages(messages)
+
+
+class TestEmailOutbox(TestCase):
+    def setUp(self):
+        RejectingBackend.opened = 0
+
+    def test_emails_are_queued_with_the_transaction(self):
+        with transaction.atomic():
+            self.assertTrue(send_application_received("pat@example.com", "Pat", "Elm Court", "1A"))
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            send_application_received("sam@example.com", "Sam", "Elm Court", "2B")
+            raise RuntimeError("request failed")
+
+        self.assertEqual(len(mail.outbox), 0)
+        email = OutgoingEmail.objects.get()
+        self.assertEqual(email.recipient, "pat@example.com")
+        self.assertEqual(email.status, OutgoingEmail.STATUS_PENDING)
+        self.assertIn("<html", email.html.lower())
+
+    def test_worker_sends_html_and_text(self):
+        send_application_received("pat@example.com", "Pat", "Elm Court", "1A")
+
+        call_command("send_outbox", stdout=StringIO())
+
+        self.assertEqual(len(mail.outbox), 1)
+        message = mail.outbox[0]
+        self.assertEqual(message.to, ["pat@example.com"])
+        self.assertIn("Hi Pat,", message.body)
+        self.assertEqual(message.alternatives[0][1], "text/html")
+        email = OutgoingEmail.objects.get()
+        self.assertEqual(email.status, OutgoingEmail.STATUS_SENT)
+        self.assertIsNotNone(email.sent_at)
+
+        self.assertEqual(send_pending_emails(), (0, 0))
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_emails_with_the_same_dedupe_key_are_dropped(self):
+        self.assertIsNotNone(queue_email("pat@example.com", "Paid", "Body", dedupe_key="payment:1"))
+        self.assertIsNone(queue_email("PAT@example.com", "Paid", "Body", dedupe_key="payment:1"))
+        self.assertIsNotNone(queue_email("pat@example.com", "Paid", "Body", dedupe_key="payment:2"))
+        self.assertIsNotNone(queue_email("sam@example.com", "Paid", "Body", dedupe_key="payment:1"))
+
+        self.assertEqual(OutgoingEmail.objects.count(), 3)
+
+    def test_identical_emails_without_a_key_are_all_queued(self):
+        # Two equal payments from one tenant produce identical landlord emails.
+        self.assertIsNotNone(queue_email("pat@example.com", "Payment Received", "Body"))
+        self.assertIsNotNone(queue_email("pat@example.com", "Payment Received", "Body"))
+
+        self.assertEqual(OutgoingEmail.objects.count(), 2)
+
+    @override_settings(EMAIL_BACKEND="properties.tests.test_outbox.RejectingBackend")
+    def test_batch_shares_one_connection_and_failures_stay_isolated(self):
+        for recipient in ("a@example.com", "bounce@example.com", "b@example.com"):
+            queue_email(recipient, "Hello", "Body")
+
+        self.assertEqual(send_pending_emails(), (2, 1))
+
+        self.assertEqual(RejectingBackend.opened, 1)
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), ["a@example.com", "b@example.com"])
+        bounced = OutgoingEmail.objects.get(recipient="bounce@example.com")
+        self.assertEqual(bounced.status, OutgoingEmail.STATUS_PENDING)
+        self.assertEqual(bounced.attempts, 1)
+        self.assertIn("No such user", bounced.last_error)
+
+        # Not due again until its backoff passes; the others are never resent.
+        self.assertEqual(send_pending_emails(), (0, 0))
+        self.assertEqual(len(mail.outbox), 2)
+
+    @override_settings(
+        EMAIL_BACKEND="properties.tests.test_outbox.RejectingBackend",
+        EMAIL_OUTBOX_RETRY_SECONDS=60,
+        EMAIL_OUTBOX_MAX_ATTEMPTS=3,
+    )
+    def test_rejected_email_backs_off_then_gives_up(self):
+        email = queue_email("bounce@example.com", "Hello", "Body")
+
+        delays = []
+        with self.assertLogs("properties.outbox", "ERROR") as logs:
+            for _ in range(3):
+                started = timezone.now()
+                self.assertEqual(send_pending_emails(), (0, 1))
+                email.refresh_from_db()
+                delays.append(email.next_attempt_at - started)
+                OutgoingEmail.objects.filter(id=email.id).update(next_attempt_at=timezone.now())
+
+        self.assertIn("Giving up", logs.output[-1])
+        self.assertAlmostEqual(delays[0].total_seconds(), 60, delta=5)
+        self.assertAlmostEqual(delays[1].total_seconds(), 120, delta=5)
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutgoingEmail.STATUS_FAILED)
+        self.assertEqual(email.attempts, 3)
+        self.assertEqual(send_pending_emails(), (0, 0))
+        self.assertEqual(len(mail.outbox), 0)
+
+    @override_settings(EMAIL_OUTBOX_RETRY_SECONDS=60, EMAIL_OUTBOX_MAX_ATTEMPTS=3)
+    def test_unreachable_server_does_not_use_up_attempts(self):
+        email = queue_email("pat@example.com", "Hello", "Body")
+        down = mock.patch.object(EmailBackend, "open", side_effect=SMTPServerDisconnected("down"))
+
+        with down, self.assertLogs("properties.outbox", "WARNING"):
+            for _ in range(5):
+                started = timezone.now()
+                self.assertEqual(send_pending_emails(), (0, 1))
+                email.refresh_from_db()
+                self.assertAlmostEqual((email.next_attempt_at - started).total_seconds(), 60, delta=5)
+                OutgoingEmail.objects.filter(id=email.id).update(next_attempt_at=timezone.now())
+
+        self.assertEqual((email.status, email.attempts), (OutgoingEmail.STATUS_PENDING, 0))
+        self.assertIn("down", email.last_error)
+        self.assertEqual(send_pending_emails(), (1, 0))
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_failed_insert_leaves_the_callers_transaction_usable(self):
+        failing = mock.patch.object(OutgoingEmail.objects, "create", side_effect=DatabaseError("outbox down"))
+
+        with transaction.atomic(), CaptureQueriesContext(connection) as queries:
+            with failing, self.assertLogs("properties.emails", "ERROR"):
+                self.assertFalse(send_application_received("pat@example.com", "Pat", "Elm Court", "1A"))
+            queue_email("sam@example.com", "Hello", "Body")
+
+        self.assertTrue(any(query["sql"].startswith("SAVEPOINT") for query in queries.captured_queries))
+        self.assertEqual(list(OutgoingEmail.objects.values_list("recipient", flat=True)), ["sam@example.com"])
+
+    def test_stale_claims_are_retried(self):
+        email = queue_email("pat@example.com", "Hello", "Body")
+        OutgoingEmail.objects.filter(id=email.id).update(
+            status=OutgoingEmail.STATUS_SENDING, next_attempt_at=timezone.now() - timedelta(hours=1)
+        )
+
+        self.assertEqual(send_pending_emails(), (1, 0))
+        self.assertEqual(len(mail.outbox), 1)
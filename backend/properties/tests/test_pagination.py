@@ -0,0 +1,59 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from properties.models import Notification, Organization, UserProfile, Vendor
+from properties.pagination import StandardPagination
+
+
+class TestPaginationPolicy(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="owner", password="SecurePass123!")
+        self.organization = Organization.objects.create(name="Paging Org", owner=self.user)
+        UserProfile.objects.filter(user=self.user).update(
+            role=UserProfile.ROLE_LANDLORD, organization=self.organization
+        )
+        self.user.refresh_from_db()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        for index in range(5):
+            Notification.objects.create(
+                recipient=self.user,
+                organization=self.organization,
+                title=f"Notice {index}",
+                message="",
+                notification_type=Notification.TYPE_GENERAL,
+            )
+            Vendor.objects.create(organization=self.organization, name=f"Vendor {index}")
+
+    def test_compatibility_mode_returns_bare_lists(self):
+        response = self.client.get("/api/notifications/")
+
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 5)
+
+    def test_cursor_pages_on_request(self):
+        first = self.client.get("/api/notifications/", {"page_size": 2})
+        self.assertEqual([row["title"] for row in first.data["results"]], ["Notice 4", "Notice 3"])
+        self.assertNotIn("count", first.data)
+
+        second = self.client.get(first.data["next"])
+        self.assertEqual([row["title"] for row in second.data["results"]], ["Notice 2", "Notice 1"])
+
+    @override_settings(API_PAGINATE_BY_DEFAULT=True)
+    def test_enforced_mode_pages_every_list(self):
+        response = self.client.get("/api/vendors/")
+
+        self.assertEqual(response.data["count"], 5)
+        self.assertIn("results", response.data)
+
+    def test_page_size_is_capped(self):
+        with mock.patch.object(StandardPagination, "max_page_size", 3):
+            response = self.client.get("/api/vendors/", {"page_size": 1000})
+
+        self.assertEqual(len(response.data["results"]), 3)
+        self.assertIsNotNone(response.data["next"])
+
@@ -0,0 +1,102 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from properties.models import Organization, RequestProfile, UserProfile, Vendor
+from properties.profiling import prune_reports
+
+
+class TestRequestProfiling(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="owner", password="SecurePass123!", is_staff=True
+        )
+        self.organization = Organization.objects.create(name="Profile Org", owner=self.user)
+        UserProfile.objects.filter(user=self.user).update(
+            role=UserProfile.ROLE_LANDLORD, organization=self.organization
+        )
+        for number in range(3):
+            Vendor.objects.create(organization=self.organization, name=f"Vendor {number}")
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.user).access_token}"
+        )
+
+    def test_stores_report_for_staff_token(self):
+        response = self.client.get("/api/vendors/?__profile=1")
+
+        self.assertEqual(response.status_code, 200)
+        profile = RequestProfile.objects.get(id=response["X-Profile-Id"])
+        self.assertEqual(profile.user, self.user)
+        self.assertEqual(profile.path, "/api/vendors/?__profile=1")
+        self.assertEqual(profile.status_code, 200)
+        self.assertGreater(profile.query_count, 0)
+        self.assertEqual(profile.size_bytes, len(profile.report.encode()))
+        for section in (
+            "Top functions by cumulative time",
+            "Duplicated queries",
+            "Repeated query shapes",
+            "Slowest queries",
+            "Allocations by line",
+        ):
+            self.assertIn(section, profile.report)
+        self.assertIn("properties/", profile.report)
+
+    def test_inline_returns_report_without_storing(self):
+        response = self.client.get("/api/vendors/?__profile=inline")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        self.assertIn(b"Request profile: GET /api/vendors/", response.content)
+        self.assertFalse(RequestProfile.objects.exists())
+
+    def test_ignored_for_non_staff_and_anonymous_users(self):
+        self.user.is_staff = False
+        self.user.save(update_fields=["is_staff"])
+
+        response = self.client.get("/api/vendors/?__profile=1")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("X-Profile-Id", response)
+
+        self.client.credentials()
+        response = self.client.get("/api/vendors/?__profile=inline")
+        self.assertEqual(response.status_code, 401)
+        self.assertFalse(RequestProfile.objects.exists())
+
+    @override_settings(PROFILE_REPORT_MAX_BYTES=600)
+    def test_truncates_reports_to_size_cap(self):
+        response = self.client.get("/api/vendors/?__profile=1")
+
+        profile = RequestProfile.objects.get(id=response["X-Profile-Id"])
+        self.assertLessEqual(profile.size_bytes, 600)
+        self.assertTrue(profile.report.endswith("[report truncated at 600 bytes]\n"))
+
+    @override_settings(PROFILE_REPORTS_MAX_TOTAL_BYTES=250)
+    def test_prunes_oldest_reports_over_total_cap(self):
+        profiles = [
+            RequestProfile.objects.create(
+                method="GET", path=f"/{number}", status_code=200, duration_ms=1,
+                report="x" * 100, size_bytes=100,
+            )
+            for number in range(4)
+        ]
+
+        self.assertEqual(prune_reports(), 2)
+        self.assertEqual(
+            set(RequestProfile.objects.values_list("id", flat=True)),
+            {profiles[2].id, profiles[3].id},
+        )
+
+    def test_admin_downloads_report(self):
+        self.user.is_superuser = True
+        self.user.save(update_fields=["is_superuser"])
+        profile_id = self.client.get("/api/vendors/?__profile=1")["X-Profile-Id"]
+        admin_client = APIClient()
+        admin_client.force_login(self.user)
+
+        response = admin_client.get(f"/admin/properties/requestprofile/{profile_id}/download/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(f'filename="profile-{profile_id}.txt"', response["Content-Disposition"])
+        self.assertIn(b"Top functions by cumulative time", response.content)
@@ -0,0 +1,306 @@
+from collections import Counter
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from properties.metrics import sql_fingerprint
+from properties.models import (
+    AccountingCategory,
+    AgentSkill,
+    AgentTask,
+    BankReconciliation,
+    JournalEntry,
+    JournalEntryLine,
+    Lead,
+    Lease,
+    MaintenanceRequest,
+    Organization,
+    Payment,
+    Property,
+    ReconciliationMatch,
+    RentLedgerEntry,
+    Tenant,
+    Transaction,
+    Unit,
+    UserProfile,
+    Vendor,
+)
+from properties.report_cache import report_cache
+from properties.serializers import AccountingCategorySerializer, BankReconciliationSerializer
+from properties.utils import seed_chart_of_accounts
+from properties.views import _resolve_reporting_category
+
+# Upper bound on queries per endpoint for the seeded portfolio below. The
+# bounds do not depend on the number of rows: a budget that has to grow
+# with the data is an N+1.
+QUERY_BUDGETS = [
+    ("rent roll", "/api/accounting/rent-roll/", 7),
+    ("accounting dashboard", "/api/accounting/dashboard/", 15),
+    ("trial balance", "/api/accounting/reports/trial-balance/", 3),
+    ("profit and loss", "/api/accounting/pnl/", 6),
+    ("vendors", "/api/vendors/", 3),
+    ("chart of accounts", "/api/accounting/categories/", 5),
+    ("journal entries", "/api/accounting/journal-entries/", 4),
+    ("agent tasks", "/api/agent-tasks/", 3),
+    ("leads pipeline", "/api/leads/pipeline/", 11),
+    ("leads", "/api/leads/", 4),
+    ("reconciliations", "/api/accounting/reconciliations/", 3),
+    ("leases", "/api/leases/", 3),
+    ("tenants", "/api/tenants/", 3),
+    ("units", "/api/units/", 3),
+    ("properties", "/api/properties/", 3),
+    ("rent ledger", "/api/rent-ledger/", 3),
+    ("payments", "/api/payments/", 3),
+    ("maintenance requests", "/api/maintenance-requests/", 3),
+]
+
+PROPERTIES = 4
+UNITS_PER_PROPERTY = 60
+LEDGER_MONTHS = 6
+JOURNAL_ENTRIES = 600
+
+
+def seed_portfolio(organization, user):
+    """A mid-size portfolio: hundreds of leases and thousands of ledger rows."""
+    seed_chart_of_accounts(organization)
+    accounts = {
+        account.account_code: account
+        for account in AccountingCategory.objects.filter(organization=organization)
+    }
+    properties = Property.objects.bulk_create(
+        Property(
+            organization=organization,
+            name=f"Building {index}",
+            address_line1=f"{index} Main St",
+            city="Springfield",
+            state="IL",
+            zip_code="62701",
+            property_type="apartment",
+        )
+        for index in range(PROPERTIES)
+    )
+    units = Unit.objects.bulk_create(
+        Unit(
+            organization=organization,
+            property=property_obj,
+            unit_number=f"{property_obj.id}-{index}",
+            bedrooms=2,
+            bathrooms=Decimal("1.0"),
+            square_feet=850,
+            rent_amount=Decimal("1200.00"),
+        )
+        for property_obj in properties
+        for index in range(UNITS_PER_PROPERTY)
+    )
+    tenants = Tenant.objects.bulk_create(
+        Tenant(
+            organization=organization,
+            first_name="Tenant",
+            last_name=str(index),
+            email=f"tenant{index}@example.com",
+            phone="555-0100",
+        )
+        for index in range(len(units))
+    )
+    today = date.today()
+    start = today.replace(day=1) - timedelta(days=30 * LEDGER_MONTHS)
+    leases = Lease.objects.bulk_create(
+        Lease(
+            organization=organization,
+            unit=unit,
+            tenant=tenant,
+            start_date=start,
+            end_date=start + timedelta(days=365),
+            monthly_rent=unit.rent_amount,
+            security_deposit=unit.rent_amount,
+            is_active=True,
+        )
+        for unit, tenant in zip(units, tenants)
+    )
+    RentLedgerEntry.objects.bulk_create(
+        RentLedgerEntry(
+            organization=organization,
+            lease=lease,
+            entry_type=RentLedgerEntry.TYPE_CHARGE,
+            description="Rent",
+            amount=lease.monthly_rent,
+            balance=lease.monthly_rent * (month + 1),
+            date=start + timedelta(days=30 * month),
+        )
+        for lease in leases
+        for month in range(LEDGER_MONTHS)
+    )
+    Payment.objects.bulk_create(
+        Payment(
+            organization=organization,
+            lease=lease,
+            amount=lease.monthly_rent,
+            payment_date=start + timedelta(days=2),
+            payment_method=Payment.PAYMENT_METHOD_CHECK,
+            status=Payment.STATUS_COMPLETED,
+        )
+        for lease in leases
+    )
+    MaintenanceRequest.objects.bulk_create(
+        MaintenanceRequest(
+            organization=organization,
+            unit=lease.unit,
+            tenant=lease.tenant,
+            title="Leaking faucet",
+            description="Kitchen sink",
+            priority=MaintenanceRequest.PRIORITY_LOW,
+            status=MaintenanceRequest.STATUS_SUBMITTED,
+        )
+        for lease in leases[:60]
+    )
+    rent_income = _resolve_reporting_category(
+        organization, "Rent Income", AccountingCategory.TYPE_INCOME
+    )
+    Transaction.objects.bulk_create(
+        Transaction(
+            organization=organization,
+            transaction_type=Transaction.TYPE_INCOME,
+            category=rent_income,
+            amount=lease.monthly_rent,
+            date=start + timedelta(days=30 * month + 2),
+            description="Rent payment",
+            property=lease.unit.property,
+            unit=lease.unit,
+            lease=lease,
+        )
+        for lease in leases
+        for month in range(LEDGER_MONTHS)
+    )
+    entries = JournalEntry.objects.bulk_create(
+        JournalEntry(
+            organization=organization,
+            entry_date=start + timedelta(days=index % 180),
+            memo=f"Rent receipt {index}",
+            status=JournalEntry.STATUS_POSTED,
+            source_type="rent_payment",
+            created_by=user,
+        )
+        for index in range(JOURNAL_ENTRIES)
+    )
+    JournalEntryLine.objects.bulk_create(
+        JournalEntryLine(
+            organization=organization,
+            journal_entry=entry,
+            account=accounts[code],
+            debit_amount=Decimal("1200.00") if code == "1020" else Decimal("0.00"),
+            credit_amount=Decimal("0.00") if code == "1020" else Decimal("1200.00"),
+            property=properties[index % PROPERTIES],
+        )
+        for index, entry in enumerate(entries)
+        for code in ("1020", "4100")
+    )
+    Vendor.objects.bulk_create(
+        Vendor(organization=organization, name=f"Vendor {index}") for index in range(40)
+    )
+    Lead.objects.bulk_create(
+        Lead(
+            organization=organization,
+            first_name="Lead",
+            last_name=str(index),
+            property=properties[index % PROPERTIES],
+            stage=[Lead.STAGE_NEW, Lead.STAGE_CONTACTED, Lead.STAGE_APPLIED][index % 3],
+        )
+        for index in range(90)
+    )
+    skill = AgentSkill.objects.create(organization=organization, skill_type="collections")
+    AgentTask.objects.bulk_create(
+        AgentTask(
+            organization=organization,
+            skill=skill,
+            task_type="rent_overdue",
+            title=f"Rent overdue {lease.id}",
+            description="",
+            related_lease=lease,
+            related_tenant=lease.tenant,
+            related_property=lease.unit.property,
+        )
+        for lease in leases[:100]
+    )
+    reconciliations = BankReconciliation.objects.bulk_create(
+        BankReconciliation(
+            organization=organization,
+            account=accounts["1020"],
+            start_date=start + timedelta(days=30 * month),
+            end_date=start + timedelta(days=30 * month + 29),
+            statement_ending_balance=Decimal("10000.00"),
+            created_by=user,
+        )
+        for month in range(LEDGER_MONTHS)
+    )
+    cash_lines = JournalEntryLine.objects.filter(
+        organization=organization, account=accounts["1020"]
+    ).order_by("journal_entry__entry_date")
+    ReconciliationMatch.objects.bulk_create(
+        ReconciliationMatch(reconciliation=reconciliation, journal_entry_line=line)
+        for reconciliation in reconciliations
+        for line in cash_lines.filter(
+            journal_entry__entry_date__gte=reconciliation.start_date,
+            journal_entry__entry_date__lte=reconciliation.end_date,
+        )[:20]
+    )
+
+
+def repeated_queries(queries):
+    fingerprints = Counter(sql_fingerprint(query["sql"]) for query in queries.captured_queries)
+    return "; ".join(
+        f"{count}x {fingerprint[:300]}" for fingerprint, count in fingerprints.most_common(3)
+    )
+
+
+class TestQueryBudgets(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="owner", password="SecurePass123!")
+        cls.organization = Organization.objects.create(name="Budget Org", owner=cls.user)
+        UserProfile.objects.filter(user=cls.user).update(
+            role=UserProfile.ROLE_LANDLORD, organization=cls.organization, is_org_admin=True
+        )
+        seed_portfolio(cls.organization, cls.user)
+
+    def setUp(self):
+        self.user.refresh_from_db()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        report_cache().clear()
+
+    def test_endpoints_stay_within_query_budget(self):
+        for name, url, budget in QUERY_BUDGETS:
+            with self.subTest(endpoint=name):
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200, f"{url}: {response.content[:200]}")
+                self.assertLessEqual(
+                    len(queries),
+                    budget,
+                    f"{name} ({url}) ran {len(queries)} queries, budget {budget}. "
+                    f"Most repeated: {repeated_queries(queries)}",
+                )
+
+    def test_annotated_list_totals_match_per_object_queries(self):
+        cases = [
+            (
+                "/api/accounting/categories/",
+                AccountingCategory.objects.filter(organization=self.organization),
+                AccountingCategorySerializer,
+            ),
+            (
+                "/api/accounting/reconciliations/",
+                BankReconciliation.objects.filter(organization=self.organization),
+                BankReconciliationSerializer,
+            ),
+        ]
+        for url, queryset, serializer_class in cases:
+            with self.subTest(url=url):
+                listed = {row["id"]: row for row in self.client.get(url).json()}
+                for instance in queryset:
+                    self.assertEqual(listed[instance.id], serializer_class(instance).data)
@@ -0,0 +1,120 @@
+import unittest
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import Sum
+from django.test import TestCase
+
+from properties.models import (
+    AgentTask,
+    Bill,
+    JournalEntry,
+    Notification,
+    Organization,
+    Payment,
+    RentLedgerEntry,
+    Transaction,
+)
+from properties.views import _posted_line_queryset
+
+
+@unittest.skipUnless(connection.vendor == "sqlite", "query plans are asserted on SQLite")
+class TestHotQueryPlans(TestCase):
+    """The report and list queries that run on every page load use the composite indexes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="owner", password="SecurePass123!")
+        cls.organization = Organization.objects.create(name="Plan Org", owner=cls.user)
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, plan)
+
+    def test_profit_and_loss_range(self):
+        self.assertUsesIndex(
+            Transaction.objects.filter(
+                organization=self.organization,
+                date__gte=date(2024, 1, 1),
+                date__lte=date(2024, 12, 31),
+                transaction_type=Transaction.TYPE_INCOME,
+            )
+            .values("category__name")
+            .annotate(total=Sum("amount")),
+            "txn_org_date_type_idx",
+        )
+
+    def test_trial_balance_posted_lines(self):
+        self.assertUsesIndex(
+            _posted_line_queryset(self.organization, date_to=date(2024, 12, 31))
+            .values("account_id")
+            .annotate(debit_total=Sum("debit_amount")),
+            "je_org_status_date_idx",
+        )
+
+    def test_general_ledger_account_lines(self):
+        self.assertUsesIndex(
+            _posted_line_queryset(self.organization, account_id=1).order_by(
+                "journal_entry__entry_date"
+            ),
+            "jeline_account_entry_idx",
+        )
+
+    def test_lease_ledger_in_order(self):
+        self.assertUsesIndex(
+            RentLedgerEntry.objects.filter(lease_id=1).order_by("date", "created_at", "id"),
+            "ledger_lease_order_idx",
+        )
+
+    def test_lease_payments_in_month(self):
+        self.assertUsesIndex(
+            Payment.objects.filter(
+                lease_id=1,
+                status=Payment.STATUS_COMPLETED,
+                payment_date__gte=date(2024, 1, 1),
+                payment_date__lte=date(2024, 1, 31),
+            ),
+            "payment_lease_status_date_idx",
+        )
+
+    def test_pending_agent_tasks_by_type(self):
+        self.assertUsesIndex(
+            AgentTask.objects.filter(
+                organization=self.organization,
+                task_type="rent_overdue",
+                status=AgentTask.STATUS_PENDING,
+            ),
+            "agenttask_org_type_status_idx",
+        )
+
+    def test_notification_feed(self):
+        self.assertUsesIndex(
+            Notification.objects.filter(recipient=self.user).order_by("-created_at"),
+            "notif_recipient_created_idx",
+        )
+
+    def test_unread_notification_count(self):
+        # count() drops the default ordering, as does order_by() here.
+        self.assertUsesIndex(
+            Notification.objects.filter(recipient=self.user, is_read=False).order_by().values("id"),
+            "notif_unread_idx",
+        )
+
+    def test_open_bills_by_due_date(self):
+        self.assertUsesIndex(
+            Bill.objects.filter(
+                organization=self.organization,
+                status=Bill.STATUS_OVERDUE,
+                due_date__lt=date(2024, 1, 1),
+            ),
+            "bill_org_status_due_idx",
+        )
+
+    def test_journal_entries_by_status(self):
+        self.assertUsesIndex(
+            JournalEntry.objects.filter(
+                organization=self.organization, status=JournalEntry.STATUS_POSTED
+            ).order_by("entry_date"),
+            "je_org_status_date_idx",
+        )
@@ -0,0 +1,83 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from properties.models import Organization, Transaction, UserProfile
+from properties.report_cache import REPORT_CACHE_STATS, report_cache, report_cache_stats
+
+
+@override_settings(CACHE_SHARED=True)
+class TestReportCache(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="owner", password="SecurePass123!")
+        self.organization = Organization.objects.create(name="Report Org", owner=self.user)
+        UserProfile.objects.filter(user=self.user).update(
+            role=UserProfile.ROLE_LANDLORD, organization=self.organization
+        )
+        self.user.refresh_from_db()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        report_cache().clear()
+        REPORT_CACHE_STATS.reset()
+
+    def _add_income(self, amount):
+        with self.captureOnCommitCallbacks(execute=True):
+            Transaction.objects.create(
+                organization=self.organization,
+                transaction_type=Transaction.TYPE_INCOME,
+                amount=Decimal(amount),
+                date=timezone.now().date(),
+                description="Rent",
+            )
+
+    def test_repeat_request_is_served_from_cache(self):
+        self._add_income("100.00")
+        first = self.client.get("/api/accounting/pnl/")
+
+        with self.assertNumQueries(0):
+            second = self.client.get("/api/accounting/pnl/")
+
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(report_cache_stats()["pnl"], {"hits": 1, "misses": 1, "hit_rate": 0.5})
+
+    def test_version_bump_invalidates(self):
+        self._add_income("100.00")
+        self.assertEqual(self.client.get("/api/accounting/pnl/").data["net_income"], 100.0)
+
+        self._add_income("50.00")
+
+        self.assertEqual(self.client.get("/api/accounting/pnl/").data["net_income"], 150.0)
+        self.assertEqual(report_cache_stats()["pnl"]["hits"], 0)
+
+    def test_params_are_normalized(self):
+        self.client.get("/api/accounting/pnl/", {"date_from": "2024-01-01", "property_id": ""})
+        self.client.get("/api/accounting/pnl/", {"date_from": " 2024-01-01", "format": "json"})
+
+        self.assertEqual(report_cache_stats()["pnl"]["hits"], 1)
+
+    def test_bill_aging_is_cached(self):
+        self.client.get("/api/bills/aging/")
+        self.client.get("/api/bills/aging/")
+
+        self.assertEqual(report_cache_stats()["bill-aging"]["hits"], 1)
+
+    @override_settings(REPORT_CACHE_ENABLED=False)
+    def test_cache_can_be_disabled(self):
+        self.client.get("/api/accounting/pnl/")
+        self.client.get("/api/accounting/pnl/")
+
+        self.assertNotIn("pnl", report_cache_stats())
+
+    @override_settings(CACHE_SHARED=False)
+    def test_process_local_cache_disables_caching(self):
+        # Writes from other processes (e.g. the scheduler) would never
+        # advance this process's versions, so nothing may be cached.
+        self._add_income("100.00")
+        self.client.get("/api/accounting/pnl/")
+        self._add_income("50.00")
+
+        self.assertEqual(self.client.get("/api/accounting/pnl/").data["net_income"], 150.0)
+        self.assertNotIn("pnl", report_cache_stats())
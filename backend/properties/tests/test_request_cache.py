@@ -0,0 +1,55 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from properties.management.commands.run_agents import agent_skill, ensure_agent_skills
+from properties.models import Organization
+from properties.request_cache import clear_request_cache, request_cache_scope, request_cached
+
+calls = []
+
+
+@request_cached
+def lookup(organization, name="default"):
+    calls.append((organization.pk, name))
+    return len(calls)
+
+
+class TestRequestCache(TestCase):
+    def setUp(self):
+        calls.clear()
+        self.owner = User.objects.create_user(username="owner", password="SecurePass123!")
+        self.organization = Organization.objects.create(name="Scoped Org", owner=self.owner)
+
+    def test_memoizes_within_scope_by_primary_key(self):
+        with request_cache_scope():
+            first = lookup(self.organization)
+            again = lookup(Organization.objects.get(pk=self.organization.pk))
+            other = lookup(self.organization, name="other")
+
+        self.assertEqual(first, again)
+        self.assertNotEqual(first, other)
+        self.assertEqual(len(calls), 2)
+
+    def test_no_caching_outside_scope(self):
+        lookup(self.organization)
+        lookup(self.organization)
+
+        self.assertEqual(len(calls), 2)
+
+    def test_scopes_do_not_share_results(self):
+        with request_cache_scope():
+            lookup(self.organization)
+        with request_cache_scope():
+            lookup(self.organization)
+            clear_request_cache()
+            lookup(self.organization)
+
+        self.assertEqual(len(calls), 3)
+
+    def test_agent_skill_lookup_runs_once_per_scope(self):
+        ensure_agent_skills(self.organization)
+
+        with request_cache_scope(), self.assertNumQueries(1):
+            skills = {agent_skill(self.organization, "collections") for _ in range(5)}
+
+        self.assertEqual(len(skills), 1)
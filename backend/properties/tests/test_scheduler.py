@@ -0,0 +1,171 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from unittest.mock import patch
+
+from django.core import mail
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from properties.models import OutgoingEmail, ScheduledJob, ScheduledJobRun
+from properties.outbox import queue_email
+from properties.scheduler import Job, JobWorkers, prune_runs, renew_lease, run_due_jobs
+
+NOON = datetime(2026, 3, 2, 12, 0, tzinfo=dt_timezone.utc)
+
+
+class CountingJob(Job):
+    def __init__(self, *args, fail=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls = 0
+        self.fail = fail
+
+    def run(self):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("job broke")
+        return "done"
+
+
+class TestScheduler(TestCase):
+    def setUp(self):
+        self.hourly = CountingJob("hourly", every=timedelta(hours=1))
+
+    def test_slots_are_aligned_to_the_schedule(self):
+        daily = Job("daily", every=timedelta(days=1), at=timedelta(hours=6))
+
+        self.assertEqual(daily.due_slot(NOON), NOON.replace(hour=6))
+        self.assertEqual(daily.due_slot(NOON.replace(hour=5)), NOON.replace(day=1, hour=6))
+        self.assertEqual(self.hourly.due_slot(NOON + timedelta(minutes=59)), NOON)
+        self.assertEqual(self.hourly.missed_runs(NOON - timedelta(hours=4), NOON), 3)
+        self.assertEqual(self.hourly.missed_runs(None, NOON), 0)
+
+    def test_runs_each_slot_once_and_records_history(self):
+        runs = run_due_jobs([self.hourly], now=NOON + timedelta(minutes=5), node="node-a")
+        run_due_jobs([self.hourly], now=NOON + timedelta(minutes=30), node="node-b")
+
+        self.assertEqual(self.hourly.calls, 1)
+        run = ScheduledJobRun.objects.get()
+        self.assertEqual(runs, [run])
+        self.assertEqual(run.status, ScheduledJobRun.STATUS_SUCCEEDED)
+        self.assertEqual(run.scheduled_for, NOON)
+        self.assertEqual(run.node, "node-a")
+        self.assertEqual(run.output, "done")
+        self.assertIsNotNone(run.duration_ms)
+        job = ScheduledJob.objects.get()
+        self.assertEqual(job.last_scheduled_for, NOON)
+        self.assertEqual(job.locked_by, "")
+
+        run_due_jobs([self.hourly], now=NOON + timedelta(hours=1), node="node-b")
+        self.assertEqual(self.hourly.calls, 2)
+
+    def test_lease_keeps_other_nodes_out_and_a_lapsed_slot_is_not_rerun(self):
+        # node-a took the noon slot and is running it.
+        ScheduledJob.objects.create(
+            name="hourly", last_scheduled_for=NOON, locked_by="node-a",
+            locked_until=NOON + timedelta(minutes=30),
+        )
+
+        self.assertEqual(run_due_jobs([self.hourly], now=NOON + timedelta(minutes=10), node="node-b"), [])
+        # node-a died mid-run; its lease lapses but the slot stays taken.
+        self.assertEqual(run_due_jobs([self.hourly], now=NOON + timedelta(minutes=31), node="node-b"), [])
+        self.assertEqual(self.hourly.calls, 0)
+
+        run_due_jobs([self.hourly], now=NOON + timedelta(hours=1, minutes=1), node="node-b")
+        self.assertEqual(self.hourly.calls, 1)
+        run = ScheduledJobRun.objects.get()
+        self.assertEqual((run.node, run.scheduled_for, run.missed_runs), ("node-b", NOON + timedelta(hours=1), 0))
+
+    def test_running_node_renews_its_lease(self):
+        ScheduledJob.objects.create(name="hourly", locked_by="node-a", locked_until=NOON + timedelta(minutes=10))
+
+        self.assertTrue(renew_lease(self.hourly, "node-a", now=NOON + timedelta(minutes=50)))
+        self.assertFalse(renew_lease(self.hourly, "node-b", now=NOON + timedelta(minutes=50)))
+        self.assertEqual(ScheduledJob.objects.get().locked_until, NOON + timedelta(minutes=110))
+
+    def test_lease_is_renewed_while_the_job_runs(self):
+        slow = CountingJob("slow", every=timedelta(hours=1), lease=timedelta(milliseconds=30))
+        slow.run = lambda: time.sleep(0.2) or "done"
+
+        with patch("properties.scheduler.renew_lease", return_value=True) as renew:
+            run_due_jobs([slow], now=NOON, node="node-a")
+
+        self.assertGreaterEqual(renew.call_count, 2)
+        renew.assert_called_with(slow, "node-a")
+
+    def test_missed_slots_are_caught_up_in_one_run(self):
+        ScheduledJob.objects.create(name="hourly", last_scheduled_for=NOON - timedelta(hours=5))
+
+        with self.assertLogs("properties.scheduler", "WARNING"):
+            run_due_jobs([self.hourly], now=NOON + timedelta(minutes=1), node="node-a")
+
+        self.assertEqual(self.hourly.calls, 1)
+        run = ScheduledJobRun.objects.get()
+        self.assertEqual(run.scheduled_for, NOON)
+        self.assertEqual(run.missed_runs, 4)
+
+    def test_failed_runs_are_recorded_and_not_retried_in_the_same_slot(self):
+        broken = CountingJob("broken", every=timedelta(hours=1), fail=True)
+
+        with self.assertLogs("properties.scheduler", "ERROR"):
+            run_due_jobs([broken, self.hourly], now=NOON, node="node-a")
+        run_due_jobs([broken], now=NOON + timedelta(minutes=1), node="node-a")
+
+        self.assertEqual((broken.calls, self.hourly.calls), (1, 1))
+        run = ScheduledJobRun.objects.get(job__name="broken")
+        self.assertEqual(run.status, ScheduledJobRun.STATUS_FAILED)
+        self.assertIn("job broke", run.output)
+        self.assertEqual(ScheduledJob.objects.get(name="broken").locked_until, None)
+
+    def test_workers_run_each_job_in_its_own_thread(self):
+        release = threading.Event()
+        started = []
+
+        def fake_run_due_jobs(jobs, node):
+            started.append(jobs[0].name)
+            if jobs[0].name == "run_agents":
+                release.wait(5)
+            return [jobs[0].name]
+
+        workers = JobWorkers([Job("run_agents", every=timedelta(hours=1)),
+                              Job("send_outbox", every=timedelta(minutes=1))], node="node-a")
+        with patch("properties.scheduler.run_due_jobs", side_effect=fake_run_due_jobs):
+            workers.start_due()
+            workers.threads["send_outbox"].join(5)
+            workers.start_due()
+            workers.threads["send_outbox"].join(5)
+            release.set()
+            workers.threads["run_agents"].join(5)
+
+        # The long run_agents did not block send_outbox, and was not started twice.
+        self.assertEqual(started.count("run_agents"), 1)
+        self.assertEqual(started.count("send_outbox"), 2)
+        self.assertEqual(sorted(workers.collect()), ["run_agents", "send_outbox", "send_outbox"])
+
+    def test_prunes_old_history(self):
+        run_due_jobs([self.hourly], now=NOON, node="node-a")
+
+        self.assertEqual(prune_runs(now=NOON + timedelta(days=29)), 0)
+        self.assertEqual(prune_runs(now=NOON + timedelta(days=31)), 1)
+
+    def test_command_runs_due_jobs_once(self):
+        queue_email("pat@example.com", "Hello", "Body")
+        out = StringIO()
+
+        call_command("scheduler", "--once", "--job", "send_outbox", stdout=out)
+        call_command("scheduler", "--once", "--job", "send_outbox", stdout=StringIO())
+
+        self.assertIn("send_outbox succeeded", out.getvalue())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(OutgoingEmail.objects.get().status, OutgoingEmail.STATUS_SENT)
+        self.assertEqual(ScheduledJobRun.objects.count(), 1)
+
+        listing = StringIO()
+        call_command("scheduler", "--list", stdout=listing)
+        self.assertIn("send_outbox: every 0:01:00, last", listing.getvalue())
+        self.assertIn("apply_late_fees: every 1 day, 0:00:00, last never", listing.getvalue())
+
+        with self.assertRaisesMessage(CommandError, "Unknown job(s): nightly"):
+            call_command("scheduler", "--once", "--job", "nightly", stdout=StringIO())
@@ -0,0 +1,224 @@
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import transaction
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from properties.models import (
+    ChatMessage,
+    ChatSession,
+    LateFeeRule,
+    Lease,
+    Organization,
+    OrganizationShard,
+    OutgoingEmail,
+    Property,
+    Tenant,
+    Transaction,
+    Unit,
+    UserProfile,
+    Vendor,
+)
+from properties.outbox import queue_email
+from properties.sharding import organization_scope
+from properties.tests.databases import add_sqlite_databases, remove_databases
+
+SHARD_A = "test-shard-a"
+SHARD_B = "test-shard-b"
+
+
+@override_settings(SHARD_DATABASES=[SHARD_A, SHARD_B])
+class TestOrganizationSharding(TestCase):
+    # Resolved in setUpClass, once the shards below exist.
+    databases = "__all__"
+
+    @classmethod
+    def setUpClass(cls):
+        # Extra SQLite files act as shards.
+        add_sqlite_databases(SHARD_A, SHARD_B)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        remove_databases(SHARD_A, SHARD_B)
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="owner", password="SecurePass123!")
+        self.organization = Organization.objects.create(name="Shard Org", owner=self.user)
+        UserProfile.objects.filter(user=self.user).update(
+            role=UserProfile.ROLE_LANDLORD, organization=self.organization
+        )
+        self.user.refresh_from_db()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def vendor_names(self):
+        response = self.client.get("/api/vendors/")
+        self.assertEqual(response.status_code, 200)
+        return {vendor["name"] for vendor in response.data}
+
+    def move(self, target, drain_seconds=0):
+        call_command(
+            "move_organization", str(self.organization.id), target,
+            drain_seconds=drain_seconds, stdout=StringIO(),
+        )
+
+    def test_routes_organization_data_to_assigned_shard(self):
+        OrganizationShard.objects.create(organization=self.organization, alias=SHARD_A)
+
+        response = self.client.post("/api/vendors/", {"name": "Acme Plumbing"}, format="json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Vendor.objects.using(SHARD_A).filter(name="Acme Plumbing").exists())
+        self.assertFalse(Vendor.objects.using("default").exists())
+        self.assertEqual(self.vendor_names(), {"Acme Plumbing"})
+        # Users and organizations are global, with reference copies on shards.
+        self.assertFalse(UserProfile.objects.using(SHARD_A).exists())
+        self.assertTrue(User.objects.using(SHARD_A).filter(id=self.user.id).exists())
+        self.assertTrue(Organization.objects.using(SHARD_A).filter(id=self.organization.id).exists())
+
+    def test_unassigned_organizations_stay_on_default(self):
+        self.client.post("/api/vendors/", {"name": "Acme Plumbing"}, format="json")
+
+        self.assertTrue(Vendor.objects.using("default").filter(name="Acme Plumbing").exists())
+        self.assertFalse(Vendor.objects.using(SHARD_A).exists())
+
+    def test_move_copies_rows_and_switches_directory(self):
+        with organization_scope(self.organization):
+            property_obj = Property.objects.create(
+                organization=self.organization, name="Elm", address_line1="1 Elm St",
+                city="Austin", state="TX", zip_code="78701",
+            )
+            unit = Unit.objects.create(
+                property=property_obj, unit_number="1A", bedrooms=1, bathrooms=1,
+                square_feet=700, rent_amount=1200,
+            )
+            Vendor.objects.create(organization=self.organization, name="Acme Plumbing")
+            session = ChatSession.objects.create(organization=self.organization, user=self.user)
+            ChatMessage.objects.create(session=session, role="user", content="Hello")
+        created_at = Vendor.objects.get().created_at
+
+        self.move(SHARD_A)
+
+        self.assertEqual(OrganizationShard.objects.get().alias, SHARD_A)
+        for model in (Property, Unit, Vendor, ChatSession, ChatMessage):
+            with self.subTest(model=model.__name__):
+                self.assertEqual(model.objects.using(SHARD_A).count(), 1)
+                self.assertFalse(model.objects.using("default").exists())
+        self.assertEqual(Unit.objects.using(SHARD_A).get().id, unit.id)
+        self.assertEqual(Vendor.objects.using(SHARD_A).get().created_at, created_at)
+        self.assertEqual(self.vendor_names(), {"Acme Plumbing"})
+
+        self.move(SHARD_B)
+
+        self.assertFalse(Vendor.objects.using(SHARD_A).exists())
+        self.assertEqual(self.vendor_names(), {"Acme Plumbing"})
+
+    def test_writes_refused_while_moving(self):
+        OrganizationShard.objects.create(organization=self.organization, alias=SHARD_A, is_moving=True)
+
+        response = self.client.post("/api/vendors/", {"name": "Acme Plumbing"}, format="json")
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(self.vendor_names(), set())
+
+    def test_directory_changes_seen_without_signals(self):
+        # Another process's move reaches this one only through the directory table.
+        OrganizationShard.objects.create(organization=self.organization, alias=SHARD_A)
+        self.assertEqual(self.vendor_names(), set())
+        directory = OrganizationShard.objects.filter(organization=self.organization)
+
+        directory.update(is_moving=True)
+        response = self.client.post("/api/vendors/", {"name": "Acme Plumbing"}, format="json")
+        self.assertEqual(response.status_code, 503)
+
+        directory.update(alias=SHARD_B, is_moving=False)
+        response = self.client.post("/api/vendors/", {"name": "Acme Plumbing"}, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Vendor.objects.using(SHARD_B).filter(name="Acme Plumbing").exists())
+        self.assertFalse(Vendor.objects.using(SHARD_A).exists())
+
+    def test_move_drains_before_copying_and_deleting(self):
+        Vendor.objects.create(organization=self.organization, name="Acme Plumbing")
+        seen = []
+
+        def record(seconds):
+            entry = OrganizationShard.objects.get(organization=self.organization)
+            seen.append((seconds, entry.alias, entry.is_moving,
+                         Vendor.objects.using(SHARD_A).exists(),
+                         Vendor.objects.using("default").exists()))
+
+        with patch("properties.management.commands.move_organization.time.sleep", side_effect=record):
+            self.move(SHARD_A, drain_seconds=5)
+
+        self.assertEqual(seen, [
+            (5, "default", True, False, True),
+            (5, SHARD_A, False, True, True),
+        ])
+
+    def test_daily_jobs_reach_sharded_organizations(self):
+        OrganizationShard.objects.create(organization=self.organization, alias=SHARD_A)
+        with organization_scope(self.organization):
+            property_obj = Property.objects.create(
+                organization=self.organization, name="Elm", address_line1="1 Elm St",
+                city="Austin", state="TX", zip_code="78701",
+            )
+            unit = Unit.objects.create(
+                property=property_obj, unit_number="1A", bedrooms=1, bathrooms=1,
+                square_feet=700, rent_amount=1200,
+            )
+            tenant = Tenant.objects.create(organization=self.organization, first_name="Ada", last_name="Lane")
+            Lease.objects.create(
+                unit=unit, tenant=tenant, organization=self.organization,
+                start_date=date(2025, 9, 1), end_date=date(2026, 8, 31),
+                monthly_rent=Decimal("1200.00"), security_deposit=Decimal("1200.00"),
+            )
+            LateFeeRule.objects.create(
+                organization=self.organization, name="Late", grace_period_days=5,
+                fee_type=LateFeeRule.TYPE_FLAT, amount=Decimal("50.00"),
+            )
+
+        with patch("django.utils.timezone.now", return_value=datetime(2026, 3, 20, 12, tzinfo=dt_timezone.utc)):
+            call_command("apply_late_fees", stdout=StringIO())
+
+        fee = Transaction.objects.using(SHARD_A).get()
+        self.assertEqual(fee.amount, Decimal("50.00"))
+        self.assertFalse(Transaction.objects.using("default").exists())
+
+    def test_emails_are_queued_when_the_shard_commits(self):
+        OrganizationShard.objects.create(organization=self.organization, alias=SHARD_A)
+
+        with organization_scope(self.organization), self.captureOnCommitCallbacks(using=SHARD_A, execute=True):
+            with self.assertRaises(RuntimeError), transaction.atomic(using=SHARD_A):
+                queue_email("sam@example.com", "Booked", "Body")
+                raise RuntimeError("booking failed")
+            with transaction.atomic(using=SHARD_A):
+                self.assertIsNone(queue_email("pat@example.com", "Booked", "Body"))
+            self.assertFalse(OutgoingEmail.objects.exists())
+
+        self.assertEqual(list(OutgoingEmail.objects.values_list("recipient", flat=True)), ["pat@example.com"])
+
+    def test_move_refuses_ids_taken_on_target(self):
+        vendor = Vendor.objects.create(organization=self.organization, name="Acme Plumbing")
+        other_owner = User.objects.create_user(username="other", password="SecurePass123!")
+        other = Organization.objects.create(name="Other Org", owner=other_owner)
+        Vendor.objects.using(SHARD_A).create(id=vendor.id, organization=other, name="Taken")
+
+        with self.assertRaisesMessage(CommandError, "already used"):
+            self.move(SHARD_A)
+
+        self.assertFalse(OrganizationShard.objects.filter(organization=self.organization).exists())
+        self.assertTrue(Vendor.objects.using("default").filter(id=vendor.id).exists())
+
+    def test_move_rejects_unknown_shard(self):
+        with self.assertRaisesMessage(CommandError, "Unknown shard"):
+            self.move("nowhere")
@@ -0,0 +1,59 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from properties.models import Organization, Tenant, UserProfile, Vendor
+
+
+class TestSparseFieldsets(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="owner", password="SecurePass123!", first_name="Olive", last_name="Owner"
+        )
+        self.organization = Organization.objects.create(name="Sparse Org", owner=self.user)
+        UserProfile.objects.filter(user=self.user).update(
+            role=UserProfile.ROLE_LANDLORD, organization=self.organization
+        )
+        self.user.refresh_from_db()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        Vendor.objects.create(organization=self.organization, name="Pipes Inc", email="p@example.test")
+        Tenant.objects.create(
+            organization=self.organization,
+            first_name="Ada",
+            last_name="Lane",
+            email="ada@example.test",
+            phone="555-0100",
+        )
+
+    def test_fields_selects_columns_and_narrows_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/vendors/", {"fields": "id,name"})
+
+        self.assertEqual(response.data, [{"id": response.data[0]["id"], "name": "Pipes Inc"}])
+        vendor_query = next(q["sql"] for q in queries if 'FROM "properties_vendor"' in q["sql"])
+        self.assertNotIn('"email"', vendor_query)
+        self.assertNotIn("SUM(", vendor_query)
+
+    def test_omit_drops_fields(self):
+        response = self.client.get("/api/tenants/", {"omit": "email,phone"})
+
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertNotIn("email", response.data[0])
+        self.assertNotIn("phone", response.data[0])
+        self.assertEqual(response.data[0]["first_name"], "Ada")
+
+    def test_computed_fields_keep_full_queryset(self):
+        response = self.client.get("/api/vendors/", {"fields": "name,outstanding_balance"})
+
+        self.assertEqual(response.data[0], {"name": "Pipes Inc", "outstanding_balance": 0})
+
+    def test_directory_endpoints_share_payload(self):
+        users = self.client.get("/api/organization/users/")
+        messages = self.client.get("/api/messages/users/")
+
+        self.assertEqual(users.data, messages.data)
+        self.assertEqual(users.data["users"][0]["name"], "Olive Owner")
+        self.assertEqual(users.data["tenants"][0]["name"], "Ada Lane")
@@ -0,0 +1,86 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from properties.models import Bill, BillPayment, Organization, UserProfile, Vendor
+
+
+class TestVendorAggregates(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="owner", password="SecurePass123!")
+        self.organization = Organization.objects.create(name="Vendor Org", owner=self.user)
+        UserProfile.objects.filter(user=self.user).update(
+            role=UserProfile.ROLE_LANDLORD, organization=self.organization
+        )
+        self.user.refresh_from_db()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        self.plumber = self._vendor("Pipes Inc")
+        self._bill(self.plumber, "100.00")
+        paid = self._bill(self.plumber, "250.00")
+        BillPayment.objects.create(
+            organization=self.organization,
+            bill=paid,
+            amount=Decimal("250.00"),
+            payment_date=date(2026, 2, 1),
+        )
+        partial = self._bill(self.plumber, "80.00")
+        BillPayment.objects.create(
+            organization=self.organization,
+            bill=partial,
+            amount=Decimal("30.00"),
+            payment_date=date(2026, 2, 1),
+        )
+
+    def _vendor(self, name):
+        return Vendor.objects.create(organization=self.organization, name=name)
+
+    def _bill(self, vendor, amount):
+        return Bill.objects.create(
+            organization=self.organization,
+            vendor=vendor,
+            amount=Decimal(amount),
+            bill_date=date(2026, 1, 1),
+            due_date=date(2026, 1, 31),
+        )
+
+    def _results(self, response):
+        return response.data["results"] if isinstance(response.data, dict) else response.data
+
+    def test_detail_reports_bill_aggregates(self):
+        response = self.client.get(f"/api/vendors/{self.plumber.id}/")
+
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.data["total_bills"], 3)
+        self.assertEqual(response.data["total_paid"], Decimal("280.00"))
+        self.assertEqual(response.data["outstanding_balance"], Decimal("150.00"))
+        self.assertEqual(response.data["bill_count_by_status"][Bill.STATUS_PAID], 1)
+        self.assertEqual(response.data["bill_count_by_status"][Bill.STATUS_PARTIAL], 1)
+        self.assertEqual(response.data["bill_count_by_status"][Bill.STATUS_PENDING], 1)
+
+    def test_list_query_count_does_not_grow_with_vendors(self):
+        self.client.get("/api/vendors/")
+        with CaptureQueriesContext(connection) as few:
+            self.client.get("/api/vendors/")
+        for index in range(5):
+            self._bill(self._vendor(f"Vendor {index}"), "10.00")
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get("/api/vendors/")
+
+        self.assertEqual(len(many), len(few))
+        vendors = {vendor["name"]: vendor for vendor in self._results(response)}
+        self.assertEqual(vendors["Pipes Inc"]["total_bills"], 3)
+        self.assertEqual(vendors["Pipes Inc"]["outstanding_balance"], Decimal("150.00"))
+        self.assertEqual(vendors["Vendor 0"]["outstanding_balance"], Decimal("10.00"))
+
+    def test_summary_uses_bill_aggregates(self):
+        response = self.client.get("/api/vendors/summary/")
+
+        self.assertEqual(response.data["total_vendors"], 1)
+        self.assertEqual(response.data["total_outstanding"], Decimal("150.00"))
@@ -70,8 +70,9 @@ from .vendor_portal_views import (
 )
 from .workorder_views import WorkOrderViewSet
 from .lead_views import LeadViewSet
-from .ai_views import AiChatView
+from .ai_views import AiChatView, ChatSessionViewSet
 from .agent_views import AgentSkillViewSet, AgentTaskViewSet
+from .internal_views import MetricsView
 
 router = DefaultRouter()
 router.register("properties", PropertyViewSet, basename="property")
@@ -121,6 +122,7 @@ router.register(
 )
 router.register("agent-skills", AgentSkillViewSet, basename="agent-skill")
 router.register("agent-tasks", AgentTaskViewSet, basename="agent-task")
+router.register("ai/chat/sessions", ChatSessionViewSet, basename="ai-chat-session")
 
 urlpatterns = [
     path(
@@ -277,6 +279,7 @@ urlpatterns = [
     ),
     path("api/ai/chat/", AiChatView.as_view(), name="ai-chat"),
     path("ai/chat/", AiChatView.as_view(), name="ai-chat-nested"),
+    path("internal/metrics/", MetricsView.as_view(), name="internal-metrics"),
 ]
 router.register("applications", RentalApplicationViewSet, basename="rental-application")
 urlpatterns += router.urls
@@ -1,6 +1,5 @@
 ﻿from datetime import date
 
-from django.db.models import Q
 from django.utils import timezone
 
 from .models import AccountingCategory, ClassificationRule, ImportedTransaction
@@ -136,9 +135,9 @@ def run_recurring_transaction(recurring_txn):
         },
     ]
 
-    from django.db import transaction as db_transaction
+    from .sharding import shard_atomic
 
-    with db_transaction.atomic():
+    with shard_atomic():
         journal_entry = JournalEntry.objects.create(
             organization=recurring_txn.organization,
             entry_date=entry_date,
@@ -448,6 +447,17 @@ def seed_chart_of_accounts(organization):
     account_map = {}
     parent_links = []
 
+    # One read of the organization's accounts instead of a lookup per
+    # chart entry; this runs on every chart-of-accounts request.
+    existing_by_code = {}
+    uncoded_by_name = {}
+    for existing in AccountingCategory.objects.filter(organization=organization).order_by("id"):
+        existing.organization = organization
+        if existing.account_code:
+            existing_by_code.setdefault(existing.account_code, existing)
+        else:
+            uncoded_by_name.setdefault(existing.name, existing)
+
     def _normalize_account_fields(payload):
         code = str(payload.get("account_code", "")).strip()
         if not code:
@@ -476,19 +486,12 @@ def seed_chart_of_accounts(organization):
             return None
         code = fields["account_code"]
 
-        account = AccountingCategory.objects.filter(
-            organization=organization,
-            account_code=code,
-        ).order_by("id").first()
+        account = existing_by_code.get(code)
         if not account:
-            account = AccountingCategory.objects.filter(
-                organization=organization,
-                name=fields["name"],
-            ).filter(
-                Q(account_code__isnull=True) | Q(account_code="")
-            ).order_by("id").first()
+            account = uncoded_by_name.pop(fields["name"], None)
             if not account:
                 account = AccountingCategory.objects.create(**fields)
+            existing_by_code[code] = account
 
         changed = False
         for key, value in fields.items():
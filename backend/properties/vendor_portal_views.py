@@ -2,7 +2,7 @@ import uuid
 from decimal import Decimal
 
 from django.contrib.auth.models import User
-from django.db.models import Sum
+from django.db.models import Count, Q
 from django.utils import timezone
 
 from rest_framework import status
@@ -186,26 +186,18 @@ class VendorPortalDashboardView(APIView):
 
     def get(self, request):
         vendor = request.user.vendor_profile
-        work_orders = vendor.work_orders.all()
-        bills = vendor.bills.all()
-
-        total_earned = bills.filter(status=Bill.STATUS_PAID).aggregate(total=Sum("amount_paid"))["total"]
-        if total_earned is None:
-            total_earned = 0
-        pending_payment = (
-            bills.filter(status__in=[Bill.STATUS_PENDING, Bill.STATUS_PARTIAL, Bill.STATUS_OVERDUE])
-            .aggregate(total=Sum("balance_due"))["total"]
+        work_order_counts = vendor.work_orders.aggregate(
+            assigned_count=Count("id", filter=Q(status=WorkOrder.STATUS_ASSIGNED)),
+            in_progress_count=Count("id", filter=Q(status=WorkOrder.STATUS_IN_PROGRESS)),
+            completed_count=Count("id", filter=Q(status=WorkOrder.STATUS_COMPLETED)),
         )
-        if pending_payment is None:
-            pending_payment = 0
+        bill_totals = vendor.bills.aggregate(**Bill.aggregates())
 
         return Response(
             {
-                "assigned_count": work_orders.filter(status=WorkOrder.STATUS_ASSIGNED).count(),
-                "in_progress_count": work_orders.filter(status=WorkOrder.STATUS_IN_PROGRESS).count(),
-                "completed_count": work_orders.filter(status=WorkOrder.STATUS_COMPLETED).count(),
-                "total_earned": total_earned,
-                "pending_payment": pending_payment,
+                **work_order_counts,
+                "total_earned": bill_totals["earned_total"],
+                "pending_payment": bill_totals["outstanding_balance"],
             }
         )
 
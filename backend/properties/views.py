@@ -25,7 +25,18 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .mixins import OrganizationQuerySetMixin, resolve_request_organization
+from .cache_versions import bump_on_commit
+from .categorizer import categorize_imported_transactions, mark_classifier_stale
+from .mixins import (
+    ConditionalGetMixin,
+    OrganizationQuerySetMixin,
+    ReplicaReadMixin,
+    resolve_request_organization,
+)
+from .pagination import StandardPagination, cursor_pagination
+from .report_cache import cached_report
+from .request_cache import request_cached
+from .sharding import shard_atomic
 from .models import (
     AccountingCategory,
     ImportedTransaction,
@@ -84,6 +95,9 @@ from .serializers import (
     TenantSerializer,
     UnitSerializer,
     JournalEntrySerializer,
+    annotate_category_totals,
+    annotate_reconciliation_totals,
+    journal_lines_prefetch,
     JournalEntryLineSerializer,
     BankReconciliationSerializer,
     ReconciliationDetailSerializer,
@@ -315,6 +329,7 @@ def _month_range(start_date, end_date):
     return months
 
 
+@request_cached
 def _resolve_reporting_category(organization, category_name, category_type):
     if not organization:
         return AccountingCategory.objects.filter(
@@ -606,7 +621,7 @@ def _create_posted_journal_entry(
     if total_debit != total_credit:
         raise ValidationError("Journal entry must be balanced.")
 
-    with db_transaction.atomic():
+    with shard_atomic():
         journal_entry = JournalEntry.objects.create(
             organization=organization,
             entry_date=entry_date,
@@ -671,6 +686,7 @@ def _legacy_account_from_category(organization, category):
     return None
 
 
+@request_cached
 def _cash_account_for_organization(organization):
     return (
         _resolve_chart_account(organization, account_code="1020")
@@ -857,6 +873,40 @@ class OrganizationMembersView(APIView):
         return Response(payload)
 
 
+def organization_directory(organization):
+    """Users and tenants of an organization for recipient pickers and dropdowns."""
+    users = (
+        User.objects.filter(profile__organization=organization)
+        .order_by("first_name", "last_name", "username")
+        .values("id", "first_name", "last_name", "username", "email")
+    )
+    tenants = (
+        Tenant.objects.filter(organization=organization)
+        .order_by("first_name", "last_name")
+        .values("id", "first_name", "last_name", "email")
+    )
+    return {
+        "users": [
+            {
+                "id": user["id"],
+                "name": (f"{user['first_name']} {user['last_name']}".strip() or user["username"]),
+                "email": user["email"],
+                "type": "user",
+            }
+            for user in users
+        ],
+        "tenants": [
+            {
+                "id": tenant["id"],
+                "name": f"{tenant['first_name']} {tenant['last_name']}".strip(),
+                "email": tenant["email"],
+                "type": "tenant",
+            }
+            for tenant in tenants
+        ],
+    }
+
+
 class OrganizationUsersView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -868,33 +918,7 @@ class OrganizationUsersView(APIView):
                 {"users": [], "tenants": []},
                 status=status.HTTP_200_OK,
             )
-        users = (
-            User.objects.filter(profile__organization=organization)
-            .select_related("profile")
-            .order_by("first_name", "last_name", "username")
-        )
-        user_payload = [
-            {
-                "id": user.id,
-                "name": (f"{user.first_name} {user.last_name}".strip() or user.username),
-                "email": user.email,
-                "type": "user",
-            }
-            for user in users
-        ]
-        tenants = Tenant.objects.filter(organization=organization).order_by(
-            "first_name", "last_name"
-        )
-        tenant_payload = [
-            {
-                "id": tenant.id,
-                "name": f"{tenant.first_name} {tenant.last_name}".strip(),
-                "email": tenant.email,
-                "type": "tenant",
-            }
-            for tenant in tenants
-        ]
-        return Response({"users": user_payload, "tenants": tenant_payload})
+        return Response(organization_directory(organization))
 
 
 class OrganizationInvitationsView(APIView):
@@ -914,7 +938,7 @@ class OrganizationInvitationsView(APIView):
         return Response(OrganizationInvitationSerializer(queryset, many=True).data)
 
 
-class PublicListingsView(APIView):
+class PublicListingsView(ReplicaReadMixin, APIView):
     permission_classes = [AllowAny]
 
     def get(self, request):
@@ -939,11 +963,16 @@ class PublicListingsView(APIView):
         if city:
             queryset = queryset.filter(property__city__icontains=city)
 
+        paginator = StandardPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        if page is not None:
+            serializer = PublicUnitListingSerializer(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
         serializer = PublicUnitListingSerializer(queryset, many=True)
         return Response(serializer.data)
 
 
-class PublicListingDetailView(APIView):
+class PublicListingDetailView(ReplicaReadMixin, APIView):
     permission_classes = [AllowAny]
 
     def get(self, request, slug):
@@ -1071,7 +1100,7 @@ class PublicListingApplicationView(APIView):
         )
 
 
-class BlogPostListView(APIView):
+class BlogPostListView(ReplicaReadMixin, APIView):
     permission_classes = [AllowAny]
 
     def get(self, request):
@@ -1091,7 +1120,7 @@ class BlogPostListView(APIView):
         return Response(serializer.data)
 
 
-class BlogPostDetailView(APIView):
+class BlogPostDetailView(ReplicaReadMixin, APIView):
     permission_classes = [AllowAny]
 
     def get(self, request, slug):
@@ -1417,7 +1446,7 @@ class TenantViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet):
 
 
 class LeaseViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet):
-    queryset = Lease.objects.all()
+    queryset = Lease.objects.select_related("tenant", "unit")
     serializer_class = LeaseSerializer
 
     def get_permissions(self):
@@ -1740,8 +1769,9 @@ class LeaseSigningPublicView(APIView):
 
 
 class PaymentViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet):
-    queryset = Payment.objects.all()
+    queryset = Payment.objects.select_related("lease__tenant", "lease__unit")
     serializer_class = PaymentSerializer
+    pagination_class = cursor_pagination("-created_at", "-id")
 
     def get_permissions(self):
         if self.action in {"list", "retrieve"}:
@@ -1760,7 +1790,7 @@ class PaymentViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet):
 
 
 class MaintenanceRequestViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet):
-    queryset = MaintenanceRequest.objects.all()
+    queryset = MaintenanceRequest.objects.select_related("unit", "tenant")
     serializer_class = MaintenanceRequestSerializer
 
     def get_queryset(self):
@@ -1859,6 +1889,7 @@ class MaintenanceRequestViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet
 class NotificationViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet):
     queryset = Notification.objects.select_related("recipient")
     serializer_class = NotificationSerializer
+    pagination_class = cursor_pagination("-created_at", "-id")
     permission_classes = [IsAuthenticated]
     http_method_names = ["get", "patch", "delete", "head", "options"]
 
@@ -1877,6 +1908,9 @@ class NotificationViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet):
     @action(detail=False, methods=["patch"], url_path="mark-all-read")
     def mark_all_read(self, request):
         updated_count = self.get_queryset().filter(is_read=False).update(is_read=True)
+        if updated_count:
+            organization = resolve_request_organization(request)
+            bump_on_commit(organization and organization.id, Notification._meta.label_lower)
         return Response({"updated": updated_count})
 
     @action(detail=False, methods=["get"], url_path="unread-count")
@@ -1888,6 +1922,7 @@ class NotificationViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet):
 class MessageViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet):
     queryset = Message.objects.select_related("sender", "recipient", "parent")
     serializer_class = MessageSerializer
+    pagination_class = cursor_pagination("-created_at", "-id")
     permission_classes = [IsAuthenticated]
     http_method_names = ["get", "post", "patch", "head", "options"]
 
@@ -2005,34 +2040,7 @@ class MessageViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet):
         organization = resolve_request_organization(self.request)
         if not organization:
             return Response({"users": [], "tenants": []})
-        users = (
-            User.objects.filter(profile__organization=organization)
-            .select_related("profile")
-            .order_by("first_name", "last_name", "username")
-        )
-        tenants = Tenant.objects.filter(organization=organization).order_by(
-            "first_name", "last_name"
-        )
-
-        user_payload = [
-            {
-                "id": user.id,
-                "name": (f"{user.first_name} {user.last_name}".strip() or user.username),
-                "email": user.email,
-                "type": "user",
-            }
-            for user in users
-        ]
-        tenant_payload = [
-            {
-                "id": tenant.id,
-                "name": f"{tenant.first_name} {tenant.last_name}".strip(),
-                "email": tenant.email,
-                "type": "tenant",
-            }
-            for tenant in tenants
-        ]
-        return Response({"users": user_payload, "tenants": tenant_payload})
+        return Response(organization_directory(organization))
 
     @action(detail=True, methods=["patch"], url_path="mark-read")
     def mark_read(self, request, pk=None):
@@ -2511,7 +2519,7 @@ class AccountingCategoryViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet
                 output_field=IntegerField(),
             )
         ).order_by("_account_code_is_missing", "account_code", "name")
-        serializer = self.get_serializer(queryset, many=True)
+        serializer = self.get_serializer(annotate_category_totals(queryset), many=True)
         return Response(serializer.data)
 
     def perform_create(self, serializer):
@@ -2642,6 +2650,7 @@ class TransactionViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet):
                 rows.append(transaction_row)
 
             objs = Transaction.objects.bulk_create(rows)
+            bump_on_commit(organization.id, Transaction._meta.label_lower)
             for obj in objs:
                 created_txn_ids.append(obj.id)
                 try:
@@ -2673,6 +2682,7 @@ class TransactionViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet):
 class JournalEntryViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet):
     queryset = JournalEntry.objects.select_related("organization", "created_by")
     serializer_class = JournalEntrySerializer
+    pagination_class = cursor_pagination("-entry_date", "-created_at", "-id")
     permission_classes = [IsLandlord]
 
     def get_queryset(self):
@@ -2695,7 +2705,7 @@ class JournalEntryViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet):
         property_id = params.get("property_id")
         if property_id:
             queryset = queryset.filter(lines__property_id=property_id).distinct()
-        return queryset.prefetch_related("lines", "lines__account", "lines__property", "lines__unit", "lines__tenant", "lines__lease")
+        return queryset.prefetch_related(journal_lines_prefetch())
 
     def create(self, request, *args, **kwargs):
         organization = resolve_request_organization(request)
@@ -2926,7 +2936,7 @@ class TransactionImportViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet)
         auto_classified_count = 0
         auto_classified_ids = []
 
-        with db_transaction.atomic():
+        with shard_atomic():
             ImportedTransaction.objects.filter(transaction_import=instance).delete()
 
             for raw_row in rows:
@@ -3010,6 +3020,10 @@ class TransactionImportViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet)
                 organization,
                 ImportedTransaction.objects.filter(transaction_import=instance),
             )
+            predicted_ids = categorize_imported_transactions(
+                organization,
+                ImportedTransaction.objects.filter(transaction_import=instance),
+            )
             instance.status = TransactionImport.STATUS_MAPPED
             instance.column_mapping = {
                 **(instance.column_mapping if isinstance(instance.column_mapping, dict) else {}),
@@ -3020,6 +3034,7 @@ class TransactionImportViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet)
                     "reference_column": reference_col,
                 },
                 "auto_classified_ids": auto_classified_ids,
+                "predicted_ids": predicted_ids,
             }
             instance.row_count = created_count
             instance.save(update_fields=["status", "column_mapping", "row_count"])
@@ -3033,6 +3048,8 @@ class TransactionImportViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet)
                 "duplicates": duplicate_count,
                 "auto_classified": auto_classified_count,
                 "auto_classified_ids": auto_classified_ids,
+                "predicted": len(predicted_ids),
+                "predicted_ids": predicted_ids,
                 "status": instance.status,
             },
             status=status.HTTP_201_CREATED,
@@ -3082,7 +3099,7 @@ class TransactionImportViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet)
         total = Decimal("0.00")
         skipped_rows = []
 
-        with db_transaction.atomic():
+        with shard_atomic():
             for row in rows:
                 amount = row.amount
                 if amount is None or amount == 0:
@@ -3150,6 +3167,9 @@ class TransactionImportViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet)
 
             instance.status = TransactionImport.STATUS_COMPLETED
             instance.save(update_fields=["status"])
+            if booked:
+                # Retrained by the scheduler, not in this request.
+                mark_classifier_stale(organization)
 
         return Response(
             {
@@ -3206,7 +3226,7 @@ class ImportedTransactionViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSe
                 return Response({"category": "Invalid category."}, status=status.HTTP_400_BAD_REQUEST)
 
         approved_count = 0
-        with db_transaction.atomic():
+        with shard_atomic():
             for row in queryset:
                 if category and not row.category_id:
                     row.category = category
@@ -3226,7 +3246,10 @@ class BankReconciliationViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet
         organization = resolve_request_organization(self.request)
         if not organization:
             return BankReconciliation.objects.none()
-        return BankReconciliation.objects.filter(organization=organization).order_by("-created_at")
+        queryset = BankReconciliation.objects.filter(organization=organization).order_by("-created_at")
+        if self.action == "list":
+            queryset = annotate_reconciliation_totals(queryset)
+        return queryset
 
     def _bank_account_for_reconciliation(self, reconciliation):
         if not reconciliation.account_id:
@@ -3308,7 +3331,7 @@ class BankReconciliationViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet
 
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        with db_transaction.atomic():
+        with shard_atomic():
             reconciliation = serializer.save(
                 organization=organization,
                 created_by=request.user,
@@ -3593,7 +3616,7 @@ class RecordIncomeView(APIView):
         if not deposit_account:
             return Response({"deposit_to_account_id": "Invalid deposit account."}, status=status.HTTP_400_BAD_REQUEST)
 
-        with db_transaction.atomic():
+        with shard_atomic():
             journal = _create_posted_journal_entry(
                 organization=organization,
                 entry_date=event_date,
@@ -3665,7 +3688,7 @@ class RecordExpenseView(APIView):
         if not paid_from_account:
             return Response({"paid_from_account_id": "Invalid paid-from account."}, status=status.HTTP_400_BAD_REQUEST)
 
-        with db_transaction.atomic():
+        with shard_atomic():
             journal = _create_posted_journal_entry(
                 organization=organization,
                 entry_date=event_date,
@@ -3746,9 +3769,11 @@ class RecordTransferView(APIView):
         return Response(JournalEntrySerializer(journal).data, status=status.HTTP_201_CREATED)
 
 
-class ReportingTrialBalanceView(APIView):
+class ReportingTrialBalanceView(ReplicaReadMixin, ConditionalGetMixin, APIView):
     permission_classes = [IsLandlord]
+    etag_domains = ("accounting",)
 
+    @cached_report("trial-balance")
     def get(self, request):
         organization = resolve_request_organization(request)
         if not organization:
@@ -3801,8 +3826,9 @@ class ReportingTrialBalanceView(APIView):
         )
 
 
-class ReportingBalanceSheetView(APIView):
+class ReportingBalanceSheetView(ReplicaReadMixin, ConditionalGetMixin, APIView):
     permission_classes = [IsLandlord]
+    etag_domains = ("accounting",)
 
     def get(self, request):
         organization = resolve_request_organization(request)
@@ -3869,8 +3895,9 @@ class ReportingBalanceSheetView(APIView):
         )
 
 
-class ReportingGeneralLedgerView(APIView):
+class ReportingGeneralLedgerView(ReplicaReadMixin, ConditionalGetMixin, APIView):
     permission_classes = [IsLandlord]
+    etag_domains = ("accounting",)
 
     def get(self, request):
         organization = resolve_request_organization(request)
@@ -4014,9 +4041,11 @@ class RecurringTransactionViewSet(OrganizationQuerySetMixin, viewsets.ModelViewS
         created_count = run_all_due_recurring(organization)
         return Response({"created": created_count})
 
-class AccountingDashboardView(APIView):
+class AccountingDashboardView(ReplicaReadMixin, ConditionalGetMixin, APIView):
     permission_classes = [IsLandlord]
+    etag_domains = ("accounting", "leasing")
 
+    @cached_report("dashboard")
     def get(self, request):
         organization = resolve_request_organization(request)
         if not organization:
@@ -4099,37 +4128,42 @@ class AccountingDashboardView(APIView):
             else Decimal("0.00")
         )
 
-        outstanding_balances = Decimal("0.00")
-        for lease in Lease.objects.filter(organization=organization, is_active=True):
-            lease_payment = (
-                month_txns.filter(
-                    lease_id=lease.id,
-                    transaction_type=Transaction.TYPE_INCOME,
-                    category=rent_income_category,
-                ).aggregate(total=Sum("amount"))["total"]
-                or Decimal("0.00")
+        rent_paid_by_lease = dict(
+            month_txns.filter(
+                lease__isnull=False,
+                transaction_type=Transaction.TYPE_INCOME,
+                category=rent_income_category,
             )
-            outstanding_balances += max(Decimal("0.00"), lease.monthly_rent - lease_payment)
+            .values("lease_id")
+            .annotate(total=Sum("amount"))
+            .values_list("lease_id", "total")
+        )
+        outstanding_balances = Decimal("0.00")
+        for lease_id, monthly_rent in Lease.objects.filter(
+            organization=organization, is_active=True
+        ).values_list("id", "monthly_rent"):
+            lease_payment = rent_paid_by_lease.get(lease_id) or Decimal("0.00")
+            outstanding_balances += max(Decimal("0.00"), monthly_rent - lease_payment)
 
         trend_start = today.replace(day=1) - timedelta(days=365)
-        trend = []
-        for month_key, month_label in _month_labels(trend_start, today):
-            year_value, month_value = month_key.split("-", 1)
-            month_start_value = date(int(year_value), int(month_value), 1)
-            month_end_value = _month_end(month_start_value)
-            bucket = base_transactions.filter(date__gte=month_start_value, date__lte=month_end_value)
-            month_income = (
-                bucket.filter(transaction_type=Transaction.TYPE_INCOME).aggregate(
-                    total=Sum("amount")
-                )["total"]
-                or Decimal("0.00")
+        monthly_totals = {
+            row["month"].strftime("%Y-%m"): row
+            for row in base_transactions.filter(
+                date__gte=trend_start.replace(day=1),
+                date__lte=_month_end(today),
             )
-            month_expenses = (
-                bucket.filter(transaction_type=Transaction.TYPE_EXPENSE).aggregate(
-                    total=Sum("amount")
-                )["total"]
-                or Decimal("0.00")
+            .annotate(month=TruncMonth("date"))
+            .values("month")
+            .annotate(
+                income=Sum("amount", filter=Q(transaction_type=Transaction.TYPE_INCOME)),
+                expenses=Sum("amount", filter=Q(transaction_type=Transaction.TYPE_EXPENSE)),
             )
+        }
+        trend = []
+        for month_key, month_label in _month_labels(trend_start, today):
+            totals = monthly_totals.get(month_key, {})
+            month_income = totals.get("income") or Decimal("0.00")
+            month_expenses = totals.get("expenses") or Decimal("0.00")
             trend.append(
                 {
                     "month": month_label,
@@ -4165,9 +4199,11 @@ class AccountingDashboardView(APIView):
         )
 
 
-class AccountingPnLView(APIView):
+class AccountingPnLView(ReplicaReadMixin, ConditionalGetMixin, APIView):
     permission_classes = [IsLandlord]
+    etag_domains = ("accounting",)
 
+    @cached_report("pnl")
     def get(self, request):
         organization = resolve_request_organization(request)
         if not organization:
@@ -4241,8 +4277,9 @@ class AccountingPnLView(APIView):
             }
         )
 
-class AccountingCashflowView(APIView):
+class AccountingCashflowView(ReplicaReadMixin, ConditionalGetMixin, APIView):
     permission_classes = [IsLandlord]
+    etag_domains = ("accounting",)
 
     def get(self, request):
         organization = resolve_request_organization(request)
@@ -4290,8 +4327,9 @@ class AccountingCashflowView(APIView):
         return Response({"cashflow": cashflow})
 
 
-class AccountingRentRollView(APIView):
+class AccountingRentRollView(ReplicaReadMixin, ConditionalGetMixin, APIView):
     permission_classes = [IsLandlord]
+    etag_domains = ("leasing", "accounting")
 
     def get(self, request):
         organization = resolve_request_organization(request)
@@ -4318,6 +4356,22 @@ class AccountingRentRollView(APIView):
         if property_id:
             leases = leases.filter(unit__property_id=property_id)
 
+        rent_by_lease = {
+            row["lease_id"]: row
+            for row in Transaction.objects.filter(
+                organization=organization,
+                lease__in=leases,
+                transaction_type=Transaction.TYPE_INCOME,
+                category=rent_income_category,
+            )
+            .values("lease_id")
+            .annotate(
+                collected_this_month=Sum("amount", filter=Q(date__gte=month_start)),
+                collected_total=Sum("amount"),
+                last_payment_date=Max("date"),
+            )
+        }
+
         rows = []
         total_expected_rent = Decimal("0.00")
         total_collected = Decimal("0.00")
@@ -4327,40 +4381,14 @@ class AccountingRentRollView(APIView):
             monthly_rent = lease.monthly_rent or Decimal("0.00")
             total_expected_rent += monthly_rent
 
-            collected_this_month = (
-                Transaction.objects.filter(
-                    organization=organization,
-                    lease=lease,
-                    transaction_type=Transaction.TYPE_INCOME,
-                    category=rent_income_category,
-                    date__gte=month_start,
-                ).aggregate(total=Sum("amount"))["total"]
-                or Decimal("0.00")
-            )
-            collected_total = (
-                Transaction.objects.filter(
-                    organization=organization,
-                    lease=lease,
-                    transaction_type=Transaction.TYPE_INCOME,
-                    category=rent_income_category,
-                ).aggregate(total=Sum("amount"))["total"]
-                or Decimal("0.00")
-            )
+            rent = rent_by_lease.get(lease.id, {})
+            collected_this_month = rent.get("collected_this_month") or Decimal("0.00")
+            collected_total = rent.get("collected_total") or Decimal("0.00")
             total_collected += collected_this_month
             balance_due = max(Decimal("0.00"), monthly_rent - collected_this_month)
             total_outstanding += balance_due
 
-            last_payment = (
-                Transaction.objects.filter(
-                    organization=organization,
-                    lease=lease,
-                    transaction_type=Transaction.TYPE_INCOME,
-                    category=rent_income_category,
-                )
-                .order_by("-date", "-id")
-                .first()
-            )
-            last_payment_date = last_payment.date if last_payment else None
+            last_payment_date = rent.get("last_payment_date")
             days_since_last = (now - last_payment_date).days if last_payment_date else None
             if balance_due <= Decimal("0.00"):
                 status_label = "current"
@@ -4407,9 +4435,11 @@ class AccountingRentRollView(APIView):
         )
 
 
-class AccountingTaxReportView(APIView):
+class AccountingTaxReportView(ReplicaReadMixin, ConditionalGetMixin, APIView):
     permission_classes = [IsLandlord]
+    etag_domains = ("accounting",)
 
+    @cached_report("tax-report")
     def get(self, request):
         organization = resolve_request_organization(request)
         if not organization:
@@ -4616,8 +4646,14 @@ class ExpenseViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet):
 
 
 class RentLedgerEntryViewSet(OrganizationQuerySetMixin, viewsets.ReadOnlyModelViewSet):
-    queryset = RentLedgerEntry.objects.select_related("lease", "payment")
+    queryset = RentLedgerEntry.objects.select_related(
+        "lease__tenant",
+        "lease__unit",
+        "payment__lease__tenant",
+        "payment__lease__unit",
+    )
     serializer_class = RentLedgerEntrySerializer
+    pagination_class = cursor_pagination("date", "created_at", "id")
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
@@ -4634,6 +4670,15 @@ class RentLedgerEntryViewSet(OrganizationQuerySetMixin, viewsets.ReadOnlyModelVi
         return queryset
 
 
+@request_cached
+def _active_late_fee_rule(organization):
+    return (
+        LateFeeRule.objects.filter(organization=organization, is_active=True)
+        .order_by("-created_at")
+        .first()
+    )
+
+
 class LateFeeRuleViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet):
     queryset = LateFeeRule.objects.all()
     serializer_class = LateFeeRuleSerializer
@@ -4677,14 +4722,7 @@ class GenerateChargesView(APIView):
                 )
                 charges_created += 1
 
-            rule = (
-                LateFeeRule.objects.filter(
-                    organization=organization,
-                    is_active=True,
-                )
-                .order_by("-created_at")
-                .first()
-            )
+            rule = _active_late_fee_rule(organization)
             if not rule:
                 continue
 